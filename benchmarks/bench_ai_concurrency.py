@@ -0,0 +1,86 @@
+"""Compare sequential, concurrent and batch AI analysis against the local stub API.
+
+Requires the anthropic SDK; no API key or network access is needed because
+requests go to ``stub_anthropic_server`` on localhost.
+
+Usage:
+    python benchmarks/bench_ai_concurrency.py --emails 60 --latency-ms 800 --concurrency 1,4,8,16 --batch
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from briefing.ai_analyzer import EmailAnalyzer, load_anthropic
+from briefing.backends import FixtureBackend
+from briefing.collector import EmailCollector
+from synthetic_mailbox import MailboxSpec, generate_records, benchmark_config
+from stub_anthropic_server import start_stub_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sequential vs concurrent AI analysis")
+    parser.add_argument('--emails', type=int, default=60, help='Number of flagged emails to analyze')
+    parser.add_argument('--latency-ms', type=float, default=800.0, help='Stub API latency per request')
+    parser.add_argument('--concurrency', type=str, default="1,4,8,16", help='Comma-separated limits to try')
+    parser.add_argument('--batch', action='store_true', help='Also time Message Batches mode')
+    parser.add_argument('--batch-latency-ms', type=float, default=2000.0, help='Time until a stub batch ends')
+    parser.add_argument('--output', type=str, help='Write JSON results here (default: stdout)')
+    args = parser.parse_args()
+
+    if load_anthropic() is None:
+        sys.exit("anthropic SDK is required for this benchmark")
+
+    server, base_url = start_stub_server(latency_seconds=args.latency_ms / 1000.0,
+                                         batch_latency_seconds=args.batch_latency_ms / 1000.0)
+    os.environ.setdefault("BENCH_STUB_API_KEY", "stub-key")
+
+    spec = MailboxSpec(size=args.emails * 4, flag_ratio=0.5)
+    config = benchmark_config(spec)
+    backend = FixtureBackend(records=list(generate_records(spec)))
+    backend.connect()
+    emails = EmailCollector(backend).collect_all(config)["inbox"][:args.emails]
+
+    runs = [{"concurrency": int(c)} for c in args.concurrency.split(",") if c.strip()]
+    if args.batch:
+        runs.append({"concurrency": 1, "batch": {"enabled": True, "min_emails": 1, "poll_initial_seconds": 0.5}})
+
+    results = []
+    for run in runs:
+        config["ai_analysis"] = {
+            "enabled": True,
+            "api_key_env": "BENCH_STUB_API_KEY",
+            "base_url": base_url,
+            "analyze_criteria": "top_priority",
+            "request_timeout": 30,
+            **run,
+        }
+        analyzer = EmailAnalyzer(config)
+        requests_before = server.request_count
+        start = time.perf_counter()
+        analyzed = analyzer.analyze_batch(emails)
+        seconds = time.perf_counter() - start
+        results.append({
+            "mode": "batch" if "batch" in run else "direct",
+            "concurrency": run["concurrency"],
+            "emails": len(analyzed),
+            "succeeded": sum(1 for r in analyzed.values() if r.success),
+            "direct_requests": server.request_count - requests_before,
+            "seconds": round(seconds, 3),
+        })
+
+    server.shutdown()
+    output = json.dumps({"latency_ms": args.latency_ms, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Serial vs parallel MailItem conversion (``behaviour.convert_workers``).
+
+Runs ``EmailCollector.iter_inbox`` in ``items`` fetch mode over a synthetic
+mailbox whose items are wrapped in ``ComLatency``, so every property read
+and method call costs what it would across the process boundary to
+Outlook. Each worker count is timed and checked to return the same emails
+in the same order as the serial run.
+
+``--round-trip-us`` is the part of a call that overlaps between threads,
+``--server-us`` the part Outlook serves one call at a time; the speedup is
+bounded by their ratio. Take both from a real mailbox: the ``--profile``
+run report gives COM calls and convert time per run.
+
+Usage:
+    python benchmarks/bench_convert_workers.py --size 2000 --workers 1,2,4,8 --output convert.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from briefing.backends import FixtureBackend
+from briefing.collector import EmailCollector
+from briefing.fake_outlook import ComLatency
+from synthetic_mailbox import MailboxSpec, generate_records, benchmark_config
+
+
+class LatentFixtureBackend(FixtureBackend):
+    """A fixture backend whose mail items pay ``latency`` per COM access."""
+
+    def __init__(self, records, latency: ComLatency):
+        super().__init__(records=records)
+        self.latency = latency
+
+    def iter_inbox_items(self, lookback_days: int = 7, unread_or_flagged_only: bool = True,
+                         flagged_only: bool = False) -> Iterator[Any]:
+        for item in super().iter_inbox_items(lookback_days, unread_or_flagged_only, flagged_only):
+            yield self.latency.wrap(item)
+
+    def open_item(self, entry_id: str) -> Any:
+        self.latency.call()  # Namespace.GetItemFromID
+        return self.latency.wrap(super().open_item(entry_id))
+
+    @contextmanager
+    def worker(self) -> Iterator["LatentFixtureBackend"]:
+        yield self
+
+
+def measure(backend: LatentFixtureBackend, config, workers: int) -> dict:
+    config = dict(config, behaviour=dict(config["behaviour"], fetch_mode="items", convert_workers=workers))
+    calls_before = backend.latency.calls
+    started = time.perf_counter()
+    emails = list(EmailCollector(backend).iter_inbox(config))
+    seconds = time.perf_counter() - started
+    return {
+        "workers": workers,
+        "items": len(emails),
+        "seconds": round(seconds, 3),
+        "items_per_sec": round(len(emails) / seconds, 1) if seconds else None,
+        "com_calls": backend.latency.calls - calls_before,
+        "entry_ids": [email.entry_id for email in emails],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure parallel MailItem conversion against serial")
+    parser.add_argument('--size', type=int, default=2000, help='Synthetic mailbox size (all flagged)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=str, default="1,2,4,8", help='Comma-separated worker counts')
+    parser.add_argument('--round-trip-us', type=float, default=150, help='Per-call latency that overlaps across threads')
+    parser.add_argument('--server-us', type=float, default=10, help='Per-call time serialised in Outlook')
+    parser.add_argument('--output', type=str, help='Write JSON results here (default: stdout)')
+    args = parser.parse_args()
+
+    spec = MailboxSpec(size=args.size, seed=args.seed, flag_ratio=1.0)
+    latency = ComLatency(round_trip=args.round_trip_us / 1e6, server=args.server_us / 1e6)
+    backend = LatentFixtureBackend(list(generate_records(spec)), latency)
+    backend.connect()
+    config = benchmark_config(spec)
+
+    worker_counts = [int(count) for count in args.workers.split(",") if count.strip()]
+    serial = measure(backend, config, 1)
+    results = []
+    for workers in worker_counts:
+        result = serial if workers == 1 else measure(backend, config, workers)
+        result["speedup"] = round(serial["seconds"] / result["seconds"], 2) if result["seconds"] else None
+        result["same_as_serial"] = result["entry_ids"] == serial["entry_ids"]
+        results.append(result)
+
+    for result in results:
+        del result["entry_ids"]
+    output = json.dumps({
+        "mailbox_size": args.size,
+        "round_trip_us": args.round_trip_us,
+        "server_us": args.server_us,
+        "results": results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Cold-start import cost of the entry point and pipeline (``python -X importtime``).
+
+Each scenario imports a set of modules in a fresh interpreter, several times,
+and reports the median total import time, the median process wall time and
+the top-level modules with the largest cumulative cost. Times are relative
+to a bare interpreter (``baseline``), so they show what the briefing adds.
+
+Scenarios:
+    entry     ``run_summary`` at module level: all that runs before the
+              scheduler guard decides whether to exit
+    trigger   the ``--trigger`` client (``briefing.daemon``)
+    pipeline  everything a briefing needs (collector, prioritiser, renderer...)
+    ai        the Anthropic SDK, loaded only when ai_analysis is enabled
+    outlook   pywin32 via ``briefing.outlook_client`` (Windows only)
+
+Scenarios whose imports fail (SDK or pywin32 not installed) are reported as
+skipped. ``heavy_modules`` lists the notable modules each scenario touched;
+``-X importtime`` also logs imports that failed, so an optional dependency
+that is tried but missing still shows up. ``--entry-budget-ms`` exits non-zero if ``entry`` exceeds it, so the
+script can guard against a heavy import creeping back into the entry point.
+
+Usage:
+    python benchmarks/bench_import_time.py --repeat 5 --output imports.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+SCENARIOS = {
+    "baseline": "pass",
+    "entry": "import run_summary",
+    "trigger": "import briefing.daemon",
+    "pipeline": "import briefing.pipeline, briefing.backends",
+    "ai": "import anthropic",
+    "outlook": "import briefing.outlook_client",
+}
+
+# Modules worth calling out when they show up in a scenario
+HEAVY_MODULES = ("win32com", "pythoncom", "jinja2", "tzlocal", "yaml", "numpy", "anthropic", "asyncio")
+
+
+def parse_importtime(stderr: str) -> Tuple[int, List[Tuple[str, int]], set]:
+    """Total self time (us), top-level (name, cumulative us) pairs and all module names."""
+    total = 0
+    top_level = []
+    names = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        total += int(self_us)
+        names.add(name.strip())
+        if not name.startswith("  "):  # one leading space precedes every name
+            top_level.append((name.strip(), int(cumulative_us)))
+    return total, top_level, names
+
+
+def run_once(statement: str) -> Optional[Tuple[float, int, List[Tuple[str, int]], set]]:
+    env = dict(os.environ, PYTHONPATH=SRC_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                          env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        return None
+    total, top_level, names = parse_importtime(proc.stderr)
+    return wall, total, top_level, names
+
+
+def measure(statement: str, repeat: int, top: int) -> Dict:
+    runs = []
+    for _ in range(repeat):
+        result = run_once(statement)
+        if result is None:
+            return {"skipped": True}
+        runs.append(result)
+
+    # The fastest run's module breakdown is the least disturbed by noise
+    fastest = min(runs, key=lambda run: run[1])
+    return {
+        "import_ms": round(statistics.median(run[1] for run in runs) / 1000, 2),
+        "wall_ms": round(statistics.median(run[0] for run in runs) * 1000, 2),
+        "top_modules": [[name, round(us / 1000, 2)]
+                        for name, us in sorted(fastest[2], key=lambda pair: -pair[1])[:top]],
+        "heavy_modules": sorted(name for name in fastest[3] if name in HEAVY_MODULES),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import cost")
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per scenario')
+    parser.add_argument('--top', type=int, default=8, help='Top-level modules to list per scenario')
+    parser.add_argument('--scenarios', type=str, default=",".join(SCENARIOS), help='Comma-separated subset')
+    parser.add_argument('--entry-budget-ms', type=float, help='Fail if entry import time exceeds this')
+    parser.add_argument('--output', type=str, help='Write JSON results here (default: stdout)')
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    order = ["baseline"] + [name for name in names if name != "baseline"]
+    results = {name: measure(SCENARIOS[name], args.repeat, args.top) for name in order}
+
+    baseline = results.get("baseline", {})
+    for name, result in results.items():
+        if name != "baseline" and not result.get("skipped") and baseline:
+            result["import_ms_over_baseline"] = round(result["import_ms"] - baseline["import_ms"], 2)
+            result["wall_ms_over_baseline"] = round(result["wall_ms"] - baseline["wall_ms"], 2)
+
+    output = json.dumps({"python": sys.version.split()[0], "repeat": args.repeat, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    entry = results.get("entry", {})
+    if args.entry_budget_ms is not None and entry and not entry.get("skipped"):
+        over = entry["import_ms_over_baseline"]
+        if over > args.entry_budget_ms:
+            sys.exit(f"entry import cost {over} ms exceeds budget {args.entry_budget_ms} ms")
+
+
+if __name__ == "__main__":
+    main()
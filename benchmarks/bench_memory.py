@@ -0,0 +1,88 @@
+"""Memory footprint of EmailItem vs CompactEmailItem.
+
+Fills a temporary snapshot store from a synthetic mailbox, then loads every
+item back with ``SnapshotStore(compact=False)`` and ``compact=True`` and
+reports the memory retained by each list (traced with tracemalloc) plus the
+bytes per item. Items are prioritised after loading so label fields hold
+realistic values.
+
+Usage:
+    python benchmarks/bench_memory.py --size 100000 --output memory.json
+"""
+import os
+import sys
+import gc
+import json
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from briefing.backends import FixtureBackend
+from briefing.collector import EmailCollector
+from briefing.prioritiser import EmailPrioritiser
+from briefing.snapshot_store import SnapshotStore
+from synthetic_mailbox import MailboxSpec, generate_records, benchmark_config
+
+
+def measure_load(db_path: str, compact: bool, config) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    with SnapshotStore(db_path, compact=compact) as store:
+        items = store.query()
+    EmailPrioritiser(config).prioritise_and_group(items)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    count = len(items)
+    retained -= before
+    return {
+        "item_class": type(items[0]).__name__ if items else None,
+        "items": count,
+        "retained_bytes": retained,
+        "peak_bytes": peak - before,
+        "bytes_per_item": round(retained / count, 1) if count else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare EmailItem and CompactEmailItem memory use")
+    parser.add_argument('--size', type=int, default=100000, help='Synthetic mailbox size')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', type=str, help='Write JSON results here (default: stdout)')
+    args = parser.parse_args()
+
+    spec = MailboxSpec(size=args.size, seed=args.seed, flag_ratio=1.0)
+    config = benchmark_config(spec)
+    backend = FixtureBackend(records=list(generate_records(spec)))
+    backend.connect()
+    emails = EmailCollector(backend).collect_all(config)["inbox"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "snapshot.db")
+        with SnapshotStore(db_path) as store:
+            store.upsert_items(emails)
+        del emails, backend
+        # Measure in fresh lists; each load only holds its own items
+        results = [measure_load(db_path, False, config), measure_load(db_path, True, config)]
+
+    plain, compact = results
+    reduction = 1 - compact["retained_bytes"] / plain["retained_bytes"] if plain["retained_bytes"] else None
+    output = json.dumps({
+        "mailbox_size": args.size,
+        "results": results,
+        "retained_reduction": round(reduction, 3) if reduction is not None else None,
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""End-to-end pipeline benchmark on synthetic mailboxes.
+
+Times each stage (collect, prioritise, analyze, render) against a
+FixtureBackend, recording wall time, peak traced memory and items/sec, and
+writes the results as JSON so runs can be compared between releases.
+
+The analyze stage uses a stub Anthropic client (``--ai-latency-ms`` adds a
+simulated per-call delay), so no network access or API key is needed.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 1000,10000,100000 --output bench.json
+"""
+import os
+import sys
+import gc
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+import subprocess
+from datetime import datetime
+from typing import Dict, Any, List, Callable, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from briefing.backends import FixtureBackend
+from briefing.collector import EmailCollector
+from briefing.prioritiser import EmailPrioritiser
+from briefing.ai_analyzer import EmailAnalyzer
+from synthetic_mailbox import MailboxSpec, generate_records, benchmark_config
+
+
+class _StubContent:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _StubResponse:
+    def __init__(self, text: str):
+        self.content = [_StubContent(text)]
+
+
+class StubMessages:
+    """Stands in for ``Anthropic().messages``; returns a canned analysis."""
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+
+    def create(self, **kwargs) -> _StubResponse:
+        self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return _StubResponse("SUMMARY: Customer needs a revised delivery date confirmed this week.\n"
+                             "ACTION: Confirm revised delivery date\n"
+                             "URGENCY: High")
+
+
+class StubClient:
+    def __init__(self, latency_seconds: float = 0.0):
+        self.messages = StubMessages(latency_seconds)
+
+
+def _measure(stage: Callable[[], Any], items: int) -> Tuple[Any, Dict[str, Any]]:
+    gc.collect()
+    tracemalloc.reset_peak()
+    start_current, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    result = stage()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    return result, {
+        "seconds": round(seconds, 6),
+        "peak_bytes": max(0, peak - start_current),
+        "items": items,
+        "items_per_sec": round(items / seconds, 1) if seconds > 0 else None,
+    }
+
+
+def stub_analyzer(config: Dict[str, Any], latency_seconds: float) -> EmailAnalyzer:
+    analyzer = EmailAnalyzer(config)
+    analyzer.enabled = True
+    analyzer.client = StubClient(latency_seconds)
+    analyzer.model = "stub"
+    return analyzer
+
+
+def run_size(size: int, seed: int, ai_latency_ms: float, analyze_limit: int) -> Dict[str, Any]:
+    spec = MailboxSpec(size=size, seed=seed)
+    config = benchmark_config(spec)
+    records = list(generate_records(spec))
+    stages: Dict[str, Any] = {}
+
+    backend, stages["load_fixture"] = _measure(lambda: FixtureBackend(records=records), size)
+    backend.connect()
+    del records
+
+    collector = EmailCollector(backend)
+    collected, stages["collect"] = _measure(lambda: collector.collect_all(config), size)
+    emails = collected.get("inbox", [])
+
+    prioritiser = EmailPrioritiser(config)
+    grouped, stages["prioritise"] = _measure(lambda: prioritiser.prioritise_and_group(emails), len(emails))
+
+    to_analyze = emails[:analyze_limit] if analyze_limit else emails
+    analyzer = stub_analyzer(config, ai_latency_ms / 1000.0)
+    _, stages["analyze"] = _measure(lambda: analyzer.analyze_batch(to_analyze), len(to_analyze))
+    stages["analyze"]["api_calls"] = analyzer.client.messages.calls
+
+    try:
+        from briefing.renderer import ReportRenderer
+    except ImportError as e:
+        stages["render"] = {"skipped": f"renderer unavailable: {e}"}
+    else:
+        renderer = ReportRenderer(config=config)
+        html, stages["render"] = _measure(lambda: renderer.render_report(grouped, config, "morning"), len(emails))
+        stages["render"]["report_bytes"] = len(html.encode("utf-8"))
+
+    total = sum(stage.get("seconds", 0) for stage in stages.values())
+    return {"size": size, "collected": len(emails), "total_seconds": round(total, 6), "stages": stages}
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except Exception:
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the briefing pipeline on synthetic mailboxes")
+    parser.add_argument('--sizes', type=str, default="1000,10000", help='Comma-separated mailbox sizes')
+    parser.add_argument('--seed', type=int, default=42, help='Generator seed')
+    parser.add_argument('--ai-latency-ms', type=float, default=0.0, help='Simulated latency per AI call')
+    parser.add_argument('--analyze-limit', type=int, default=200,
+                        help='Max emails passed to the analyze stage (0 = all)')
+    parser.add_argument('--output', type=str, help='Write JSON results here (default: stdout)')
+    args = parser.parse_args()
+
+    sizes: List[int] = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    tracemalloc.start()
+    results = [run_size(size, args.seed, args.ai_latency_ms, args.analyze_limit) for size in sizes]
+    tracemalloc.stop()
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "ai_latency_ms": args.ai_latency_ms,
+        "results": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"Benchmark results written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
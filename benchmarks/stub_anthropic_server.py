@@ -0,0 +1,175 @@
+"""Local stand-in for the Anthropic Messages API.
+
+Answers ``POST /v1/messages`` with a canned BLUF analysis after an optional
+delay, and fakes the Message Batches endpoints (create, retrieve, results,
+cancel) with batches that end ``batch_latency_seconds`` after creation. This
+lets the analyzer's sync, async and batch paths run without network access.
+Point the analyzer at it with ``ai_analysis.base_url``.
+
+Usage:
+    python benchmarks/stub_anthropic_server.py --port 8765 --latency-ms 500
+"""
+import json
+import time
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Tuple
+
+CANNED_TEXT = ("SUMMARY: Customer needs a revised delivery date confirmed this week.\n"
+               "ACTION: Confirm revised delivery date\n"
+               "URGENCY: High")
+
+
+class StubAnthropicHandler(BaseHTTPRequestHandler):
+    # Set on the server instance: latency_seconds, batch_latency_seconds,
+    # request_count, batches, lock
+    def _send_json(self, status: int, body: dict):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _not_found(self):
+        self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+
+    def do_POST(self):
+        path = self.path.split("?")[0].rstrip("/")
+        if path == "/v1/messages":
+            request = self._read_json()
+            with self.server.lock:
+                self.server.request_count += 1
+            if self.server.latency_seconds:
+                time.sleep(self.server.latency_seconds)
+            self._send_json(200, message_response(request.get("model", "stub"), CANNED_TEXT))
+        elif path == "/v1/messages/batches":
+            request = self._read_json()
+            batch_id = f"msgbatch_stub_{time.time_ns()}"
+            with self.server.lock:
+                self.server.batches[batch_id] = {
+                    "requests": request.get("requests", []),
+                    "created": time.time(),
+                    "canceled": False,
+                }
+            self._send_json(200, self._batch_object(batch_id))
+        elif path.startswith("/v1/messages/batches/") and path.endswith("/cancel"):
+            batch_id = path.split("/")[4]
+            if batch_id not in self.server.batches:
+                self._not_found()
+                return
+            self.server.batches[batch_id]["canceled"] = True
+            self._send_json(200, self._batch_object(batch_id))
+        else:
+            self._not_found()
+
+    def do_GET(self):
+        parts = self.path.split("?")[0].rstrip("/").split("/")
+        # ["", "v1", "messages", "batches", id, ("results")]
+        if len(parts) < 5 or parts[1:4] != ["v1", "messages", "batches"] or parts[4] not in self.server.batches:
+            self._not_found()
+            return
+
+        batch_id = parts[4]
+        if len(parts) == 5:
+            self._send_json(200, self._batch_object(batch_id))
+        elif len(parts) == 6 and parts[5] == "results":
+            batch = self.server.batches[batch_id]
+            lines = []
+            for request in batch["requests"]:
+                if batch["canceled"]:
+                    result = {"type": "canceled"}
+                else:
+                    model = request.get("params", {}).get("model", "stub")
+                    result = {"type": "succeeded", "message": message_response(model, CANNED_TEXT)}
+                lines.append(json.dumps({"custom_id": request.get("custom_id"), "result": result}))
+            payload = ("\n".join(lines) + "\n").encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/binary")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        else:
+            self._not_found()
+
+    def _batch_object(self, batch_id: str) -> dict:
+        batch = self.server.batches[batch_id]
+        count = len(batch["requests"])
+        ended = batch["canceled"] or time.time() - batch["created"] >= self.server.batch_latency_seconds
+        host, port = self.server.server_address
+        created = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(batch["created"]))
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else count,
+                "succeeded": count if ended and not batch["canceled"] else 0,
+                "errored": 0,
+                "canceled": count if batch["canceled"] else 0,
+                "expired": 0,
+            },
+            "created_at": created,
+            "expires_at": created,
+            "ended_at": created if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": created if batch["canceled"] else None,
+            "results_url": f"http://{host}:{port}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def log_message(self, format, *args):
+        pass
+
+
+def message_response(model: str, text: str) -> dict:
+    return {
+        "id": f"msg_stub_{time.time_ns()}",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": 200, "output_tokens": 60},
+    }
+
+
+def start_stub_server(port: int = 0, latency_seconds: float = 0.0, batch_latency_seconds: float = 0.0,
+                      handler=StubAnthropicHandler) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the stub in a daemon thread. Returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    server.latency_seconds = latency_seconds
+    server.batch_latency_seconds = batch_latency_seconds
+    server.request_count = 0
+    server.batches = {}
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, bound_port = server.server_address
+    return server, f"http://{host}:{bound_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local stub of the Anthropic Messages API")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--batch-latency-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.port, args.latency_ms / 1000.0, args.batch_latency_ms / 1000.0)
+    print(f"Stub Anthropic API listening on {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Deterministic synthetic mailbox generator.
+
+Produces fixture records for ``briefing.backends.FixtureBackend``. The same
+``MailboxSpec`` (including ``seed``) always yields the same records, with
+received times laid out relative to ``reference_time``.
+
+Usage:
+    python benchmarks/synthetic_mailbox.py --size 10000 --output fixtures/mailbox.jsonl
+"""
+import os
+import sys
+import random
+import argparse
+from dataclasses import dataclass, asdict, field
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Iterator
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from briefing.backends import write_fixture
+
+KEYWORDS = ["urgent", "ASAP", "tender", "proposal", "invoice", "payment",
+            "contract", "agreement", "pricing", "quote", "meeting"]
+
+WORDS = ("please review the attached update regarding our shipment schedule and "
+         "confirm the revised delivery dates for next week as discussed with the team "
+         "lubricant order volume forecast customer site visit report numbers").split()
+
+FIRST_NAMES = ["alex", "sam", "jordan", "taylor", "morgan", "casey", "jamie", "riley",
+               "drew", "quinn", "avery", "parker"]
+
+
+@dataclass
+class MailboxSpec:
+    size: int = 1000
+    seed: int = 42
+    domains: int = 50
+    senders_per_domain: int = 8
+    domain_skew: float = 1.2          # Zipf exponent; higher = a few domains dominate
+    flag_ratio: float = 0.3
+    unread_ratio: float = 0.4
+    keyword_hit_rate: float = 0.15
+    body_min_chars: int = 80
+    body_max_chars: int = 4000
+    lookback_days: int = 31
+    high_importance_ratio: float = 0.1
+    attachment_ratio: float = 0.2
+    exchange_dn_ratio: float = 0.1    # Share of senders with an Exchange DN address
+    reference_time: datetime = field(default_factory=lambda: datetime.now().replace(microsecond=0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["reference_time"] = self.reference_time.isoformat()
+        return data
+
+
+def domain_names(spec: MailboxSpec) -> List[str]:
+    return [f"domain{i:03d}.example" for i in range(spec.domains)]
+
+
+def _text(rng: random.Random, length: int) -> str:
+    words = []
+    total = 0
+    while total < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        total += len(word) + 1
+    return " ".join(words)[:length]
+
+
+def generate_records(spec: MailboxSpec) -> Iterator[Dict[str, Any]]:
+    """Yield ``spec.size`` inbox fixture records, newest first."""
+    rng = random.Random(spec.seed)
+    domains = domain_names(spec)
+    weights = [1.0 / ((rank + 1) ** spec.domain_skew) for rank in range(len(domains))]
+    window_seconds = spec.lookback_days * 86400
+
+    for index in range(spec.size):
+        domain = rng.choices(domains, weights=weights)[0]
+        sender = f"{rng.choice(FIRST_NAMES)}{rng.randrange(spec.senders_per_domain)}"
+        sender_email = f"{sender}@{domain}"
+        sender_smtp = ""
+        if rng.random() < spec.exchange_dn_ratio:
+            sender_smtp = sender_email
+            sender_email = f"/O=EXCHANGELABS/OU=EXCHANGE ADMINISTRATIVE GROUP/CN=RECIPIENTS/CN={sender.upper()}"
+
+        subject = _text(rng, rng.randint(20, 70))
+        body = _text(rng, rng.randint(spec.body_min_chars, spec.body_max_chars))
+        if rng.random() < spec.keyword_hit_rate:
+            keyword = rng.choice(KEYWORDS)
+            if rng.random() < 0.5:
+                subject = f"{keyword.title()}: {subject}"
+            else:
+                body = f"{keyword} {body}"
+
+        received = spec.reference_time - timedelta(seconds=int(window_seconds * index / max(spec.size, 1)))
+        yield {
+            "folder": "Inbox",
+            "entry_id": f"{spec.seed:04X}{index:012X}",
+            "subject": subject,
+            "sender_name": sender.title(),
+            "sender_email": sender_email,
+            "sender_smtp": sender_smtp,
+            "received_time": received.isoformat(),
+            "importance": 2 if rng.random() < spec.high_importance_ratio else 1,
+            "flag_status": 2 if rng.random() < spec.flag_ratio else 0,
+            "unread": rng.random() < spec.unread_ratio,
+            "attachment_count": rng.randint(1, 3) if rng.random() < spec.attachment_ratio else 0,
+            "body": body,
+            "categories": "",
+        }
+
+
+def benchmark_config(spec: MailboxSpec) -> Dict[str, Any]:
+    """A briefing config whose VIP lists and rules hit the generated mailbox."""
+    domains = domain_names(spec)
+    return {
+        "report": {"to": "me@domain000.example", "max_items_per_day": 50},
+        "behaviour": {"lookback_days_inbox": spec.lookback_days},
+        "priorities": {
+            "vip_domains": domains[:3],
+            "vip_senders": [f"alex0@{domains[0]}", f"sam1@{domains[1]}"],
+            "ignore_domains": domains[-2:],
+            "downrank_domains": domains[3:5],
+            "keyword_rules": [
+                {"pattern": "(?i)\\burgent\\b|\\bASAP\\b|\\bimmediate\\b", "priority": "critical", "suggest": "Reply today"},
+                {"pattern": "(?i)\\btender\\b|\\bRFP\\b|\\bproposal\\b", "priority": "critical", "suggest": "Review tender requirements"},
+                {"pattern": "(?i)\\binvoice\\b|\\bpayment\\b", "priority": "high", "suggest": "Review and process"},
+                {"pattern": "(?i)\\bcontract\\b|\\bagreement\\b", "priority": "high", "suggest": "Review contract terms"},
+                {"pattern": "(?i)\\bpricing\\b|\\bquote\\b", "priority": "high", "suggest": "Prepare pricing response"},
+                {"pattern": "(?i)\\bmeeting\\b|\\bcalendar\\b|\\binvite\\b", "priority": "high", "suggest": "Confirm or propose time"},
+            ],
+        },
+        "ai_analysis": {"enabled": False, "analyze_criteria": "flagged_or_vip"},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic mailbox fixture (JSONL)")
+    parser.add_argument('--size', type=int, default=1000, help='Number of inbox items')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--flag-ratio', type=float, default=0.3)
+    parser.add_argument('--unread-ratio', type=float, default=0.4)
+    parser.add_argument('--keyword-hit-rate', type=float, default=0.15)
+    parser.add_argument('--output', type=str, required=True, help='Destination JSONL file')
+    args = parser.parse_args()
+
+    spec = MailboxSpec(size=args.size, seed=args.seed, flag_ratio=args.flag_ratio,
+                       unread_ratio=args.unread_ratio, keyword_hit_rate=args.keyword_hit_rate)
+    count = write_fixture(generate_records(spec), args.output)
+    print(f"Wrote {count} records to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,40 @@
 import os
+import re
+import json
+import time
 import logging
-from typing import Dict, Any, Optional
-from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Set, Tuple
+from dataclasses import dataclass, asdict
+
+from .ai_cache import AnalysisCache, content_key
+from .instrumentation import metrics
 
 logger = logging.getLogger(__name__)
 
-try:
-    from anthropic import Anthropic
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
-    logger.warning("Anthropic SDK not installed. AI analysis will be disabled.")
+# The Anthropic SDK (and asyncio) are imported on first use, only when AI
+# analysis is enabled, so briefings without it don't pay for the import.
+_anthropic = None
+
+
+def load_anthropic():
+    """Return the ``anthropic`` module, importing it on the first call; None if not installed."""
+    global _anthropic
+    if _anthropic is None:
+        try:
+            import anthropic
+        except ImportError:
+            logger.warning("Anthropic SDK not installed. AI analysis will be disabled.")
+            anthropic = False
+        _anthropic = anthropic
+    return _anthropic or None
+
+# Bump whenever _build_prompt changes meaningfully so cached results are not reused
+PROMPT_VERSION = "bluf-v1"
+# Which prompt produced a result; part of the cache key so modes never share answers
+PROMPT_SINGLE = "single"
+PROMPT_PACKED = "packed"
+
+URGENCY_LEVELS = ("Critical", "High", "Medium")
 
 
 @dataclass
@@ -31,22 +55,45 @@ class EmailAnalyzer:
         self.ai_config = config.get('ai_analysis', {})
         self.enabled = self.ai_config.get('enabled', False)
         self.client = None
+        self.model = self.ai_config.get('model', 'claude-3-5-sonnet-20241022')
+        self.cache = None
+        self.api_key = None
+        self.base_url = self.ai_config.get('base_url')  # None = SDK default endpoint
+        self.concurrency = max(1, int(self.ai_config.get('concurrency', 1)))
+        self.request_timeout = self.ai_config.get('request_timeout', 60)
+        self.batch_config = self.ai_config.get('batch', {})
+        self.pack_size = max(1, int(self.ai_config.get('pack_size', 1)))
 
-        if self.enabled and ANTHROPIC_AVAILABLE:
+        sdk = load_anthropic() if self.enabled else None
+        if self.enabled and sdk:
             api_key_env = self.ai_config.get('api_key_env', 'ANTHROPIC_API_KEY')
             api_key = os.environ.get(api_key_env)
 
             if api_key:
-                self.client = Anthropic(api_key=api_key)
-                self.model = self.ai_config.get('model', 'claude-3-5-sonnet-20241022')
+                self.api_key = api_key
+                self.client = sdk.Anthropic(api_key=api_key, base_url=self.base_url)
                 logger.info(f"AI analyzer initialized with model: {self.model}")
             else:
                 logger.warning(f"AI analysis enabled but {api_key_env} environment variable not set")
                 self.enabled = False
-        elif self.enabled and not ANTHROPIC_AVAILABLE:
+        elif self.enabled:
             logger.error("AI analysis enabled but Anthropic SDK not available")
             self.enabled = False
 
+        cache_config = self.ai_config.get('cache', {})
+        if self.enabled and cache_config.get('enabled', False):
+            self.cache = AnalysisCache(
+                cache_config.get('path', 'state/ai_cache.db'),
+                ttl_days=cache_config.get('ttl_days', 30),
+                max_entries=cache_config.get('max_entries', 5000)
+            )
+
+    def close(self):
+        """Release the result cache's database connection."""
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+
     def is_enabled(self) -> bool:
         """Check if AI analysis is enabled and available."""
         return self.enabled and self.client is not None
@@ -90,21 +137,10 @@ class EmailAnalyzer:
             )
 
         try:
-            # Build the analysis prompt
-            prompt = self._build_prompt(email_item)
-
             # Call Anthropic API
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=300,  # Increased for longer summaries (30-40 words)
-                temperature=0.3,  # Lower temperature for more consistent analysis
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
+            metrics().count("api.requests")
+            with metrics().timer("api.request_seconds"):
+                response = self.client.messages.create(**self._message_params(email_item))
 
             # Parse response
             result_text = response.content[0].text
@@ -120,6 +156,78 @@ class EmailAnalyzer:
                 error_message=str(e)
             )
 
+    async def analyze_email_async(self, client, email_item) -> AIAnalysisResult:
+        """Async counterpart of analyze_email using an AsyncAnthropic client.
+
+        The request is abandoned after ``request_timeout`` seconds.
+        """
+        import asyncio
+        try:
+            metrics().count("api.requests")
+            with metrics().timer("api.request_seconds"):
+                response = await asyncio.wait_for(
+                    client.messages.create(**self._message_params(email_item)),
+                    timeout=self.request_timeout
+                )
+            return self._parse_response(response.content[0].text)
+        except asyncio.TimeoutError:
+            logger.error(f"AI analysis timed out after {self.request_timeout}s for email '{email_item.subject}'")
+            return AIAnalysisResult(
+                summary="",
+                recommended_action="",
+                urgency_level="",
+                success=False,
+                error_message=f"Timed out after {self.request_timeout}s"
+            )
+        except Exception as e:
+            logger.error(f"AI analysis failed for email '{email_item.subject}': {e}")
+            return AIAnalysisResult(
+                summary="",
+                recommended_action="",
+                urgency_level="",
+                success=False,
+                error_message=str(e)
+            )
+
+    async def analyze_batch_async(self, email_items: list, client=None) -> Dict[str, AIAnalysisResult]:
+        """Analyze emails concurrently, at most ``concurrency`` requests in flight.
+
+        Every email passed in is analyzed (no should_analyze or cache checks).
+        Returns dict mapping entry_id to AIAnalysisResult in input order.
+        """
+        import asyncio
+        owns_client = client is None
+        if owns_client:
+            client = load_anthropic().AsyncAnthropic(api_key=self.api_key, base_url=self.base_url)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(email_item) -> AIAnalysisResult:
+            async with semaphore:
+                logger.info(f"Analyzing email: {email_item.subject[:50]}")
+                return await self.analyze_email_async(client, email_item)
+
+        try:
+            results = await asyncio.gather(*(bounded(email) for email in email_items))
+        finally:
+            if owns_client:
+                await client.close()
+
+        return {email.entry_id: result for email, result in zip(email_items, results)}
+
+    def _message_params(self, email_item) -> Dict[str, Any]:
+        """Keyword arguments for messages.create for one email."""
+        return {
+            "model": self.model,
+            "max_tokens": 300,  # Increased for longer summaries (30-40 words)
+            "temperature": 0.3,  # Lower temperature for more consistent analysis
+            "messages": [
+                {
+                    "role": "user",
+                    "content": self._build_prompt(email_item)
+                }
+            ]
+        }
+
     def _build_prompt(self, email_item) -> str:
         """Build the analysis prompt for Claude using BLUF methodology."""
         return f"""Analyze this flagged business email using BLUF (Bottom Line Up Front) methodology.
@@ -164,21 +272,298 @@ URGENCY: [Critical/High/Medium]"""
             success=True
         )
 
+    def _build_packed_prompt(self, email_items: list) -> str:
+        """Build one BLUF prompt covering several emails, identified E1..EN."""
+        blocks = []
+        for index, email_item in enumerate(email_items, start=1):
+            blocks.append(f"""[E{index}]
+From: {email_item.sender_name} <{email_item.sender_email}>
+Subject: {email_item.subject}
+Preview: {email_item.body_preview}""")
+        emails_text = "\n\n".join(blocks)
+
+        return f"""Analyze each of these {len(email_items)} flagged business emails using BLUF (Bottom Line Up Front) methodology.
+
+For each email provide a 30-40 word BLUF summary that:
+- States the most critical information FIRST
+- Answers: What is this about and why does it matter?
+- Uses clear, direct, actionable language
+- Focuses on what the recipient needs to know immediately
+
+Emails:
+
+{emails_text}
+
+Respond with JSON only, no other text, in this exact shape with one entry per email:
+{{"results": [{{"id": "E1", "summary": "30-40 word BLUF summary", "action": "max 8 word recommended action", "urgency": "Critical|High|Medium"}}]}}"""
+
+    def _parse_packed_response(self, response_text: str, email_items: list) -> Dict[str, AIAnalysisResult]:
+        """Split a packed JSON response into per-email results keyed by entry_id.
+
+        Tolerates code fences and text around the JSON object. Entries with an
+        unknown or duplicate id, or without a summary, are dropped so the
+        caller can retry those emails individually.
+        """
+        text = response_text.strip()
+        fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+        if fenced:
+            text = fenced.group(1)
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            logger.warning("Packed AI response contained no JSON object")
+            return {}
+
+        try:
+            data = json.loads(text[start:end + 1])
+        except ValueError as e:
+            logger.warning(f"Packed AI response was not valid JSON: {e}")
+            return {}
+
+        entries = data.get("results", []) if isinstance(data, dict) else []
+        by_id = {f"E{index}": email for index, email in enumerate(email_items, start=1)}
+        results = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            email = by_id.get(str(entry.get("id", "")).strip().strip("[]"))
+            summary = str(entry.get("summary") or "").strip()
+            if email is None or email.entry_id in results or not summary:
+                continue
+            urgency = str(entry.get("urgency") or "").strip().title()
+            results[email.entry_id] = AIAnalysisResult(
+                summary=summary,
+                recommended_action=str(entry.get("action") or "").strip(),
+                urgency_level=urgency if urgency in URGENCY_LEVELS else "Medium",
+                success=True
+            )
+        return results
+
+    def _packed_params(self, email_items: list) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "max_tokens": min(300 * len(email_items), 4096),
+            "temperature": 0.3,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": self._build_packed_prompt(email_items)
+                }
+            ]
+        }
+
+    def _chunks(self, email_items: list) -> List[list]:
+        return [email_items[i:i + self.pack_size] for i in range(0, len(email_items), self.pack_size)]
+
+    def analyze_packed(self, email_items: list) -> Dict[str, AIAnalysisResult]:
+        """Analyze emails ``pack_size`` per request. Failed or missing emails are omitted."""
+        chunks = self._chunks(email_items)
+        if self.concurrency > 1 and load_anthropic():
+            import asyncio
+            return asyncio.run(self.analyze_packed_async(chunks))
+
+        results = {}
+        for chunk in chunks:
+            try:
+                logger.info(f"Analyzing {len(chunk)} emails in one packed request")
+                metrics().count("api.requests")
+                with metrics().timer("api.request_seconds"):
+                    response = self.client.messages.create(**self._packed_params(chunk))
+                results.update(self._parse_packed_response(response.content[0].text, chunk))
+            except Exception as e:
+                logger.error(f"Packed AI analysis failed for {len(chunk)} emails: {e}")
+        return results
+
+    async def analyze_packed_async(self, chunks: List[list], client=None) -> Dict[str, AIAnalysisResult]:
+        """Send packed requests concurrently, at most ``concurrency`` in flight."""
+        import asyncio
+        owns_client = client is None
+        if owns_client:
+            client = load_anthropic().AsyncAnthropic(api_key=self.api_key, base_url=self.base_url)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(chunk) -> Dict[str, AIAnalysisResult]:
+            async with semaphore:
+                try:
+                    logger.info(f"Analyzing {len(chunk)} emails in one packed request")
+                    metrics().count("api.requests")
+                    with metrics().timer("api.request_seconds"):
+                        response = await asyncio.wait_for(client.messages.create(**self._packed_params(chunk)),
+                                                          timeout=self.request_timeout)
+                    return self._parse_packed_response(response.content[0].text, chunk)
+                except asyncio.TimeoutError:
+                    logger.error(f"Packed AI analysis timed out after {self.request_timeout}s")
+                except Exception as e:
+                    logger.error(f"Packed AI analysis failed for {len(chunk)} emails: {e}")
+                return {}
+
+        try:
+            chunk_results = await asyncio.gather(*(bounded(chunk) for chunk in chunks))
+        finally:
+            if owns_client:
+                await client.close()
+
+        results = {}
+        for chunk_result in chunk_results:
+            results.update(chunk_result)
+        return results
+
     def analyze_batch(self, email_items: list) -> Dict[str, AIAnalysisResult]:
         """
         Analyze multiple emails in batch.
 
         Returns dict mapping entry_id to AIAnalysisResult.
         """
-        results = {}
-
+        qualifying = []
         for email in email_items:
             if self.should_analyze(email):
-                logger.info(f"Analyzing email: {email.subject[:50]}")
-                result = self.analyze_email(email)
-                results[email.entry_id] = result
+                qualifying.append(email)
             else:
                 logger.debug(f"Skipping AI analysis for: {email.subject[:50]}")
 
-        logger.info(f"AI analyzed {len(results)} emails")
+        cached = {}
+        pending = []
+        for email in qualifying:
+            result = self._cached_result(email)
+            if result is not None:
+                metrics().count("api.cache_hits")
+                cached[email.entry_id] = result
+            else:
+                pending.append(email)
+
+        if self.cache is not None:
+            metrics().count("api.cache_misses", len(pending))
+        fresh = {}
+        if pending:
+            packed_ids = set()
+            if self._use_batch_api(pending):
+                fresh = self.analyze_via_batch_api(pending)
+
+            # Anything the batch did not return successfully goes through direct calls
+            stragglers = [email for email in pending
+                          if email.entry_id not in fresh or not fresh[email.entry_id].success]
+            if stragglers:
+                direct, packed_ids = self._analyze_direct(stragglers)
+                fresh.update(direct)
+
+            for email in pending:
+                variant = PROMPT_PACKED if email.entry_id in packed_ids else PROMPT_SINGLE
+                self._store_result(email, fresh[email.entry_id], variant)
+
+        results = {email.entry_id: cached.get(email.entry_id) or fresh[email.entry_id] for email in qualifying}
+        logger.info(f"AI analyzed {len(results)} emails ({len(cached)} from cache)")
         return results
+
+    def _analyze_direct(self, email_items: list) -> Tuple[Dict[str, AIAnalysisResult], Set[str]]:
+        """Direct requests: packed when ``pack_size`` > 1, concurrent when ``concurrency`` > 1.
+
+        Emails a packed response did not cover are retried one per request.
+        Returns the results and the EntryIDs answered by the packed prompt.
+        """
+        results = {}
+        if self._prompt_variant() == PROMPT_PACKED and len(email_items) > 1:
+            results = self.analyze_packed(email_items)
+            email_items = [email for email in email_items if email.entry_id not in results]
+            if not email_items:
+                return results, set(results)
+            logger.info(f"Retrying {len(email_items)} emails missing from packed responses individually")
+        packed_ids = set(results)
+
+        if self.concurrency > 1 and load_anthropic():
+            logger.info(f"Analyzing {len(email_items)} emails with concurrency {self.concurrency}")
+            import asyncio
+            results.update(asyncio.run(self.analyze_batch_async(email_items)))
+            return results, packed_ids
+
+        for email in email_items:
+            logger.info(f"Analyzing email: {email.subject[:50]}")
+            results[email.entry_id] = self.analyze_email(email)
+        return results, packed_ids
+
+    def _use_batch_api(self, email_items: list) -> bool:
+        return (self.batch_config.get('enabled', False)
+                and len(email_items) >= self.batch_config.get('min_emails', 20))
+
+    def analyze_via_batch_api(self, email_items: list) -> Dict[str, AIAnalysisResult]:
+        """Submit all emails as one Message Batches job and collect the results.
+
+        Polls with exponential backoff (``poll_initial_seconds`` doubling up to
+        ``poll_max_seconds``) until the batch ends or ``max_wait_seconds``
+        passes, in which case it is cancelled. Returns results only for the
+        emails the batch answered; callers handle any stragglers.
+        """
+        batches = getattr(self.client.messages, 'batches', None)
+        if batches is None:
+            logger.warning("Installed Anthropic SDK has no Message Batches support; using direct calls")
+            return {}
+
+        # custom_id is limited to 64 chars of [A-Za-z0-9_-], so EntryIDs are mapped by position
+        by_custom_id = {f"email-{index}": email for index, email in enumerate(email_items)}
+        poll_interval = self.batch_config.get('poll_initial_seconds', 5)
+        poll_max = self.batch_config.get('poll_max_seconds', 60)
+        max_wait = self.batch_config.get('max_wait_seconds', 1800)
+
+        try:
+            metrics().count("api.batch_jobs")
+            batch = batches.create(requests=[
+                {"custom_id": custom_id, "params": self._message_params(email)}
+                for custom_id, email in by_custom_id.items()
+            ])
+            logger.info(f"Submitted AI batch {batch.id} with {len(by_custom_id)} emails")
+
+            deadline = time.monotonic() + max_wait
+            while batch.processing_status != "ended":
+                if time.monotonic() >= deadline:
+                    logger.warning(f"AI batch {batch.id} not finished after {max_wait}s, cancelling")
+                    batches.cancel(batch.id)
+                    return {}
+                time.sleep(poll_interval)
+                poll_interval = min(poll_interval * 2, poll_max)
+                metrics().count("api.batch_polls")
+                batch = batches.retrieve(batch.id)
+
+            results = {}
+            for entry in batches.results(batch.id):
+                email = by_custom_id.get(entry.custom_id)
+                if email is None:
+                    continue
+                if entry.result.type == "succeeded":
+                    results[email.entry_id] = self._parse_response(entry.result.message.content[0].text)
+                else:
+                    logger.warning(f"AI batch result {entry.result.type} for email '{email.subject[:50]}'")
+
+            logger.info(f"AI batch {batch.id} returned {len(results)} of {len(by_custom_id)} results")
+            return results
+
+        except Exception as e:
+            logger.error(f"AI batch analysis failed, falling back to direct calls: {e}")
+            return {}
+
+    def _prompt_variant(self) -> str:
+        """The prompt new analyses are asked with (packed stragglers fall back to single)."""
+        return PROMPT_PACKED if self.pack_size > 1 else PROMPT_SINGLE
+
+    def _lookup_variants(self) -> Tuple[str, ...]:
+        # Packed runs also store single-prompt results (stragglers, Message Batches),
+        # so they reuse those; single-prompt runs never take a packed answer
+        if self._prompt_variant() == PROMPT_PACKED:
+            return PROMPT_PACKED, PROMPT_SINGLE
+        return (PROMPT_SINGLE,)
+
+    def _cache_key(self, email_item, variant: str) -> str:
+        """Hash of everything that determines the analysis of an email."""
+        return content_key(self.model, PROMPT_VERSION, variant, email_item.sender_email,
+                           email_item.subject, email_item.body_preview)
+
+    def _cached_result(self, email_item) -> Optional[AIAnalysisResult]:
+        if self.cache is None:
+            return None
+        for variant in self._lookup_variants():
+            payload = self.cache.get(self._cache_key(email_item, variant))
+            if payload:
+                return AIAnalysisResult(**payload)
+        return None
+
+    def _store_result(self, email_item, result: AIAnalysisResult, variant: str = PROMPT_SINGLE):
+        # Only successful analyses are cached so failures are retried next run
+        if self.cache is not None and result.success:
+            self.cache.put(self._cache_key(email_item, variant), asdict(result))
@@ -0,0 +1,95 @@
+"""Persistent cache for AI analysis results.
+
+Entries are keyed by a content hash computed by the analyzer and stored in
+SQLite with a TTL. When the cache grows past ``max_entries`` the least
+recently used entries are evicted.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis_cache (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analysis_cache_access ON analysis_cache (last_access);
+"""
+
+
+def content_key(*parts: str) -> str:
+    """SHA-256 over the given strings, unambiguously delimited."""
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    def __init__(self, path: str, ttl_days: float = 30, max_entries: int = 5000):
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Only used from the thread running the briefing (async analysis shares its event loop thread)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached payload, or None if missing or expired."""
+        now = time.time()
+        row = self.conn.execute("SELECT payload, created_at FROM analysis_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        payload, created_at = row
+        with self.conn:
+            if now - created_at > self.ttl_seconds:
+                self.conn.execute("DELETE FROM analysis_cache WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE analysis_cache SET last_access = ? WHERE key = ?", (now, key))
+
+        self.hits += 1
+        return json.loads(payload)
+
+    def put(self, key: str, payload: Dict[str, Any]):
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO analysis_cache (key, payload, created_at, last_access) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET payload = excluded.payload, "
+                "created_at = excluded.created_at, last_access = excluded.last_access",
+                (key, json.dumps(payload), now, now)
+            )
+        self._evict()
+
+    def _evict(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM analysis_cache WHERE created_at < ?",
+                              (time.time() - self.ttl_seconds,))
+            count = self.conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+            excess = count - self.max_entries
+            if excess > 0:
+                self.conn.execute(
+                    "DELETE FROM analysis_cache WHERE key IN "
+                    "(SELECT key FROM analysis_cache ORDER BY last_access ASC LIMIT ?)", (excess,)
+                )
+                logger.debug(f"AI cache evicted {excess} least recently used entries")
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
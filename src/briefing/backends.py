@@ -0,0 +1,390 @@
+"""Mail backends consumed by EmailCollector and run_summary.
+
+``OutlookClient`` is the COM implementation. ``FixtureBackend`` serves mail
+from memory or a JSONL file so the pipeline can run (and be profiled) on
+machines without Outlook. Select one with the ``backend`` config section.
+"""
+import os
+import json
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Protocol, Iterable, Iterator, Tuple, ContextManager
+
+from .fake_outlook import FakeMailItem, FakeAppointmentItem, FakeTable
+from .mapi_table import read_table_rows, iter_table_rows, INBOX_TABLE_COLUMNS, PREVIEW_TABLE_COLUMNS
+from .folders import folder_label
+from .dasl import is_followup
+
+logger = logging.getLogger(__name__)
+
+
+class MailBackend(Protocol):
+    """Operations the briefing needs from a mail store."""
+
+    def connect(self) -> bool: ...
+
+    # flagged_only narrows the query to flagged mail (see OutlookClient._inbox_filter)
+    def get_inbox_items(self, lookback_days: int = 7, unread_or_flagged_only: bool = True,
+                        flagged_only: bool = False) -> List[Any]: ...
+
+    def get_inbox_rows(self, lookback_days: int = 7, unread_or_flagged_only: bool = True,
+                       flagged_only: bool = False) -> List[Dict[str, Any]]: ...
+
+    def iter_inbox_items(self, lookback_days: int = 7, unread_or_flagged_only: bool = True,
+                         flagged_only: bool = False) -> Iterator[Any]: ...
+
+    def iter_inbox_rows(self, lookback_days: int = 7, unread_or_flagged_only: bool = True,
+                        flagged_only: bool = False) -> Iterator[Dict[str, Any]]: ...
+
+    def get_modified_inbox_items(self, since: datetime) -> List[Any]: ...
+
+    def get_modified_inbox_rows(self, since: datetime) -> List[Dict[str, Any]]: ...
+
+    # Extra folders/stores (behaviour.folders); yield (folder label, item or row)
+    def iter_folder_items(self, store: str = "", path: str = "Inbox", recursive: bool = False,
+                          lookback_days: int = 7, flagged_only: bool = True) -> Iterator[Tuple[str, Any]]: ...
+
+    def iter_folder_rows(self, store: str = "", path: str = "Inbox", recursive: bool = False,
+                         lookback_days: int = 7, flagged_only: bool = True) -> Iterator[Tuple[str, Dict[str, Any]]]: ...
+
+    # EntryID -> 255-character preview column for the items iter_inbox_items yields
+    def get_inbox_previews(self, lookback_days: int = 7, flagged_only: bool = True) -> Dict[str, str]: ...
+
+    # Context manager giving a backend usable from the current worker thread
+    def worker(self) -> ContextManager["MailBackend"]: ...
+
+    # Re-open a mail item by EntryID (e.g. in a worker's own apartment)
+    def open_item(self, entry_id: str) -> Any: ...
+
+    def get_sent_items(self, lookback_days: int = 2) -> List[Any]: ...
+
+    def get_calendar_items(self, start_date: datetime = None, end_date: datetime = None) -> List[Any]: ...
+
+    def get_overdue_items(self, overdue_days: int = 30) -> List[Any]: ...
+
+    def get_overdue_rows(self, overdue_days: int = 30) -> List[Dict[str, Any]]: ...
+
+    def send_email(self, to: str, subject: str, html_body: str, attachments: List[str] = None): ...
+
+    def disconnect(self): ...
+
+
+def mail_item_from_record(record: Dict[str, Any]) -> FakeMailItem:
+    """Build a fake MailItem from one fixture record."""
+    return FakeMailItem(
+        entry_id=record["entry_id"],
+        subject=record.get("subject", ""),
+        sender_name=record.get("sender_name", ""),
+        sender_email=record.get("sender_email", ""),
+        received_time=datetime.fromisoformat(record["received_time"]),
+        importance=record.get("importance", 1),
+        flag_status=record.get("flag_status", 0),
+        unread=record.get("unread", False),
+        attachment_count=record.get("attachment_count", 0),
+        body=record.get("body", ""),
+        categories=record.get("categories", ""),
+        sender_smtp=record.get("sender_smtp", ""),
+        message_class=record.get("message_class", "IPM.Note"),
+        last_modified=datetime.fromisoformat(record["last_modified"]) if record.get("last_modified") else None,
+    )
+
+
+def appointment_from_record(record: Dict[str, Any]) -> FakeAppointmentItem:
+    """Build a fake AppointmentItem from one fixture record."""
+    start = datetime.fromisoformat(record["start"])
+    end = datetime.fromisoformat(record["end"]) if record.get("end") else start + timedelta(hours=1)
+    return FakeAppointmentItem(
+        entry_id=record["entry_id"],
+        subject=record.get("subject", ""),
+        start=start,
+        end=end,
+        location=record.get("location", ""),
+        organizer=record.get("organizer", ""),
+        all_day=record.get("all_day", False),
+        recurring=record.get("recurring", False),
+        attendees_count=record.get("attendees_count", 0),
+        response_status=record.get("response_status", 0),
+        body=record.get("body", ""),
+    )
+
+
+def load_fixture(path: str) -> List[Dict[str, Any]]:
+    """Read a JSONL fixture file into a list of records."""
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    return records
+
+
+def write_fixture(records: Iterable[Dict[str, Any]], path: str) -> int:
+    """Write records to a JSONL fixture file. Returns the number written."""
+    count = 0
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, default=str))
+            f.write("\n")
+            count += 1
+    return count
+
+
+class FixtureBackend:
+    """In-memory mail backend fed from fixture records.
+
+    Each record carries a ``folder`` of "Inbox" (default), "Sent Items" or
+    "Calendar", or a mail folder path such as "Inbox/Projects", and
+    optionally the ``store`` (display name) it belongs to; those extra
+    folders are served by ``iter_folder_items``. Mail records use EmailItem-style keys (``entry_id``,
+    ``subject``, ``sender_email``, ``received_time`` as ISO 8601,
+    ``flag_status``, ``unread``, ``body``...); calendar records use ``start``
+    and ``end``. Filters mirror the Restrict strings OutlookClient builds.
+    Sent reports are kept in ``sent_messages`` and optionally written to
+    ``outbox_dir``.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]] = None, path: str = None,
+                 outbox_dir: str = None):
+        if records is None:
+            records = load_fixture(path) if path else []
+
+        self.inbox: List[FakeMailItem] = []
+        self.sent: List[FakeMailItem] = []
+        self.calendar: List[FakeAppointmentItem] = []
+        # (store, folder path) -> items, for folders other than the default inbox
+        self.folders: Dict[Tuple[str, str], List[FakeMailItem]] = {}
+        for record in records:
+            folder = record.get("folder", "Inbox")
+            store = record.get("store", "")
+            if store or folder not in ("Inbox", "Sent Items", "Calendar"):
+                self.folders.setdefault((store, folder_label("", folder)), []).append(mail_item_from_record(record))
+            elif folder == "Calendar":
+                self.calendar.append(appointment_from_record(record))
+            elif folder == "Sent Items":
+                self.sent.append(mail_item_from_record(record))
+            else:
+                self.inbox.append(mail_item_from_record(record))
+
+        self._by_entry_id: Optional[Dict[str, FakeMailItem]] = None  # built on first open_item
+        self.outbox_dir = outbox_dir
+        self.sent_messages: List[Dict[str, Any]] = []
+        self.connected = False
+
+    def connect(self) -> bool:
+        self.connected = True
+        logger.info(f"Fixture backend ready ({len(self.inbox)} inbox, {len(self.sent)} sent, "
+                    f"{len(self.calendar)} calendar items, {len(self.folders)} other folders)")
+        return True
+
+    def _filter_inbox(self, lookback_days: int, unread_or_flagged_only: bool,
+                      flagged_only: bool = False) -> List[FakeMailItem]:
+        return self._filter_mail(self.inbox, lookback_days, unread_or_flagged_only, flagged_only)
+
+    def _filter_mail(self, items: List[FakeMailItem], lookback_days: int, unread_or_flagged_only: bool,
+                     flagged_only: bool = False) -> List[FakeMailItem]:
+        cutoff_date = datetime.now() - timedelta(days=lookback_days)
+        if flagged_only:
+            status = lambda item: is_followup(item.FlagStatus, item.UnRead)
+        elif unread_or_flagged_only:
+            status = lambda item: item.UnRead or item.FlagStatus == 2
+        else:
+            status = lambda item: True
+        matching = [
+            item for item in items
+            if item.MessageClass == "IPM.Note"
+            and item.ReceivedTime.replace(tzinfo=None) >= cutoff_date
+            and status(item)
+        ]
+        matching.sort(key=lambda item: item.ReceivedTime, reverse=True)
+        return matching
+
+    def get_inbox_items(self, lookback_days: int = 7, unread_or_flagged_only: bool = True,
+                        flagged_only: bool = False) -> List[Any]:
+        if not self.connected:
+            return []
+        return self._filter_inbox(lookback_days, unread_or_flagged_only, flagged_only)
+
+    def get_inbox_rows(self, lookback_days: int = 7, unread_or_flagged_only: bool = True,
+                       flagged_only: bool = False) -> List[Dict[str, Any]]:
+        if not self.connected:
+            return []
+        table = FakeTable(self._filter_inbox(lookback_days, unread_or_flagged_only, flagged_only))
+        return read_table_rows(table, INBOX_TABLE_COLUMNS)
+
+    def iter_inbox_items(self, lookback_days: int = 7, unread_or_flagged_only: bool = True,
+                         flagged_only: bool = False) -> Iterator[Any]:
+        if not self.connected:
+            return
+        yield from self._filter_inbox(lookback_days, unread_or_flagged_only, flagged_only)
+
+    def iter_inbox_rows(self, lookback_days: int = 7, unread_or_flagged_only: bool = True,
+                        flagged_only: bool = False) -> Iterator[Dict[str, Any]]:
+        if not self.connected:
+            return
+        yield from iter_table_rows(FakeTable(self._filter_inbox(lookback_days, unread_or_flagged_only, flagged_only)),
+                                   INBOX_TABLE_COLUMNS)
+
+    def get_inbox_previews(self, lookback_days: int = 7, flagged_only: bool = True) -> Dict[str, str]:
+        if not self.connected:
+            return {}
+        table = FakeTable(self._filter_inbox(lookback_days, True, flagged_only))
+        return {row["EntryID"]: row["BodyPreview"] for row in iter_table_rows(table, PREVIEW_TABLE_COLUMNS)}
+
+    def _matching_folders(self, store: str, path: str, recursive: bool) -> List[Tuple[str, List[FakeMailItem]]]:
+        """(label, items) for the folder at ``path`` in ``store`` and, if recursive, those below it."""
+        path = folder_label("", path).lower()
+        folders = dict(self.folders)
+        folders.setdefault(("", "Inbox"), self.inbox)
+        matching = []
+        for (folder_store, folder_path), items in sorted(folders.items()):
+            if folder_store.lower() != store.lower():
+                continue
+            lowered = folder_path.lower()
+            if lowered == path or (recursive and lowered.startswith(path + "/")):
+                matching.append((folder_label(folder_store, folder_path), items))
+        if not matching:
+            logger.error(f"Folder {folder_label(store, path)} not found")
+        return matching
+
+    def iter_folder_items(self, store: str = "", path: str = "Inbox", recursive: bool = False,
+                          lookback_days: int = 7, flagged_only: bool = True) -> Iterator[Tuple[str, Any]]:
+        if not self.connected:
+            return
+        for label, items in self._matching_folders(store, path, recursive):
+            for item in self._filter_mail(items, lookback_days, True, flagged_only):
+                yield label, item
+
+    def iter_folder_rows(self, store: str = "", path: str = "Inbox", recursive: bool = False,
+                         lookback_days: int = 7, flagged_only: bool = True) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        if not self.connected:
+            return
+        for label, items in self._matching_folders(store, path, recursive):
+            table = FakeTable(self._filter_mail(items, lookback_days, True, flagged_only))
+            for row in iter_table_rows(table, INBOX_TABLE_COLUMNS):
+                yield label, row
+
+    @contextmanager
+    def worker(self) -> Iterator["FixtureBackend"]:
+        # Fixture data is read-only once loaded, so worker threads share this backend
+        yield self
+
+    def open_item(self, entry_id: str) -> Any:
+        if self._by_entry_id is None:
+            self._by_entry_id = {item.EntryID: item for items in [self.inbox, self.sent, *self.folders.values()]
+                                 for item in items}
+        try:
+            return self._by_entry_id[entry_id]
+        except KeyError:
+            raise KeyError(f"No mail item with EntryID {entry_id}") from None
+
+    def _filter_modified(self, since: datetime) -> List[FakeMailItem]:
+        since = since.replace(tzinfo=None)
+        return [
+            item for item in self.inbox
+            if item.MessageClass == "IPM.Note"
+            and item.LastModificationTime.replace(tzinfo=None) > since
+        ]
+
+    def get_modified_inbox_items(self, since: datetime) -> List[Any]:
+        if not self.connected:
+            return []
+        return self._filter_modified(since)
+
+    def get_modified_inbox_rows(self, since: datetime) -> List[Dict[str, Any]]:
+        if not self.connected:
+            return []
+        return read_table_rows(FakeTable(self._filter_modified(since)), INBOX_TABLE_COLUMNS)
+
+    def get_sent_items(self, lookback_days: int = 2) -> List[Any]:
+        if not self.connected:
+            return []
+        cutoff_date = (datetime.now() - timedelta(days=lookback_days)).replace(
+            hour=0, minute=0, second=0, microsecond=0)
+        return sorted(
+            (item for item in self.sent if item.ReceivedTime.replace(tzinfo=None) >= cutoff_date),
+            key=lambda item: item.ReceivedTime, reverse=True
+        )
+
+    def get_calendar_items(self, start_date: datetime = None, end_date: datetime = None) -> List[Any]:
+        if not self.connected:
+            return []
+        if not start_date:
+            start_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        if not end_date:
+            end_date = start_date + timedelta(days=1)
+        return sorted(
+            (item for item in self.calendar if start_date <= item.Start.replace(tzinfo=None) < end_date),
+            key=lambda item: item.Start
+        )
+
+    def _filter_overdue(self, overdue_days: int) -> List[FakeMailItem]:
+        cutoff_date = (datetime.now() - timedelta(days=overdue_days)).replace(
+            hour=0, minute=0, second=0, microsecond=0)
+        matching = [
+            item for item in self.inbox
+            if item.MessageClass == "IPM.Note"
+            and item.ReceivedTime.replace(tzinfo=None) < cutoff_date
+            and (item.FlagStatus in (1, 2) or item.UnRead)
+        ]
+        matching.sort(key=lambda item: item.ReceivedTime, reverse=True)
+        return matching
+
+    def get_overdue_items(self, overdue_days: int = 30) -> List[Any]:
+        if not self.connected:
+            return []
+        return self._filter_overdue(overdue_days)
+
+    def get_overdue_rows(self, overdue_days: int = 30) -> List[Dict[str, Any]]:
+        if not self.connected:
+            return []
+        return read_table_rows(FakeTable(self._filter_overdue(overdue_days)), INBOX_TABLE_COLUMNS)
+
+    def send_email(self, to: str, subject: str, html_body: str, attachments: List[str] = None):
+        if not self.connected:
+            raise RuntimeError("Fixture backend not connected")
+
+        message = {"to": to, "subject": subject, "html_body": html_body,
+                   "attachments": list(attachments or [])}
+        self.sent_messages.append(message)
+
+        if self.outbox_dir:
+            os.makedirs(self.outbox_dir, exist_ok=True)
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            out_path = os.path.join(self.outbox_dir, f"report-{stamp}.html")
+            with open(out_path, "w", encoding="utf-8") as f:
+                f.write(html_body)
+            logger.info(f"Fixture backend wrote report for {to} to {out_path}")
+        else:
+            logger.info(f"Fixture backend captured email to {to} with subject: {subject}")
+
+    def disconnect(self):
+        self.connected = False
+        logger.info("Fixture backend closed")
+
+
+def create_backend(config: Dict[str, Any]) -> MailBackend:
+    """Create the mail backend selected by ``backend.type`` in config.
+
+    "outlook" (default) returns an OutlookClient; the COM modules are only
+    imported in that case. "fixture" returns a FixtureBackend reading
+    ``backend.fixture_path``.
+    """
+    backend_config = config.get('backend', {}) or {}
+    backend_type = backend_config.get('type', 'outlook')
+
+    if backend_type == 'fixture':
+        fixture_path = backend_config.get('fixture_path')
+        if not fixture_path:
+            raise ValueError("backend.fixture_path is required for the fixture backend")
+        return FixtureBackend(path=fixture_path, outbox_dir=backend_config.get('outbox_dir'))
+
+    if backend_type == 'outlook':
+        from .outlook_client import OutlookClient
+        return OutlookClient(only_when_open=config.get('behaviour', {}).get('only_when_outlook_open', True))
+
+    raise ValueError(f"Unknown mail backend type: {backend_type}")
@@ -0,0 +1,71 @@
+"""On-demand body previews for Outlook mail items.
+
+Reading ``MailItem.Body`` over COM transfers the whole body, quoted thread
+and all, just to keep 140 characters. The only size-limited source Outlook
+offers is a ``Table`` column: string columns, including the plain-text body
+(``urn:schemas:httpmail:textdescription``), come back truncated to 255
+characters. Reading the same property through ``PropertyAccessor`` returns
+the full body, so it saves nothing.
+
+The collector therefore ``prime``s the loader with the preview column of one
+bulk table read over the folder it is scanning; ``preview`` then only reads
+``Body`` for items the table did not cover. Previews are cached by EntryID
+for the lifetime of the loader, i.e. one collection run. Conversion worker
+threads share one loader, so the cache and counters are updated under a
+lock; the ``Body`` read itself happens outside it.
+"""
+import logging
+import threading
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_CHARS = 140
+
+
+class BodyPreviewLoader:
+    def __init__(self, max_chars: int = PREVIEW_CHARS):
+        self.max_chars = max_chars
+        self._cache: Dict[str, str] = {}
+        self.fetches = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    def prime(self, previews: Dict[str, str]):
+        """Cache previews read in bulk (EntryID -> table preview column)."""
+        trimmed = {entry_id: self._trim(text or "") for entry_id, text in previews.items()}
+        with self._lock:
+            self._cache.update(trimmed)
+        logger.debug(f"Body preview cache primed with {len(previews)} entries")
+
+    def preview(self, item) -> str:
+        """Return the first ``max_chars`` of the item's body on one line."""
+        try:
+            entry_id = item.EntryID
+        except Exception:
+            entry_id = None
+
+        if entry_id is not None:
+            with self._lock:
+                cached = self._cache.get(entry_id)
+                if cached is not None:
+                    self.hits += 1
+                    return cached
+
+        preview = self._trim(self._fetch(item))
+        with self._lock:
+            self.fetches += 1
+            if entry_id is not None:
+                self._cache[entry_id] = preview
+        return preview
+
+    def _trim(self, text: str) -> str:
+        return text[:self.max_chars].replace("\n", " ").replace("\r", " ")
+
+    def _fetch(self, item) -> str:
+        try:
+            if hasattr(item, "Body") and item.Body:
+                return item.Body
+        except Exception as e:
+            logger.debug(f"Could not read Body: {e}")
+        return ""
@@ -1,8 +1,20 @@
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Iterable
+import sys
+import heapq
 import logging
+from functools import partial
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 
+from .body_loader import BodyPreviewLoader
+from .instrumentation import metrics
+from .dasl import is_followup
+from .folders import FolderSpec, folder_specs
+from .sender_cache import SenderAddressCache
+from .sta_pool import StaWorkerPool
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,9 +39,58 @@ class EmailItem:
     status_label: str = ""    # "Flagged", "Unread", or "VIP"
     recommended_action: str = ""
     why_it_matters: str = ""
+    matched_keywords: List[str] = field(default_factory=list)  # why_keywords found in subject/preview
     is_vip_sender: bool = False  # True if from vip_senders list
     ai_summary: str = ""  # AI-generated summary (optional)
-    
+
+
+@dataclass(slots=True)
+class CompactEmailItem:
+    """Slotted EmailItem for large runs (snapshot store, 100k-item benchmarks).
+
+    Same fields and attribute access as EmailItem, so templates and the
+    prioritiser work unchanged, but no per-instance ``__dict__``, categories
+    as a tuple, and repeated strings (senders, folder, labels) interned.
+    Keep the field list in step with EmailItem.
+    """
+    entry_id: str
+    subject: str
+    sender_name: str
+    sender_email: str
+    received_time: datetime
+    importance: int
+    is_flagged: bool
+    is_unread: bool
+    has_attachments: bool
+    categories: Tuple[str, ...] = ()
+    folder_name: str = "Inbox"
+    body_preview: str = ""
+    priority_score: int = 0
+    priority_reason: str = ""
+    group_label: str = ""
+    priority_label: str = ""
+    status_label: str = ""
+    recommended_action: str = ""
+    why_it_matters: str = ""
+    matched_keywords: Tuple[str, ...] = ()
+    is_vip_sender: bool = False
+    ai_summary: str = ""
+
+
+# Fields whose values repeat across many items
+_INTERNED_FIELDS = ("sender_name", "sender_email", "folder_name", "priority_reason", "group_label",
+                    "priority_label", "status_label", "recommended_action", "why_it_matters")
+
+
+def compact_email_item(item) -> CompactEmailItem:
+    """Copy an EmailItem (or anything with the same fields) into a CompactEmailItem."""
+    values = {name: getattr(item, name) for name in CompactEmailItem.__dataclass_fields__}
+    for name in _INTERNED_FIELDS:
+        values[name] = sys.intern(values[name])
+    values["categories"] = tuple(sys.intern(category) for category in values["categories"])
+    values["matched_keywords"] = tuple(values["matched_keywords"])
+    return CompactEmailItem(**values)
+
 
 @dataclass
 class CalendarItem:
@@ -47,46 +108,339 @@ class CalendarItem:
     
 
 class EmailCollector:
-    def __init__(self, outlook_client):
-        self.outlook = outlook_client
+    def __init__(self, backend, sender_cache: SenderAddressCache = None):
+        # Any MailBackend: OutlookClient (COM) or FixtureBackend
+        self.backend = backend
+        # Exchange DN -> SMTP resolutions; in-memory only unless a persistent cache is passed
+        self.sender_cache = sender_cache if sender_cache is not None else SenderAddressCache()
+        # Body previews are fetched only for items that are kept, once per run
+        self.body_loader = BodyPreviewLoader()
 
     def collect_all(self, config: Dict[str, Any]) -> Dict[str, List[Any]]:
+        behaviour = config.get("behaviour", {})
+        if folder_specs(config):
+            if behaviour.get("incremental_sync", False):
+                logger.info("Incremental sync covers the default inbox only; scanning configured folders in full")
+            collected = {
+                "inbox": self.collect_folders(config)
+            }
+        elif behaviour.get("incremental_sync", False):
+            collected = self.collect_incremental(config)
+        else:
+            collected = {
+                "inbox": list(self.iter_inbox(config))
+            }
+
+        if behaviour.get("overdue_days"):
+            collected["overdue"] = self.collect_overdue(
+                config, exclude_ids=(item.entry_id for item in collected["inbox"]))
+        return collected
+
+    def collect_overdue(self, config: Dict[str, Any], exclude_ids: Iterable[str] = ()) -> List[EmailItem]:
+        """Flagged or unread inbox emails older than ``behaviour.overdue_days``, oldest first.
+
+        One backend query covers both conditions. Items whose EntryID is in
+        ``exclude_ids`` (typically those already in the inbox section) are
+        skipped, using the EntryIDs already read rather than extra COM calls.
+        The section shows no body previews, so none are read, and only the
+        oldest ``report.max_items_per_section`` emails are returned.
+        """
+        overdue_days = config.get("behaviour", {}).get("overdue_days", 30)
+        if self._use_table(config):
+            source = self.backend.get_overdue_rows(overdue_days)
+        else:
+            source = self.backend.get_overdue_items(overdue_days)
+
+        seen = set(exclude_ids)
+        overdue = []
+        for email_item in self._iter_converted(source, "Inbox", config, skip_ids=seen, load_body=False):
+            if not email_item or email_item.entry_id == "error" or email_item.entry_id in seen:
+                continue
+            seen.add(email_item.entry_id)
+            overdue.append(email_item)
+
+        found = len(overdue)
+        limit = config.get("report", {}).get("max_items_per_section")
+        if limit and found > limit:
+            overdue = heapq.nsmallest(limit, overdue, key=lambda x: x.received_time.replace(tzinfo=None))
+        else:
+            overdue.sort(key=lambda x: x.received_time.replace(tzinfo=None))
+        logger.info(f"Collected {found} overdue items (flagged or unread, older than {overdue_days} days), "
+                    f"showing {len(overdue)}")
+        return overdue
+
+    def iter_inbox(self, config: Dict[str, Any]) -> Iterator[EmailItem]:
+        """Yield flagged inbox EmailItems within the lookback window as they are converted.
+
+        Always a full (non-incremental) scan. Items come straight off the
+        backend's enumeration, so downstream stages can start on the first
+        emails and only the converted EmailItems they keep stay in memory.
+        """
         behaviour = config.get("behaviour", {})
         lookback_days = behaviour.get("lookback_days_inbox", 31)
-        # Only collect flagged emails - force to True
-        unread_or_flagged_only = True
-
-        collected = {
-            "inbox": []
-        }
-
-        # Calculate cutoff date for post-filtering (Outlook MAPI filter doesn't work reliably for flagged emails)
-        cutoff_date = datetime.now() - timedelta(days=lookback_days)
-        logger.debug(f"Cutoff date for {lookback_days} day lookback: {cutoff_date.strftime('%Y-%m-%d')}")
-
-        # Collect inbox items with MAPI filtering
-        inbox_items = self.outlook.get_inbox_items(lookback_days, unread_or_flagged_only)
-
-        # Convert and filter for ONLY flagged emails within date range
-        flagged_only = []
-        for item in inbox_items:
-            email_item = self._convert_mail_item(item, "Inbox", config)
-            if email_item and email_item.is_flagged:  # Only include flagged emails
-                # POST-FILTER: Ensure email is within lookback window
-                # This is necessary because Outlook's MAPI filter doesn't reliably filter flagged emails by date
-                # NOTE: Outlook COM returns timezone-aware datetime, so we strip timezone for comparison
-                received_date_naive = email_item.received_time.replace(tzinfo=None)
-                if received_date_naive >= cutoff_date:
-                    flagged_only.append(email_item)
-                else:
-                    logger.debug(f"Filtered out old flagged email: {email_item.subject[:40]} from {email_item.received_time.strftime('%Y-%m-%d')}")
-
-        collected["inbox"] = flagged_only
-        logger.info(f"Collected {len(inbox_items)} inbox items, {len(flagged_only)} flagged emails within {lookback_days} days")
 
+        # The backend's DASL query selects flagged IPM.Note items received in the
+        # last lookback_days (to the second), so no Python post-filter is needed.
+        # "table" mode pulls only the needed columns in bulk; "items" mode reads
+        # each MailItem over COM.
+        if self._use_table(config):
+            inbox_items = self.backend.iter_inbox_rows(lookback_days, flagged_only=True)
+        else:
+            # Previews come from one bulk table read rather than each item's Body
+            with metrics().stage("enumerate"):
+                self.body_loader.prime(self.backend.get_inbox_previews(lookback_days, flagged_only=True))
+            inbox_items = self.backend.iter_inbox_items(lookback_days, flagged_only=True)
+
+        scanned = flagged = 0
+        for email_item in self._iter_converted(inbox_items, "Inbox", config):
+            scanned += 1
+            if not email_item or email_item.entry_id == "error":
+                continue
+            flagged += 1
+            yield email_item
+
+        logger.info(f"Collected {scanned} inbox items, {flagged} flagged emails within {lookback_days} days")
+        logger.debug(f"Body previews fetched: {self.body_loader.fetches}, cache hits: {self.body_loader.hits}")
+
+    def collect_folders(self, config: Dict[str, Any]) -> List[EmailItem]:
+        """Flagged emails from every folder in ``behaviour.folders``, newest first.
+
+        Folders are grouped by store and each store is read on its own worker
+        thread (with its own COM apartment, see ``MailBackend.worker``), so
+        adding a shared mailbox does not add its full scan time to the run.
+        Results are merged by EntryID, so overlapping entries (a folder listed
+        both directly and under a recursive parent) appear once, under the
+        first matching entry.
+        """
+        by_store: Dict[str, List[FolderSpec]] = {}
+        for spec in folder_specs(config):
+            by_store.setdefault(spec.store, []).append(spec)
+
+        with ThreadPoolExecutor(max_workers=len(by_store), thread_name_prefix="store") as pool:
+            futures = [pool.submit(self._collect_store, store, specs, config) for store, specs in by_store.items()]
+            results = [future.result() for future in futures]
+
+        merged: Dict[str, EmailItem] = {}
+        for items in results:
+            for email_item in items:
+                merged.setdefault(email_item.entry_id, email_item)
+
+        emails = sorted(merged.values(), key=lambda x: x.received_time.replace(tzinfo=None), reverse=True)
+        logger.info(f"Collected {len(emails)} flagged emails from {sum(len(specs) for specs in by_store.values())} "
+                    f"folder entries across {len(by_store)} store(s)")
+        return emails
+
+    def _collect_store(self, store: str, specs: List[FolderSpec], config: Dict[str, Any]) -> List[EmailItem]:
+        """Worker-thread body: read one store's folders through a thread-local backend."""
+        lookback_days = config.get("behaviour", {}).get("lookback_days_inbox", 31)
+        use_table = self._use_table(config)
+        convert = self._converter(config)
+        run = metrics()
+        collected = []
+        try:
+            with self.backend.worker() as backend:
+                for spec in specs:
+                    if use_table:
+                        source = backend.iter_folder_rows(store, spec.path, spec.recursive, lookback_days)
+                    else:
+                        source = backend.iter_folder_items(store, spec.path, spec.recursive, lookback_days)
+                    for label, item in run.timed(source, "enumerate"):
+                        item = run.wrap_com(item)
+                        with run.stage("convert"):
+                            email_item = convert(item, label, config)
+                            if not email_item or email_item.entry_id == "error":
+                                continue
+                            self._load_body(email_item, item, config)
+                            collected.append(email_item)
+        except Exception as e:
+            logger.error(f"Error collecting from store {store or '(default)'}: {e}")
+            metrics().count("com.errors")
+        logger.debug(f"Store {store or '(default)'}: {len(collected)} flagged emails")
         return collected
-        
-    def _convert_mail_item(self, item, folder: str = "Inbox", config: Dict[str, Any] = None) -> Optional[EmailItem]:
+
+    def collect_incremental(self, config: Dict[str, Any]) -> Dict[str, List[Any]]:
+        """Collect flagged inbox emails by merging changes since the last run.
+
+        The first run (or one after ``full_resync_hours``) does a full scan and
+        records a watermark. Later runs only ask the backend for items with
+        ``LastModificationTime`` after the watermark, upsert those that are
+        still flagged, drop those that are not, and age out anything older
+        than the lookback window. Deleted or moved items are only noticed at
+        the next full resync.
+        """
+        state = self._open_sync_state(config)
+        try:
+            return self._collect_incremental(config, state)
+        finally:
+            state.close()
+
+    def _open_sync_state(self, config: Dict[str, Any]):
+        """SQLite snapshot store if storage.snapshot_db is set, else the JSON sync state file."""
+        snapshot_db = config.get("storage", {}).get("snapshot_db")
+        if snapshot_db:
+            from .snapshot_store import SnapshotStore
+            return SnapshotStore(snapshot_db, compact=config.get("storage", {}).get("compact_items", False))
+
+        from .sync_state import SyncState
+        return SyncState(config.get("behaviour", {}).get("sync_state_path", "state/sync_state.json"))
+
+    def _collect_incremental(self, config: Dict[str, Any], state) -> Dict[str, List[Any]]:
+        behaviour = config.get("behaviour", {})
+        lookback_days = behaviour.get("lookback_days_inbox", 31)
+        full_resync_hours = behaviour.get("full_resync_hours", 24)
+
+        watermark, last_full_sync, snapshot = state.load()
+        # Taken before querying so changes made during this run are seen next time
+        sync_started = datetime.now()
+
+        needs_full = (
+            watermark is None
+            or last_full_sync is None
+            or sync_started - last_full_sync >= timedelta(hours=full_resync_hours)
+        )
+        if needs_full:
+            logger.info("Incremental sync: running full scan")
+            inbox = list(self.iter_inbox(config))
+            snapshot = {item.entry_id: item for item in inbox}
+            state.save(sync_started, sync_started, snapshot)
+            return {"inbox": inbox}
+
+        run = metrics()
+        with run.stage("enumerate"):
+            if self._use_table(config):
+                changed = self.backend.get_modified_inbox_rows(watermark)
+            else:
+                changed = self.backend.get_modified_inbox_items(watermark)
+        convert = self._converter(config)
+
+        updated = removed = 0
+        for item in changed:
+            item = run.wrap_com(item)
+            with run.stage("convert"):
+                email_item = convert(item, "Inbox", config)
+                if not email_item or email_item.entry_id == "error":
+                    continue
+                # Same test as the full scan's query, so completed-and-read items drop out
+                if is_followup(self._flag_status(item), email_item.is_unread):
+                    self._load_body(email_item, item, config)
+                    snapshot[email_item.entry_id] = email_item
+                    updated += 1
+                elif snapshot.pop(email_item.entry_id, None) is not None:
+                    removed += 1
+
+        cutoff_date = sync_started - timedelta(days=lookback_days)
+        for entry_id in [entry_id for entry_id, item in snapshot.items()
+                         if item.received_time.replace(tzinfo=None) < cutoff_date]:
+            del snapshot[entry_id]
+
+        state.save(sync_started, last_full_sync, snapshot)
+
+        inbox = sorted(snapshot.values(), key=lambda x: x.received_time.replace(tzinfo=None), reverse=True)
+        logger.info(f"Incremental sync: {len(changed)} changed since {watermark.strftime('%Y-%m-%d %H:%M')}, "
+                    f"{updated} upserted, {removed} unflagged, {len(inbox)} flagged emails within {lookback_days} days")
+        return {"inbox": inbox}
+
+    def _iter_converted(self, source: Iterable[Any], folder: str, config: Dict[str, Any],
+                        skip_ids: Iterable[str] = (), load_body: bool = True) -> Iterator[Optional[EmailItem]]:
+        """Convert the items or rows of ``source`` in order, body previews included.
+
+        Yields one result per source item; items whose EntryID is in
+        ``skip_ids`` come back without their body preview, or (converted in
+        parallel) not at all. ``load_body=False`` skips body previews for
+        MailItems altogether. With ``behaviour.convert_workers`` > 1 and
+        ``items`` fetch mode, items are converted on worker threads (see
+        ``_iter_converted_parallel``).
+        """
+        workers = config.get("behaviour", {}).get("convert_workers", 1)
+        if workers > 1 and not self._use_table(config):
+            yield from self._iter_converted_parallel(source, folder, config, workers, skip_ids, load_body)
+        else:
+            yield from self._iter_converted_serial(source, folder, config, skip_ids, load_body)
+
+    def _iter_converted_serial(self, source: Iterable[Any], folder: str, config: Dict[str, Any],
+                               skip_ids: Iterable[str] = (), load_body: bool = True) -> Iterator[Optional[EmailItem]]:
+        convert = self._converter(config)
+        run = metrics()
+        for item in run.timed(source, "enumerate"):
+            item = run.wrap_com(item)
+            with run.stage("convert"):
+                email_item = convert(item, folder, config)
+                if (load_body and email_item and email_item.entry_id != "error"
+                        and email_item.entry_id not in skip_ids):
+                    self._load_body(email_item, item, config)
+            yield email_item
+
+    def _iter_converted_parallel(self, source: Iterable[Any], folder: str, config: Dict[str, Any],
+                                 workers: int, skip_ids: Iterable[str] = (),
+                                 load_body: bool = True) -> Iterator[Optional[EmailItem]]:
+        """``_iter_converted`` with MailItems read on ``workers`` STA threads.
+
+        Reading a MailItem's properties costs one cross-process COM round
+        trip each, so conversion is bound by latency rather than CPU. This
+        thread only reads each item's EntryID; a worker re-opens the item by
+        EntryID in its own apartment and converts it. At most a few items
+        per worker are in flight, and results come back in source order.
+        """
+        try:
+            pool = StaWorkerPool(self.backend, workers, name="convert")
+        except RuntimeError as e:
+            logger.warning(f"Converting items serially: {e}")
+            yield from self._iter_converted_serial(source, folder, config, skip_ids, load_body)
+            return
+
+        run = metrics()
+        entry_ids = (run.wrap_com(item).EntryID for item in source)
+        in_flight = deque()
+        with pool:
+            for entry_id in run.timed(entry_ids, "enumerate"):
+                if entry_id in skip_ids:
+                    continue
+                in_flight.append(pool.submit(self._convert_by_id, entry_id, folder, config, load_body))
+                if len(in_flight) >= pool.workers * 4:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+
+    def _convert_by_id(self, backend, entry_id: str, folder: str, config: Dict[str, Any],
+                       load_body: bool = True) -> Optional[EmailItem]:
+        """Worker-thread body: open one item in this thread's apartment and convert it."""
+        run = metrics()
+        with run.stage("convert"):
+            try:
+                item = run.wrap_com(backend.open_item(entry_id))
+            except Exception as e:
+                logger.error(f"Error opening mail item {entry_id}: {e}")
+                run.count("com.errors")
+                return None
+            email_item = self._convert_mail_item(item, folder, config, load_body=False)
+            if load_body and email_item.entry_id != "error":
+                self._load_body(email_item, item, config)
+        return email_item
+
+    @staticmethod
+    def _flag_status(source) -> int:
+        """FlagStatus of a MailItem or a table row."""
+        if isinstance(source, dict):
+            return source.get("FlagStatus") or 0
+        return source.FlagStatus
+
+    def _use_table(self, config: Dict[str, Any]) -> bool:
+        return config.get("behaviour", {}).get("fetch_mode", "items") == "table"
+
+    def _converter(self, config: Dict[str, Any]):
+        if self._use_table(config):
+            return self._convert_table_row
+        # Header fields only; _load_body fills the preview for items that are kept
+        return partial(self._convert_mail_item, load_body=False)
+
+    def _load_body(self, email_item: EmailItem, source, config: Dict[str, Any]):
+        """Fill body_preview for a kept item (table rows already carry the preview column)."""
+        if not self._use_table(config) and email_item.entry_id != "error":
+            email_item.body_preview = self.body_loader.preview(source)
+
+    def _convert_mail_item(self, item, folder: str = "Inbox", config: Dict[str, Any] = None,
+                           load_body: bool = True) -> Optional[EmailItem]:
+        body_preview = ""
         try:
             # Get sender information
             try:
@@ -101,13 +455,9 @@ class EmailCollector:
             is_flagged = item.FlagStatus > 0
             logger.debug(f"Processing email from {sender_email}, flagged: {is_flagged}")
 
-            # Get body preview (first 140 chars)
-            body_preview = ""
-            try:
-                if hasattr(item, "Body") and item.Body:
-                    body_preview = item.Body[:140].replace("\n", " ").replace("\r", " ")
-            except:
-                pass
+            # Get body preview (first 140 chars) without pulling the whole Body
+            if load_body:
+                body_preview = self.body_loader.preview(item)
                 
             # Get categories
             categories = []
@@ -134,6 +484,7 @@ class EmailCollector:
             )
         except Exception as e:
             logger.error(f"Error converting mail item: {e}")
+            metrics().count("com.errors")
             # Return a minimal item
             return EmailItem(
                 entry_id="error",
@@ -149,6 +500,61 @@ class EmailCollector:
                 body_preview=body_preview
             )
 
+    def _convert_table_row(self, row: Dict[str, Any], folder: str = "Inbox", config: Dict[str, Any] = None) -> Optional[EmailItem]:
+        """Build an EmailItem from a row returned by OutlookClient.get_inbox_rows."""
+        try:
+            sender_name = row.get("SenderName") or "Unknown"
+            sender_email = self._sender_email_from_row(row)
+
+            body_preview = (row.get("BodyPreview") or "")[:140].replace("\n", " ").replace("\r", " ")
+            categories_str = row.get("Categories") or ""
+            categories = [cat.strip() for cat in categories_str.split(",")] if categories_str else []
+            flag_status = row.get("FlagStatus") or 0
+
+            return EmailItem(
+                entry_id=row["EntryID"],
+                subject=row.get("Subject") or "(No subject)",
+                sender_name=sender_name,
+                sender_email=sender_email,
+                received_time=row["ReceivedTime"],
+                importance=row.get("Importance", 1),
+                is_flagged=flag_status > 0,
+                is_unread=bool(row.get("UnRead")),
+                has_attachments=bool(row.get("HasAttachments")),
+                categories=categories,
+                folder_name=folder,
+                body_preview=body_preview,
+                is_vip_sender=self._is_vip_sender(sender_email, config) if config else False
+            )
+        except Exception as e:
+            logger.error(f"Error converting table row: {e}")
+            return None
+
+    def _sender_email_from_row(self, row: Dict[str, Any]) -> str:
+        """Table-row counterpart of _extract_sender_email.
+
+        Exchange senders come back as a DN in SenderEmailAddress; the
+        PR_SENDER_SMTP_ADDRESS column usually carries the SMTP address, so no
+        GetExchangeUser() lookup is needed.
+        """
+        sender_email = row.get("SenderEmailAddress") or ""
+        if '@' in sender_email:
+            return sender_email
+
+        smtp = row.get("SenderSmtpAddress") or ""
+        if '@' in smtp:
+            return smtp
+
+        if sender_email.startswith(('/O=', '/o=')):
+            cached = self.sender_cache.get(sender_email)
+            if cached:
+                return cached
+            sender_name = row.get("SenderName")
+            if sender_name and sender_name != "Unknown":
+                return sender_name
+
+        return sender_email or "unknown@unknown.com"
+
     def _is_vip(self, email: str, config: Dict[str, Any]) -> bool:
         """Check if email is from VIP domain or VIP sender."""
         priorities = config.get('priorities', {})
@@ -211,6 +617,9 @@ class EmailCollector:
 
             # If it's Exchange DN format (/O=...), try to extract actual SMTP
             if sender_email and sender_email.startswith(('/O=', '/o=')):
+                cached = self.sender_cache.get(sender_email)
+                if cached:
+                    return cached
                 try:
                     # Try to get ExchangeUser object for SMTP address
                     if hasattr(item, 'Sender') and item.Sender:
@@ -219,6 +628,7 @@ class EmailCollector:
                             smtp = exchange_user.PrimarySmtpAddress
                             if smtp:
                                 logger.debug(f"Resolved Exchange DN to SMTP: {smtp}")
+                                self.sender_cache.put(sender_email, smtp)
                                 return smtp
                 except Exception as e:
                     logger.debug(f"Could not resolve Exchange DN to SMTP: {e}")
@@ -272,6 +682,7 @@ class EmailCollector:
             )
         except Exception as e:
             logger.error(f"Error converting calendar item: {e}")
+            metrics().count("com.errors")
             # Return a minimal item
             return CalendarItem(
                 entry_id="error",
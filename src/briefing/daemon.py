@@ -0,0 +1,224 @@
+"""Resident briefing daemon (``run_summary.py --daemon``).
+
+A scheduled ``run_summary.py`` launch pays for interpreter start-up, the
+pywin32/Jinja/Anthropic imports, attaching to Outlook and cold caches on
+every briefing. The daemon pays them once: it keeps a ``BriefingSession``
+(connected backend, compiled rules, template environment, sender and AI
+caches) and runs briefings
+
+- on its own schedule: once per SchedulerGuard window (weekday mornings and
+  evenings), when ``daemon.schedule`` is on, and
+- on request from a local trigger (``run_summary.py --trigger``), which
+  sends one JSON line to a loopback TCP port and waits for the result.
+
+The listener is opt-in: it only starts when ``daemon.token`` is set, and it
+rejects any command that does not carry the same token, so other local users
+and processes cannot send briefings. Without a token the daemon runs on its
+schedule alone.
+
+Briefings always run on the daemon's main thread, the one that owns the COM
+connection; the listener thread only queues requests.
+"""
+import os
+import hmac
+import json
+import queue
+import socket
+import logging
+import threading
+import socketserver
+from dataclasses import asdict
+from datetime import datetime
+from typing import Dict, Any, Callable, Optional, Tuple, TYPE_CHECKING
+
+from .scheduler_guard import SchedulerGuard
+
+if TYPE_CHECKING:
+    from .pipeline import BriefingSession
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8766
+
+
+class _Request:
+    def __init__(self, command: Dict[str, Any]):
+        self.command = command
+        self.reply: Dict[str, Any] = {}
+        self.done = threading.Event()
+
+
+class _TriggerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        try:
+            command = json.loads(line.decode("utf-8"))
+        except ValueError:
+            reply = {"ok": False, "error": "expected one JSON object per line"}
+        else:
+            daemon = self.server.briefing_daemon
+            if not isinstance(command, dict) or not daemon.authorised(command.pop("token", None)):
+                logger.warning(f"Rejected trigger without a valid token from {self.client_address[0]}")
+                reply = {"ok": False, "error": "invalid or missing token"}
+            else:
+                reply = daemon.submit(command)
+        self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+
+class _TriggerServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class BriefingDaemon:
+    def __init__(self, session: "BriefingSession", config_path: Optional[str] = None,
+                 load_config: Optional[Callable[[str], Dict[str, Any]]] = None):
+        self.session = session
+        self.config_path = config_path
+        self.load_config = load_config
+        self._config_mtime = os.path.getmtime(config_path) if config_path else None
+
+        settings = session.config.get("daemon", {}) or {}
+        self.host = settings.get("host", DEFAULT_HOST)
+        self.port = settings.get("port", DEFAULT_PORT)
+        self.schedule = settings.get("schedule", True)
+        self.poll_seconds = settings.get("poll_seconds", 30)
+        self.token = settings.get("token") or None
+
+        self._requests: "queue.Queue[_Request]" = queue.Queue()
+        self._server: Optional[_TriggerServer] = None
+        self._stopping = False
+        self._needs_reconnect = False
+        self._last_window: Optional[Tuple[str, str]] = None
+        self.runs = 0
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.started_at = datetime.now()
+
+    def submit(self, command: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Queue a command for the main thread and wait for its reply (listener side)."""
+        request = _Request(command)
+        self._requests.put(request)
+        if not request.done.wait(timeout):
+            return {"ok": False, "error": "timed out waiting for the daemon"}
+        return request.reply
+
+    def authorised(self, token: Any) -> bool:
+        """True when ``token`` matches ``daemon.token`` (constant-time comparison)."""
+        if not self.token or not isinstance(token, str):
+            return False
+        return hmac.compare_digest(token.encode("utf-8"), str(self.token).encode("utf-8"))
+
+    def start_listener(self):
+        if not self.token:
+            logger.info("No daemon.token configured; trigger listener disabled, running on schedule only")
+            return
+        self._server = _TriggerServer((self.host, self.port), _TriggerHandler)
+        self._server.briefing_daemon = self
+        # port 0 picks a free port; report the real one
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="trigger-listener", daemon=True).start()
+        logger.info(f"Briefing daemon listening on {self.host}:{self.port}")
+
+    def serve_forever(self):
+        """Run until a "stop" command or KeyboardInterrupt."""
+        self.start_listener()
+        try:
+            while not self._stopping:
+                try:
+                    request = self._requests.get(timeout=self.poll_seconds)
+                except queue.Empty:
+                    request = None
+
+                if request is not None:
+                    request.reply = self._handle(request.command)
+                    request.done.set()
+                elif self.schedule:
+                    self._run_if_due()
+        except KeyboardInterrupt:
+            logger.info("Briefing daemon interrupted")
+        finally:
+            if self._server is not None:
+                self._server.shutdown()
+                self._server.server_close()
+            logger.info(f"Briefing daemon stopped after {self.runs} briefing(s)")
+
+    def _handle(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        action = command.get("command", "run")
+        if action == "run":
+            return self._run(command.get("mode", "force"), bool(command.get("dry_run", False)))
+        if action == "status":
+            return {"ok": True, "runs": self.runs, "last_result": self.last_result,
+                    "started_at": self.started_at.isoformat(timespec="seconds")}
+        if action == "stop":
+            self._stopping = True
+            return {"ok": True, "stopping": True}
+        return {"ok": False, "error": f"unknown command: {action}"}
+
+    def _run_if_due(self):
+        guard = SchedulerGuard()
+        if not guard.should_run("auto"):
+            return
+        window = (guard.current_time.date().isoformat(), guard.get_mode_from_time())
+        if window == self._last_window:
+            return
+        self._last_window = window
+        self._run("auto", dry_run=False)
+
+    def _run(self, mode: str, dry_run: bool) -> Dict[str, Any]:
+        guard = SchedulerGuard()
+        if not guard.should_run(mode):
+            return {"ok": True, "skipped": True}
+        if mode in ("auto", "force"):
+            mode = guard.get_mode_from_time()
+        from .instrumentation import begin_run
+        from .metrics_export import export_run
+        run_metrics = begin_run(count_com=True)
+        try:
+            self._reload_config_if_changed()
+            if not self._ensure_connected():
+                export_run(self.session.config, run_metrics, "unavailable")
+                return {"ok": False, "error": "could not connect to mail backend"}
+            from .pipeline import run_briefing
+            result = run_briefing(self.session, mode, dry_run=dry_run, run_metrics=run_metrics)
+        except Exception as e:
+            logger.error(f"Briefing failed: {e}", exc_info=True)
+            # A dead COM connection (Outlook restarted) is re-established next time
+            self._needs_reconnect = True
+            export_run(self.session.config, run_metrics, "error")
+            return {"ok": False, "error": str(e)}
+
+        export_run(self.session.config, run_metrics, "success")
+
+        self.runs += 1
+        self.last_result = asdict(result)
+        logger.info(f"Briefing ({mode}) finished in {result.duration_seconds:.2f}s with {result.email_count} emails")
+        return {"ok": True, "result": self.last_result}
+
+    def _ensure_connected(self) -> bool:
+        if not self._needs_reconnect:
+            return True
+        backend = self.session.backend
+        backend.disconnect()
+        self._needs_reconnect = not backend.connect()
+        return not self._needs_reconnect
+
+    def _reload_config_if_changed(self):
+        """Pick up config edits without a restart; backend settings still need one."""
+        if not self.config_path or not self.load_config:
+            return
+        mtime = os.path.getmtime(self.config_path)
+        if mtime == self._config_mtime:
+            return
+        self.session.configure(self.load_config(self.config_path))
+        self._config_mtime = mtime
+        logger.info(f"Configuration reloaded from {self.config_path}")
+
+
+def send_command(command: Dict[str, Any], host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Send one command to a running daemon and return its reply."""
+    with socket.create_connection((host, port), timeout=timeout) as conn:
+        conn.sendall(json.dumps(command).encode("utf-8") + b"\n")
+        with conn.makefile("rb") as reply:
+            return json.loads(reply.readline().decode("utf-8"))
@@ -0,0 +1,128 @@
+"""Builder for Outlook ``@SQL=`` (DASL) filters.
+
+Jet filters (``[ReceivedTime] >= '01/31/2025'``) only resolve to the minute
+or day and depend on the Windows locale's date format. DASL filters name MAPI
+properties directly and take ISO-style UTC timestamps, so Outlook can apply
+the whole filter, to the second, against its indexes.
+
+Conditions are built with the helpers below and combined with ``&`` / ``|``;
+``str()`` (or ``.query()``) gives the string to pass to ``Items.Restrict``
+or ``Folder.GetTable``. For example
+``message_class("IPM.Note") & flag_status(FLAG_MARKED)`` becomes::
+
+    @SQL=(("http://schemas.microsoft.com/mapi/proptag/0x001A001F" = 'IPM.Note')
+    AND ("http://schemas.microsoft.com/mapi/proptag/0x10900003" = 2))
+
+(wrapped here; the real string is one line).
+"""
+from datetime import datetime, timezone
+from typing import Union
+
+from .mapi_table import PR_FLAG_STATUS, DASL_READ
+
+# MAPI property tags
+PR_MESSAGE_CLASS = "http://schemas.microsoft.com/mapi/proptag/0x001A001F"
+PR_MESSAGE_DELIVERY_TIME = "http://schemas.microsoft.com/mapi/proptag/0x0E060040"      # ReceivedTime
+PR_CLIENT_SUBMIT_TIME = "http://schemas.microsoft.com/mapi/proptag/0x00390040"         # SentOn
+PR_LAST_MODIFICATION_TIME = "http://schemas.microsoft.com/mapi/proptag/0x30080040"
+
+# PR_FLAG_STATUS values (OlFlagStatus)
+FLAG_NONE = 0
+FLAG_COMPLETE = 1
+FLAG_MARKED = 2
+
+Value = Union[str, int, bool, datetime]
+
+
+class DaslFilter:
+    """A DASL condition; combine with ``&`` and ``|``."""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+
+    def __and__(self, other: "DaslFilter") -> "DaslFilter":
+        return DaslFilter(f"{self._operand()} AND {other._operand()}")
+
+    def __or__(self, other: "DaslFilter") -> "DaslFilter":
+        return DaslFilter(f"{self._operand()} OR {other._operand()}")
+
+    def _operand(self) -> str:
+        return f"({self.expression})"
+
+    def query(self) -> str:
+        return f"@SQL={self._operand()}"
+
+    def __str__(self) -> str:
+        return self.query()
+
+    def __repr__(self) -> str:
+        return f"DaslFilter({self.expression!r})"
+
+
+def dasl_literal(value: Value) -> str:
+    """Format a Python value as a DASL literal.
+
+    Datetimes are converted to UTC (naive values are taken as local time,
+    like ``MailItem.ReceivedTime``) and written to the second.
+    """
+    if isinstance(value, datetime):
+        return f"'{value.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')}'"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def compare(prop: str, operator: str, value: Value) -> DaslFilter:
+    if operator not in ("=", "<>", "<", "<=", ">", ">="):
+        raise ValueError(f"Unsupported DASL operator: {operator}")
+    return DaslFilter(f'"{prop}" {operator} {dasl_literal(value)}')
+
+
+def message_class(name: str) -> DaslFilter:
+    return compare(PR_MESSAGE_CLASS, "=", name)
+
+
+def received_since(when: datetime) -> DaslFilter:
+    return compare(PR_MESSAGE_DELIVERY_TIME, ">=", when)
+
+
+def received_before(when: datetime) -> DaslFilter:
+    return compare(PR_MESSAGE_DELIVERY_TIME, "<", when)
+
+
+def sent_since(when: datetime) -> DaslFilter:
+    return compare(PR_CLIENT_SUBMIT_TIME, ">=", when)
+
+
+def modified_after(when: datetime) -> DaslFilter:
+    return compare(PR_LAST_MODIFICATION_TIME, ">", when)
+
+
+def flag_status(status: int) -> DaslFilter:
+    return compare(PR_FLAG_STATUS, "=", status)
+
+
+def is_unread() -> DaslFilter:
+    return compare(DASL_READ, "=", False)
+
+
+def followup() -> DaslFilter:
+    """What the briefing counts as flagged: marked for follow-up, or completed but still unread."""
+    return flag_status(FLAG_MARKED) | (flag_status(FLAG_COMPLETE) & is_unread())
+
+
+def is_followup(status: int, unread: bool) -> bool:
+    """``followup()`` evaluated in Python, for items or rows already read."""
+    return status == FLAG_MARKED or (status == FLAG_COMPLETE and bool(unread))
+
+
+def any_of(*filters: DaslFilter) -> DaslFilter:
+    """OR together one or more filters."""
+    if not filters:
+        raise ValueError("any_of needs at least one filter")
+    combined = filters[0]
+    for other in filters[1:]:
+        combined = combined | other
+    return combined
@@ -0,0 +1,357 @@
+"""In-process stand-ins for the Outlook COM objects the briefing touches.
+
+These mimic just enough of ``MailItem``, ``Items``, ``Folder`` and ``Table``
+for the collector and ``mapi_table`` to run without Outlook (and without
+Windows). Filter strings are not parsed; pass a Python ``predicate`` to a
+fake folder if a call needs to narrow its items.
+
+``ComLatency`` wraps any of them so that property reads and method calls
+take as long as they would across the process boundary to Outlook.
+"""
+import time
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable, Tuple
+
+from .mapi_table import PR_HASATTACH, PR_FLAG_STATUS, PR_SENDER_SMTP_ADDRESS, BODY_PREVIEW
+
+
+class FakeAttachments:
+    def __init__(self, count: int = 0):
+        self.Count = count
+
+
+class FakeMailItem:
+    """A MailItem with the properties the collector reads."""
+
+    def __init__(self, entry_id: str, subject: str = "", sender_name: str = "",
+                 sender_email: str = "", received_time: datetime = None,
+                 importance: int = 1, flag_status: int = 0, unread: bool = False,
+                 attachment_count: int = 0, body: str = "", categories: str = "",
+                 sender_smtp: str = "", message_class: str = "IPM.Note",
+                 last_modified: datetime = None):
+        self.EntryID = entry_id
+        self.Subject = subject
+        self.SenderName = sender_name
+        self.SenderEmailAddress = sender_email
+        self.SenderSmtpAddress = sender_smtp
+        self.ReceivedTime = received_time or datetime.now()
+        self.Importance = importance
+        self.FlagStatus = flag_status
+        self.UnRead = unread
+        self.Attachments = FakeAttachments(attachment_count)
+        self.Body = body
+        self.Categories = categories
+        self.MessageClass = message_class
+        self.LastModificationTime = last_modified or self.ReceivedTime
+        self.Sender = None
+        self.PropertyAccessor = FakePropertyAccessor(self)
+
+
+class FakePropertyAccessor:
+    """``MailItem.PropertyAccessor``; resolves the same names as table columns."""
+
+    def __init__(self, item: FakeMailItem):
+        self._item = item
+
+    def GetProperty(self, name: str) -> Any:
+        if name == BODY_PREVIEW:
+            # Unlike a Table column, PropertyAccessor returns the whole body
+            return self._item.Body
+        return _column_value(self._item, name)
+
+
+class FakeRecipients:
+    def __init__(self, count: int = 0):
+        self.Count = count
+
+
+class FakeAppointmentItem:
+    """An AppointmentItem with the properties _convert_calendar_item reads."""
+
+    def __init__(self, entry_id: str, subject: str = "", start: datetime = None,
+                 end: datetime = None, location: str = "", organizer: str = "",
+                 all_day: bool = False, recurring: bool = False, attendees_count: int = 0,
+                 response_status: int = 0, body: str = ""):
+        self.EntryID = entry_id
+        self.Subject = subject
+        self.Start = start or datetime.now()
+        self.End = end or self.Start
+        self.Location = location
+        self.Organizer = organizer
+        self.AllDayEvent = all_day
+        self.IsRecurring = recurring
+        self.Recipients = FakeRecipients(attendees_count)
+        self.ResponseStatus = response_status
+        self.Body = body
+
+
+def _column_value(item: FakeMailItem, column: str) -> Any:
+    """Resolve a Table column name or property tag against a fake item."""
+    if column == PR_HASATTACH:
+        return item.Attachments.Count > 0
+    if column == PR_FLAG_STATUS:
+        return item.FlagStatus
+    if column == PR_SENDER_SMTP_ADDRESS:
+        return item.SenderSmtpAddress
+    if column == BODY_PREVIEW:
+        return (item.Body or "")[:255]
+    return getattr(item, column, None)
+
+
+class FakeColumns:
+    def __init__(self, names: List[str] = None):
+        self.names = list(names or [])
+
+    @property
+    def Count(self) -> int:
+        return len(self.names)
+
+    def Add(self, name: str):
+        self.names.append(name)
+
+    def RemoveAll(self):
+        self.names = []
+
+
+class FakeRow:
+    def __init__(self, values: Tuple[Any, ...]):
+        self._values = values
+
+    def Item(self, index: int) -> Any:
+        # Table rows are 1-based
+        return self._values[index - 1]
+
+    def GetValues(self) -> Tuple[Any, ...]:
+        return self._values
+
+
+class FakeTable:
+    """A forward-only cursor over fake items, like ``Outlook.Table``."""
+
+    def __init__(self, items: List[FakeMailItem]):
+        self._items = list(items)
+        self._position = 0
+        self.Columns = FakeColumns(["EntryID", "Subject", "CreationTime",
+                                    "LastModificationTime", "MessageClass"])
+        self.get_array_calls = 0
+
+    @property
+    def EndOfTable(self) -> bool:
+        return self._position >= len(self._items)
+
+    def GetRowCount(self) -> int:
+        return len(self._items)
+
+    def Sort(self, column: str, descending: bool = False):
+        self._items.sort(key=lambda item: _column_value(item, column), reverse=descending)
+
+    def MoveToStart(self):
+        self._position = 0
+
+    def _values(self, item: FakeMailItem) -> Tuple[Any, ...]:
+        return tuple(_column_value(item, name) for name in self.Columns.names)
+
+    def GetNextRow(self) -> Optional[FakeRow]:
+        if self.EndOfTable:
+            return None
+        item = self._items[self._position]
+        self._position += 1
+        return FakeRow(self._values(item))
+
+    def GetArray(self, max_rows: int) -> Tuple[Tuple[Any, ...], ...]:
+        self.get_array_calls += 1
+        batch = self._items[self._position:self._position + max_rows]
+        self._position += len(batch)
+        return tuple(self._values(item) for item in batch)
+
+
+class FakeItems:
+    """An ``Items`` collection; ``Restrict`` returns the collection unchanged."""
+
+    def __init__(self, items: List[FakeMailItem]):
+        self._items = list(items)
+        self._cursor = 0
+        self.IncludeRecurrences = False
+
+    def Sort(self, prop: str, descending: bool = False):
+        attribute = prop.strip("[]")
+        self._items.sort(key=lambda item: getattr(item, attribute), reverse=descending)
+
+    def Restrict(self, filter_str: str) -> "FakeItems":
+        return FakeItems(self._items)
+
+    @property
+    def Count(self) -> int:
+        return len(self._items)
+
+    def GetFirst(self) -> Optional[FakeMailItem]:
+        self._cursor = 0
+        return self.GetNext()
+
+    def GetNext(self) -> Optional[FakeMailItem]:
+        if self._cursor >= len(self._items):
+            return None
+        item = self._items[self._cursor]
+        self._cursor += 1
+        return item
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class FakeFolder:
+    def __init__(self, name: str, items: List[FakeMailItem] = None,
+                 predicate: Callable[[FakeMailItem], bool] = None,
+                 subfolders: List["FakeFolder"] = None, default_item_type: int = 0):
+        self.Name = name
+        self.DefaultItemType = default_item_type  # 0 = olMailItem
+        self.Folders = FakeFolders(subfolders)
+        self._items = list(items or [])
+        self._predicate = predicate
+
+    def _matching(self) -> List[FakeMailItem]:
+        if self._predicate is None:
+            return list(self._items)
+        return [item for item in self._items if self._predicate(item)]
+
+    @property
+    def Items(self) -> FakeItems:
+        return FakeItems(self._matching())
+
+    def GetTable(self, filter_str: str = "", table_contents: int = 0) -> FakeTable:
+        return FakeTable(self._matching())
+
+
+class FakeFolders:
+    """``Folder.Folders``: 1-based ``Item(index)`` or ``Item(name)``."""
+
+    def __init__(self, folders: List[FakeFolder] = None):
+        self._folders = list(folders or [])
+
+    @property
+    def Count(self) -> int:
+        return len(self._folders)
+
+    def Item(self, key):
+        if isinstance(key, int):
+            return self._folders[key - 1]
+        for folder in self._folders:
+            if folder.Name.lower() == str(key).lower():
+                return folder
+        raise KeyError(key)
+
+    def Add(self, folder: FakeFolder) -> FakeFolder:
+        self._folders.append(folder)
+        return folder
+
+
+class FakeStore:
+    """A mail store (mailbox or PST) holding an inbox under its root folder."""
+
+    def __init__(self, display_name: str, inbox: FakeFolder = None):
+        self.DisplayName = display_name
+        self.inbox = inbox or FakeFolder("Inbox")
+        self.root = FakeFolder(display_name, subfolders=[self.inbox])
+
+    def GetDefaultFolder(self, folder_type: int) -> FakeFolder:
+        if folder_type != 6:
+            raise ValueError(f"FakeStore only has an inbox (asked for {folder_type})")
+        return self.inbox
+
+    def GetRootFolder(self) -> FakeFolder:
+        return self.root
+
+
+class FakeStores:
+    def __init__(self, stores: List[FakeStore] = None):
+        self._stores = list(stores or [])
+
+    @property
+    def Count(self) -> int:
+        return len(self._stores)
+
+    def Item(self, index: int) -> FakeStore:
+        return self._stores[index - 1]
+
+
+class FakeNamespace:
+    """A MAPI namespace keyed by ``GetDefaultFolder`` folder constant.
+
+    ``stores`` are extra stores for multi-folder collection; the default
+    store wraps the inbox folder (constant 6).
+    """
+
+    def __init__(self, folders: Dict[int, FakeFolder] = None, stores: List[FakeStore] = None):
+        self.folders = folders or {}
+        self.DefaultStore = FakeStore("Mailbox", self.GetDefaultFolder(6))
+        self.Stores = FakeStores([self.DefaultStore] + list(stores or []))
+
+    def GetDefaultFolder(self, folder_type: int) -> FakeFolder:
+        if folder_type not in self.folders:
+            self.folders[folder_type] = FakeFolder(str(folder_type))
+        return self.folders[folder_type]
+
+    def GetItemFromID(self, entry_id: str) -> FakeMailItem:
+        for folder in self.folders.values():
+            for item in folder._items:
+                if item.EntryID == entry_id:
+                    return item
+        raise LookupError(f"The item with EntryID {entry_id} could not be found")
+
+
+class ComLatency:
+    """Simulated cost of an out-of-process COM call, for ``wrap``ped fakes.
+
+    Each property read or method call sleeps ``round_trip`` seconds (RPC and
+    marshalling; calls from different threads overlap) plus ``server``
+    seconds under a lock shared by every wrapped object (Outlook serves
+    calls on its one UI thread, so that part never overlaps).
+    """
+
+    def __init__(self, round_trip: float = 0.0, server: float = 0.0):
+        self.round_trip = round_trip
+        self.server = server
+        self.calls = 0
+        self._server_lock = threading.Lock()
+
+    def call(self):
+        with self._server_lock:
+            self.calls += 1
+            if self.server:
+                time.sleep(self.server)
+        if self.round_trip:
+            time.sleep(self.round_trip)
+
+    def wrap(self, obj):
+        if isinstance(obj, (str, int, float, bool, bytes, datetime, tuple, type(None), LatentComObject)):
+            return obj
+        return LatentComObject(obj, self)
+
+
+class LatentComObject:
+    """A fake COM object whose property reads and method calls go through ``ComLatency``."""
+
+    __slots__ = ("_obj", "_latency")
+
+    def __init__(self, obj, latency: ComLatency):
+        object.__setattr__(self, "_obj", obj)
+        object.__setattr__(self, "_latency", latency)
+
+    def __getattr__(self, name: str):
+        value = getattr(self._obj, name)
+        if callable(value):
+            # Bound through the type library; the round trip happens on the call
+            return LatentComObject(value, self._latency)
+        self._latency.call()
+        return self._latency.wrap(value)
+
+    def __call__(self, *args, **kwargs):
+        self._latency.call()
+        return self._latency.wrap(self._obj(*args, **kwargs))
+
+    def __bool__(self) -> bool:
+        return bool(self._obj)
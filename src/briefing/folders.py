@@ -0,0 +1,41 @@
+"""Folders and stores to collect from (``behaviour.folders``).
+
+Without the setting only the default store's inbox is read. Each entry names
+a folder path and, optionally, the store (shared mailbox or PST, by display
+name) it lives in; ``recursive`` adds every mail folder below it::
+
+    behaviour:
+      folders:
+        - "Inbox"
+        - path: "Inbox/Projects"
+          recursive: true
+        - store: "Sales Team"
+          path: "Inbox"
+"""
+from dataclasses import dataclass
+from typing import Dict, Any, List
+
+
+@dataclass(frozen=True)
+class FolderSpec:
+    path: str = "Inbox"
+    store: str = ""        # store DisplayName; "" is the default store
+    recursive: bool = False
+
+
+def folder_specs(config: Dict[str, Any]) -> List[FolderSpec]:
+    """Parse ``behaviour.folders``; an empty list means "default inbox only"."""
+    specs = []
+    for entry in config.get("behaviour", {}).get("folders") or []:
+        if isinstance(entry, str):
+            specs.append(FolderSpec(path=entry))
+        else:
+            specs.append(FolderSpec(path=entry.get("path", "Inbox"), store=entry.get("store", "") or "",
+                                    recursive=bool(entry.get("recursive", False))))
+    return specs
+
+
+def folder_label(store: str, path: str) -> str:
+    """Display name used for EmailItem.folder_name, e.g. "Inbox/Projects" or "Sales Team/Inbox"."""
+    path = "/".join(part for part in path.split("/") if part)
+    return f"{store}/{path}" if store else path
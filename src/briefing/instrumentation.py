@@ -0,0 +1,227 @@
+"""Per-run timings and call counts, and optional profiling (``--profile``).
+
+The pipeline records its stages on the current ``RunMetrics``
+(``metrics()``); ``begin_run()`` starts a fresh one. Stage times are
+exclusive: while the prioritiser pulls emails from the streaming collector,
+time spent enumerating and converting is booked to ``enumerate`` and
+``convert``, not to ``prioritise``. Stages run on collection worker threads
+are summed across threads, so they can add up to more than the wall time.
+
+Counters are plain named totals (``api.requests``, ``com.table_batches``...),
+gauges hold one value per run (``emails.collected``, ``report.bytes``) and
+observations collect individual measurements such as each API request's
+latency (``api.request_seconds``).
+
+With ``count_com`` set, ``wrap_com`` returns a proxy that counts every
+property read and method call made on a COM object (and on the objects it
+returns) as ``com.property_reads`` / ``com.method_calls``. ``run_summary``
+and the daemon turn it on for every briefing: the proxy adds about 2 us per
+access, small next to a cross-process COM round trip. It stays off by default
+so benchmarks that time conversion against in-process fakes are not skewed.
+
+``write_run_report`` puts the report in a JSON file next to the preview HTML.
+"""
+import os
+import json
+import time
+import pstats
+import cProfile
+import logging
+import threading
+import tracemalloc
+from datetime import datetime
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, Optional, List
+
+logger = logging.getLogger(__name__)
+
+# Values returned by COM property reads that are data, not further COM objects
+_PLAIN_TYPES = (str, int, float, bool, bytes, datetime, tuple, type(None))
+
+
+class RunMetrics:
+    def __init__(self, count_com: bool = False):
+        self.count_com = count_com
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.gauges: Dict[str, float] = {}
+        self.observations: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block as stage ``name``, excluding any stages nested inside it."""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        frame = [0.0]  # seconds spent in nested stages
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][0] += elapsed
+            with self._lock:
+                totals = self._stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+                totals["seconds"] += elapsed - frame[0]
+                totals["calls"] += 1
+
+    def timed(self, iterable: Iterable, name: str) -> Iterator:
+        """Yield from ``iterable``, booking the time spent producing each item to ``name``."""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_gauge(self, name: str, value: float):
+        self.gauges[name] = value
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            self.observations.setdefault(name, []).append(value)
+
+    @contextmanager
+    def timer(self, name: str):
+        """Observe the duration of a block (e.g. one API request) under ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def wrap_com(self, obj):
+        """``obj`` itself, or a call-counting proxy when ``count_com`` is on."""
+        if not self.count_com or isinstance(obj, (_PLAIN_TYPES, dict, ComCallCounter)):
+            return obj
+        return ComCallCounter(obj, self)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_seconds": round(time.perf_counter() - self._started, 4),
+            "stages": {name: {"seconds": round(totals["seconds"], 4), "calls": int(totals["calls"])}
+                       for name, totals in self._stages.items()},
+            "counters": dict(sorted(self.counters.items())),
+            "gauges": dict(sorted(self.gauges.items())),
+            "observations": {name: {"count": len(values), "sum": round(sum(values), 4),
+                                    "max": round(max(values), 4)}
+                             for name, values in sorted(self.observations.items())},
+        }
+
+
+class ComCallCounter:
+    """Counts attribute reads and calls on a wrapped COM object."""
+
+    __slots__ = ("_obj", "_metrics")
+
+    def __init__(self, obj, run_metrics: RunMetrics):
+        object.__setattr__(self, "_obj", obj)
+        object.__setattr__(self, "_metrics", run_metrics)
+
+    def __getattr__(self, name: str):
+        self._metrics.count("com.property_reads")
+        value = getattr(self._obj, name)
+        # Most reads return plain data; skip the wrap_com call for those
+        return value if isinstance(value, _PLAIN_TYPES) else self._metrics.wrap_com(value)
+
+    def __setattr__(self, name: str, value):
+        self._metrics.count("com.property_writes")
+        setattr(self._obj, name, value)
+
+    def __call__(self, *args, **kwargs):
+        self._metrics.count("com.method_calls")
+        return self._metrics.wrap_com(self._obj(*args, **kwargs))
+
+    def __bool__(self) -> bool:
+        return bool(self._obj)
+
+
+_current = RunMetrics()
+
+
+def metrics() -> RunMetrics:
+    """The metrics of the run in progress."""
+    return _current
+
+
+def begin_run(count_com: bool = False) -> RunMetrics:
+    """Start recording a new run and make it current."""
+    global _current
+    _current = RunMetrics(count_com=count_com)
+    return _current
+
+
+class Profiler:
+    """cProfile plus tracemalloc around a block; results land in ``report()``."""
+
+    def __init__(self, top: int = 25):
+        self.top = top
+        self._profile = cProfile.Profile()
+        self._snapshot = None
+        self._peak = 0
+
+    def __enter__(self):
+        tracemalloc.start()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._profile.disable()
+        self._snapshot = tracemalloc.take_snapshot()
+        _, self._peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return False
+
+    def report(self) -> Dict[str, Any]:
+        stats = pstats.Stats(self._profile)
+        functions = sorted(stats.stats.items(), key=lambda entry: entry[1][3], reverse=True)[:self.top]
+        allocations = self._snapshot.statistics("lineno")[:self.top] if self._snapshot else []
+        return {
+            "top_functions": [
+                {"function": f"{filename}:{line}({name})", "calls": calls,
+                 "own_seconds": round(own, 4), "cumulative_seconds": round(cumulative, 4)}
+                for (filename, line, name), (_, calls, own, cumulative, _) in functions
+            ],
+            "memory": {
+                "peak_bytes": self._peak,
+                "top_allocations": [{"location": str(stat.traceback), "bytes": stat.size, "blocks": stat.count}
+                                    for stat in allocations],
+            },
+        }
+
+
+def run_report_path(config: Dict[str, Any]) -> Optional[str]:
+    """``report.run_report``, else the preview HTML path with a ``.run.json`` suffix."""
+    report_config = config.get("report", {})
+    if report_config.get("run_report"):
+        return report_config["run_report"]
+    preview_path = report_config.get("preview_html")
+    if preview_path:
+        return os.path.splitext(preview_path)[0] + ".run.json"
+    return None
+
+
+def write_run_report(path: str, report: Dict[str, Any]):
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+        logger.info(f"Run report saved to {path}")
+    except Exception as e:
+        logger.error(f"Failed to save run report: {e}")
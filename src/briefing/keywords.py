@@ -0,0 +1,81 @@
+"""Multi-keyword detection for the "why it matters" line.
+
+An Aho-Corasick automaton is built once from the keyword dictionary, so each
+email's text is scanned in a single pass whatever the dictionary size.
+Matching is case-insensitive substring matching, like the ``kw in text``
+checks it replaces.
+"""
+import logging
+from collections import deque
+from typing import List, Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WHY_KEYWORDS = ['urgent', 'asap', 'contract', 'invoice', 'payment', 'tender', 'proposal']
+
+
+class KeywordAutomaton:
+    def __init__(self, keywords: Iterable[str]):
+        # Unique, lowercased keywords in dictionary order; matches are reported in this order
+        self.keywords: List[str] = []
+        seen = set()
+        for keyword in keywords or []:
+            keyword = str(keyword).strip().lower()
+            if keyword and keyword not in seen:
+                seen.add(keyword)
+                self.keywords.append(keyword)
+
+        # Trie as parallel lists indexed by state; state 0 is the root
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        for index, keyword in enumerate(self.keywords):
+            self._add(keyword, index)
+        self._build_failure_links()
+        logger.debug(f"Keyword automaton built: {len(self.keywords)} keywords, {len(self._goto)} states")
+
+    def _add(self, keyword: str, index: int):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(index)
+
+    def _build_failure_links(self):
+        # Breadth-first, so a state's failure target is finished before its children
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                # Keywords that end at the failure target also end here
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text: str) -> List[str]:
+        """Return the keywords occurring in ``text``, each once, in dictionary order."""
+        if not self.keywords or not text:
+            return []
+
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+                if len(found) == len(self.keywords):
+                    break
+        return [self.keywords[index] for index in sorted(found)]
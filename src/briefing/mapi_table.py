@@ -0,0 +1,76 @@
+"""Column-only bulk reads from Outlook ``Folder.GetTable``.
+
+A ``Table`` returns just the requested columns for every matching row, so a
+whole folder can be pulled in a handful of ``GetArray`` calls instead of one
+late-bound COM round-trip per property per item.
+
+This module has no COM imports so it can be exercised with the fakes in
+``fake_outlook`` on any platform.
+"""
+from typing import List, Dict, Any, Tuple, Iterator
+
+from .instrumentation import metrics
+
+# MAPI property tags for values that are either not exposed as built-in
+# Table columns or are cheaper to read as raw properties.
+PR_HASATTACH = "http://schemas.microsoft.com/mapi/proptag/0x0E1B000B"
+PR_FLAG_STATUS = "http://schemas.microsoft.com/mapi/proptag/0x10900003"
+PR_SENDER_SMTP_ADDRESS = "http://schemas.microsoft.com/mapi/proptag/0x5D01001F"
+# Plain-text body preview; Table truncates string columns to 255 characters
+BODY_PREVIEW = "urn:schemas:httpmail:textdescription"
+# DASL name for the read flag (PR_MESSAGE_FLAGS is a bitmask, which DASL cannot test)
+DASL_READ = "urn:schemas:httpmail:read"
+
+OL_USER_ITEMS = 0  # OlTableContents.olUserItems
+
+# (row key, Table column). Built-in names return dates in local time,
+# which matches what MailItem.ReceivedTime gives the item-based path.
+INBOX_TABLE_COLUMNS: List[Tuple[str, str]] = [
+    ("EntryID", "EntryID"),
+    ("Subject", "Subject"),
+    ("SenderName", "SenderName"),
+    ("SenderEmailAddress", "SenderEmailAddress"),
+    ("SenderSmtpAddress", PR_SENDER_SMTP_ADDRESS),
+    ("ReceivedTime", "ReceivedTime"),
+    ("Importance", "Importance"),
+    ("FlagStatus", PR_FLAG_STATUS),
+    ("UnRead", "UnRead"),
+    ("HasAttachments", PR_HASATTACH),
+    ("Categories", "Categories"),
+    ("BodyPreview", BODY_PREVIEW),
+]
+
+# Just enough to prime BodyPreviewLoader for an items-mode scan
+PREVIEW_TABLE_COLUMNS: List[Tuple[str, str]] = [
+    ("EntryID", "EntryID"),
+    ("BodyPreview", BODY_PREVIEW),
+]
+
+TABLE_BATCH_SIZE = 500
+
+
+def iter_table_rows(table, columns: List[Tuple[str, str]] = INBOX_TABLE_COLUMNS,
+                    batch_size: int = TABLE_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """Yield each table row as a dict keyed by the row keys in ``columns``.
+
+    Replaces the table's default column set with ``columns`` and reads rows
+    in ``GetArray`` batches of ``batch_size``.
+    """
+    table.Columns.RemoveAll()
+    for _, column_name in columns:
+        table.Columns.Add(column_name)
+
+    keys = [key for key, _ in columns]
+    while not table.EndOfTable:
+        batch = table.GetArray(batch_size)
+        metrics().count("com.table_batches")
+        if not batch:
+            break
+        for values in batch:
+            yield dict(zip(keys, values))
+
+
+def read_table_rows(table, columns: List[Tuple[str, str]] = INBOX_TABLE_COLUMNS,
+                    batch_size: int = TABLE_BATCH_SIZE) -> List[Dict[str, Any]]:
+    """Read every row of ``table`` into a list of dicts."""
+    return list(iter_table_rows(table, columns, batch_size))
@@ -0,0 +1,206 @@
+"""Prometheus textfile exporter for briefing runs (``metrics`` config section).
+
+After each run the briefing rewrites one ``.prom`` file in the Prometheus
+text exposition format, for the textfile collector of node_exporter or
+windows_exporter to pick up. Nothing listens on the network. Counters and
+histogram buckets have to keep growing across runs, which are separate
+processes, so their running totals are kept in a small JSON state file and
+the ``.prom`` file is regenerated from it each time. The file is written to
+a temporary name and renamed so a scrape never sees half of it.
+
+Exported series:
+
+    briefing_runs_total{result}                 success / error / unavailable
+    briefing_run_duration_seconds               histogram of whole runs
+    briefing_stage_duration_seconds{stage}      histogram per RunMetrics stage
+    briefing_api_request_duration_seconds       histogram of AI API requests
+    briefing_api_requests_total
+    briefing_ai_cache_hits_total / _misses_total
+    briefing_com_errors_total
+    briefing_com_property_reads_total / briefing_com_method_calls_total
+    briefing_emails_collected                   last run, before selection (also _selected, _overdue)
+    briefing_report_bytes                       last run
+    briefing_last_run_timestamp_seconds / briefing_last_success_timestamp_seconds
+"""
+import os
+import json
+import time
+import logging
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+from .instrumentation import RunMetrics
+
+logger = logging.getLogger(__name__)
+
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+API_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 16, 32, 64)
+
+# name -> (type, help)
+METRICS = {
+    "briefing_runs_total": ("counter", "Briefing runs by result."),
+    "briefing_run_duration_seconds": ("histogram", "Wall time of a briefing run."),
+    "briefing_stage_duration_seconds": ("histogram", "Time spent in each briefing stage per run."),
+    "briefing_api_request_duration_seconds": ("histogram", "Latency of AI analysis API requests."),
+    "briefing_api_requests_total": ("counter", "AI analysis API requests sent."),
+    "briefing_ai_cache_hits_total": ("counter", "Emails whose AI analysis came from the cache."),
+    "briefing_ai_cache_misses_total": ("counter", "Emails that needed a fresh AI analysis."),
+    "briefing_com_errors_total": ("counter", "Outlook COM calls or item conversions that failed."),
+    "briefing_com_property_reads_total": ("counter", "Outlook COM property reads made by the collector."),
+    "briefing_com_method_calls_total": ("counter", "Outlook COM method calls made by the collector."),
+    "briefing_emails_collected": ("gauge", "Flagged emails collected for the last briefing."),
+    "briefing_emails_selected": ("gauge", "Flagged emails shown in the last briefing."),
+    "briefing_emails_overdue": ("gauge", "Overdue emails in the last briefing."),
+    "briefing_report_bytes": ("gauge", "Size of the last rendered report."),
+    "briefing_last_run_timestamp_seconds": ("gauge", "Unix time the last run finished."),
+    "briefing_last_success_timestamp_seconds": ("gauge", "Unix time the last successful run finished."),
+}
+
+# RunMetrics counter -> exported counter
+_COUNTERS = {
+    "api.requests": "briefing_api_requests_total",
+    "api.cache_hits": "briefing_ai_cache_hits_total",
+    "api.cache_misses": "briefing_ai_cache_misses_total",
+    "com.errors": "briefing_com_errors_total",
+    "com.property_reads": "briefing_com_property_reads_total",
+    "com.method_calls": "briefing_com_method_calls_total",
+}
+
+# RunMetrics gauge -> exported gauge
+_GAUGES = {
+    "emails.collected": "briefing_emails_collected",
+    "emails.selected": "briefing_emails_selected",
+    "emails.overdue": "briefing_emails_overdue",
+    "report.bytes": "briefing_report_bytes",
+}
+
+
+class MetricsExporter:
+    VERSION = 1
+
+    def __init__(self, textfile_path: str, state_path: Optional[str] = None):
+        self.textfile_path = textfile_path
+        self.state_path = state_path or os.path.splitext(textfile_path)[0] + ".state.json"
+
+    def record_run(self, run: RunMetrics, result: str):
+        """Fold one run into the running totals and rewrite the textfile."""
+        state = self._load()
+        report = run.report()
+        now = time.time()
+
+        self._inc(state, "briefing_runs_total", f'result="{result}"')
+        self._observe(state, "briefing_run_duration_seconds", "", report["wall_seconds"], STAGE_BUCKETS)
+        for stage, totals in report["stages"].items():
+            self._observe(state, "briefing_stage_duration_seconds", f'stage="{stage}"',
+                          totals["seconds"], STAGE_BUCKETS)
+        for latency in run.observations.get("api.request_seconds", []):
+            self._observe(state, "briefing_api_request_duration_seconds", "", latency, API_BUCKETS)
+        for source, name in _COUNTERS.items():
+            self._inc(state, name, "", run.counters.get(source, 0))
+        for source, name in _GAUGES.items():
+            if source in run.gauges:
+                state["gauges"][name] = {"": run.gauges[source]}
+        state["gauges"]["briefing_last_run_timestamp_seconds"] = {"": now}
+        if result == "success":
+            state["gauges"]["briefing_last_success_timestamp_seconds"] = {"": now}
+
+        self._save(state)
+        self.write(state)
+
+    def write(self, state: Dict[str, Any]):
+        lines = []
+        for name, (metric_type, help_text) in METRICS.items():
+            series = state[_SECTIONS[metric_type]].get(name)
+            if not series:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            if metric_type == "histogram":
+                lines.extend(_histogram_lines(name, series))
+            else:
+                lines.extend(f"{name}{_braces(labels)} {_number(value)}" for labels, value in sorted(series.items()))
+
+        _write_atomic(self.textfile_path, "\n".join(lines) + "\n")
+        logger.debug(f"Metrics textfile written to {self.textfile_path}")
+
+    def _inc(self, state: Dict[str, Any], name: str, labels: str, amount: float = 1):
+        series = state["counters"].setdefault(name, {})
+        series[labels] = series.get(labels, 0) + amount
+
+    def _observe(self, state: Dict[str, Any], name: str, labels: str, value: float,
+                 buckets: Tuple[float, ...]):
+        series = state["histograms"].setdefault(name, {})
+        histogram = series.get(labels)
+        if histogram is None or len(histogram["buckets"]) != len(buckets):
+            histogram = series[labels] = {"le": list(buckets), "buckets": [0] * len(buckets), "sum": 0.0, "count": 0}
+        for index, bound in enumerate(buckets):
+            if value <= bound:
+                histogram["buckets"][index] += 1
+        histogram["sum"] += value
+        histogram["count"] += 1
+
+    def _load(self) -> Dict[str, Any]:
+        empty = {"version": self.VERSION, "counters": {}, "histograms": {}, "gauges": {}}
+        if not os.path.exists(self.state_path):
+            return empty
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get("version") != self.VERSION:
+                logger.info(f"Metrics state version mismatch in {self.state_path}, starting fresh")
+                return empty
+            return state
+        except Exception as e:
+            logger.warning(f"Could not read metrics state {self.state_path}, starting fresh: {e}")
+            return empty
+
+    def _save(self, state: Dict[str, Any]):
+        _write_atomic(self.state_path, json.dumps(state))
+
+
+_SECTIONS = {"counter": "counters", "histogram": "histograms", "gauge": "gauges"}
+
+
+def _histogram_lines(name: str, series: Dict[str, Dict[str, Any]]) -> Iterable[str]:
+    for labels, histogram in sorted(series.items()):
+        prefix = labels + "," if labels else ""
+        # Buckets are stored per bound, so each line is already cumulative
+        for bound, count in zip(histogram["le"], histogram["buckets"]):
+            yield f'{name}_bucket{{{prefix}le="{_number(bound)}"}} {count}'
+        yield f'{name}_bucket{{{prefix}le="+Inf"}} {histogram["count"]}'
+        yield f"{name}_sum{_braces(labels)} {_number(histogram['sum'])}"
+        yield f"{name}_count{_braces(labels)} {histogram['count']}"
+
+
+def _braces(labels: str) -> str:
+    return f"{{{labels}}}" if labels else ""
+
+
+def _number(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(round(float(value), 6))
+
+
+def _write_atomic(path: str, content: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8', newline="\n") as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+
+def export_run(config: Dict[str, Any], run: RunMetrics, result: str):
+    """Record ``run`` if ``metrics.enabled``; failures are logged, never raised."""
+    settings = config.get("metrics", {}) or {}
+    if not settings.get("enabled", False):
+        return
+    textfile_path = settings.get("textfile_path")
+    if not textfile_path:
+        logger.warning("metrics.enabled is set but metrics.textfile_path is missing")
+        return
+    try:
+        MetricsExporter(textfile_path, settings.get("state_path")).record_run(run, result)
+    except Exception as e:
+        logger.error(f"Failed to export metrics: {e}")
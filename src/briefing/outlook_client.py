@@ -1,10 +1,20 @@
 import sys
 import pythoncom
 import win32com.client
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 import logging
 
+from .mapi_table import (read_table_rows, iter_table_rows, INBOX_TABLE_COLUMNS, PREVIEW_TABLE_COLUMNS,
+                         OL_USER_ITEMS)
+from .dasl import (message_class, received_since, received_before, sent_since, modified_after,
+                   flag_status, is_unread, any_of, followup, FLAG_COMPLETE, FLAG_MARKED)
+from .folders import folder_label
+from .instrumentation import metrics
+
+OL_MAIL_ITEM = 0  # Folder.DefaultItemType of mail folders
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,34 +44,239 @@ class OutlookClient:
                     logger.error(f"Failed to start Outlook: {e}")
                     return False
                     
-    def get_inbox_items(self, lookback_days: int = 7, unread_or_flagged_only: bool = True) -> List[Any]:
+    def get_inbox_items(self, lookback_days: int = 7, unread_or_flagged_only: bool = True,
+                        flagged_only: bool = False) -> List[Any]:
+        return list(self.iter_inbox_items(lookback_days, unread_or_flagged_only, flagged_only))
+
+    def iter_inbox_items(self, lookback_days: int = 7, unread_or_flagged_only: bool = True,
+                         flagged_only: bool = False) -> Iterator[Any]:
+        """Yield filtered inbox MailItems one at a time, newest first.
+
+        Walks the restricted collection with GetFirst/GetNext so callers can
+        start work on the first items while Outlook is still enumerating, and
+        no list of COM objects is held.
+        """
         if not self.namespace:
-            return []
+            return
 
         inbox = self.namespace.GetDefaultFolder(6)  # 6 = olFolderInbox
-        items = inbox.Items
-        items.Sort("[ReceivedTime]", True)  # Sort by newest first
+        filter_str = self._inbox_filter(lookback_days, unread_or_flagged_only, flagged_only)
+        yield from self._iter_restricted(inbox, filter_str)
 
-        cutoff_date = datetime.now() - timedelta(days=lookback_days)
-        date_filter = f"[ReceivedTime] >= '{cutoff_date.strftime('%m/%d/%Y')}'"
+    def _iter_restricted(self, folder, filter_str: str) -> Iterator[Any]:
+        try:
+            items = folder.Items
+            items.Sort("[ReceivedTime]", True)  # Sort by newest first
+            filtered_items = items.Restrict(filter_str)
+            logger.info(f"MAPI filter applied: {filter_str}")
+            item = filtered_items.GetFirst()
+            while item is not None:
+                yield item
+                item = filtered_items.GetNext()
+        except Exception as e:
+            logger.error(f"Error filtering items in {getattr(folder, 'Name', 'folder')}: {e}")
+            metrics().count("com.errors")
 
-        # Build filter string with status and message class
-        if unread_or_flagged_only:
-            # Status filter: Unread OR Flagged (FlagStatus = 2 means flagged)
-            status_filter = "([UnRead] = True) OR ([FlagStatus] = 2)"
-            # MessageClass filter: Only email messages (IPM.Note)
-            filter_str = f"({date_filter}) AND ({status_filter}) AND ([MessageClass] = 'IPM.Note')"
+    def get_inbox_rows(self, lookback_days: int = 7, unread_or_flagged_only: bool = True,
+                       flagged_only: bool = False) -> List[Dict[str, Any]]:
+        """Fetch inbox rows in bulk via Folder.GetTable.
+
+        Only the columns in INBOX_TABLE_COLUMNS are requested, so each row costs
+        no per-property COM calls. Returns a list of dicts keyed by column.
+        """
+        rows = list(self.iter_inbox_rows(lookback_days, unread_or_flagged_only, flagged_only))
+        logger.info(f"MAPI table returned {len(rows)} rows")
+        return rows
+
+    def iter_inbox_rows(self, lookback_days: int = 7, unread_or_flagged_only: bool = True,
+                        flagged_only: bool = False) -> Iterator[Dict[str, Any]]:
+        """Streaming form of get_inbox_rows; rows are yielded batch by batch as GetArray returns them."""
+        if not self.namespace:
+            return
+
+        inbox = self.namespace.GetDefaultFolder(6)  # 6 = olFolderInbox
+        filter_str = self._inbox_filter(lookback_days, unread_or_flagged_only, flagged_only)
+        yield from self._iter_table(inbox, filter_str)
+
+    def get_inbox_previews(self, lookback_days: int = 7, flagged_only: bool = True) -> Dict[str, str]:
+        """Preview column for the items ``iter_inbox_items`` yields, keyed by EntryID.
+
+        One Table read; string columns are truncated to 255 characters, so
+        no item's full body crosses the process boundary.
+        """
+        if not self.namespace:
+            return {}
+        inbox = self.namespace.GetDefaultFolder(6)
+        filter_str = self._inbox_filter(lookback_days, True, flagged_only)
+        try:
+            table = inbox.GetTable(filter_str, OL_USER_ITEMS)
+            return {row["EntryID"]: row["BodyPreview"] or "" for row in iter_table_rows(table, PREVIEW_TABLE_COLUMNS)}
+        except Exception as e:
+            logger.error(f"Error reading inbox previews: {e}")
+            metrics().count("com.errors")
+            return {}
+
+    def _iter_table(self, folder, filter_str: str) -> Iterator[Dict[str, Any]]:
+        try:
+            table = folder.GetTable(filter_str, OL_USER_ITEMS)
+            table.Sort("ReceivedTime", True)  # Newest first
+            logger.info(f"MAPI table filter applied: {filter_str}")
+            yield from iter_table_rows(table, INBOX_TABLE_COLUMNS)
+        except Exception as e:
+            logger.error(f"Error reading table for {getattr(folder, 'Name', 'folder')}: {e}")
+            metrics().count("com.errors")
+
+    def iter_folder_items(self, store: str = "", path: str = "Inbox", recursive: bool = False,
+                          lookback_days: int = 7, flagged_only: bool = True) -> Iterator[Tuple[str, Any]]:
+        """Yield (folder label, MailItem) for a configured folder, and its subfolders if recursive.
+
+        Same DASL query as iter_inbox_items, applied per folder. ``store`` is
+        a store's DisplayName (shared mailbox, PST); empty for the default store.
+        """
+        if not self.namespace:
+            return
+        filter_str = self._inbox_filter(lookback_days, True, flagged_only)
+        for label, folder in self._resolve_folders(store, path, recursive):
+            for item in self._iter_restricted(folder, filter_str):
+                yield label, item
+
+    def iter_folder_rows(self, store: str = "", path: str = "Inbox", recursive: bool = False,
+                         lookback_days: int = 7, flagged_only: bool = True) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Table-mode form of iter_folder_items."""
+        if not self.namespace:
+            return
+        filter_str = self._inbox_filter(lookback_days, True, flagged_only)
+        for label, folder in self._resolve_folders(store, path, recursive):
+            for row in self._iter_table(folder, filter_str):
+                yield label, row
+
+    def _resolve_folders(self, store: str, path: str, recursive: bool) -> List[Tuple[str, Any]]:
+        """Find the folder at ``path`` ("Inbox/Projects") in ``store``; with
+        ``recursive``, also every mail folder below it. Returns (label, Folder) pairs."""
+        label = folder_label(store, path)
+        try:
+            folder = self._find_folder(self._find_store(store), path)
+        except Exception as e:
+            logger.error(f"Folder {label} not found: {e}")
+            metrics().count("com.errors")
+            return []
+
+        folders = [(label, folder)]
+        if recursive:
+            pending = [(label, folder)]
+            while pending:
+                parent_label, parent = pending.pop()
+                subfolders = parent.Folders
+                for index in range(1, subfolders.Count + 1):
+                    subfolder = subfolders.Item(index)
+                    if subfolder.DefaultItemType != OL_MAIL_ITEM:
+                        continue  # calendars, contacts, tasks
+                    entry = (f"{parent_label}/{subfolder.Name}", subfolder)
+                    folders.append(entry)
+                    pending.append(entry)
+        logger.debug(f"Resolved {len(folders)} folder(s) for {label}")
+        return folders
+
+    def _find_store(self, display_name: str):
+        if not display_name:
+            return self.namespace.DefaultStore
+        stores = self.namespace.Stores
+        for index in range(1, stores.Count + 1):
+            store = stores.Item(index)
+            if store.DisplayName.lower() == display_name.lower():
+                return store
+        raise ValueError(f"no store named {display_name!r} in this Outlook profile")
+
+    def _find_folder(self, store, path: str):
+        parts = [part for part in path.split("/") if part]
+        if parts and parts[0].lower() == "inbox":
+            # Resolve the inbox by type, not name, so non-English profiles work
+            try:
+                folder = store.GetDefaultFolder(6)  # 6 = olFolderInbox
+                parts = parts[1:]
+            except Exception:
+                folder = store.GetRootFolder()
         else:
-            filter_str = f"{date_filter} AND ([MessageClass] = 'IPM.Note')"
+            folder = store.GetRootFolder()
+        for part in parts:
+            folder = folder.Folders.Item(part)
+        return folder
+
+    @contextmanager
+    def worker(self) -> Iterator["OutlookClient"]:
+        """A client for use on the calling (non-main) thread.
 
+        COM objects belong to the apartment that created them, so a worker
+        thread cannot use this client's namespace. It initialises its own
+        single-threaded apartment and gets its own Outlook proxy instead.
+        """
+        pythoncom.CoInitialize()
+        client = OutlookClient(only_when_open=self.only_when_open)
         try:
-            filtered_items = items.Restrict(filter_str)
+            if not client.connect():
+                raise RuntimeError("Could not connect to Outlook from worker thread")
+            yield client
+        finally:
+            client.disconnect()
+            pythoncom.CoUninitialize()
+
+    def open_item(self, entry_id: str) -> Any:
+        """The item with ``entry_id`` in the default store, opened through this client's namespace."""
+        return self.namespace.GetItemFromID(entry_id)
+
+    def get_modified_inbox_items(self, since: datetime) -> List[Any]:
+        """Inbox mail items whose LastModificationTime is after ``since``.
+
+        Flag status is deliberately not filtered so callers can see items
+        that have been unflagged since the last sync.
+        """
+        if not self.namespace:
+            return []
+
+        inbox = self.namespace.GetDefaultFolder(6)  # 6 = olFolderInbox
+        filter_str = self._modified_filter(since)
+
+        try:
+            filtered_items = inbox.Items.Restrict(filter_str)
             logger.info(f"MAPI filter applied: {filter_str}")
             return list(filtered_items)
         except Exception as e:
-            logger.error(f"Error filtering inbox items: {e}")
+            logger.error(f"Error filtering modified inbox items: {e}")
+            metrics().count("com.errors")
             return []
-            
+
+    def get_modified_inbox_rows(self, since: datetime) -> List[Dict[str, Any]]:
+        """Table-based counterpart of get_modified_inbox_items."""
+        if not self.namespace:
+            return []
+
+        inbox = self.namespace.GetDefaultFolder(6)  # 6 = olFolderInbox
+        filter_str = self._modified_filter(since)
+
+        try:
+            table = inbox.GetTable(filter_str, OL_USER_ITEMS)
+            rows = read_table_rows(table, INBOX_TABLE_COLUMNS)
+            logger.info(f"MAPI table filter applied: {filter_str} ({len(rows)} rows)")
+            return rows
+        except Exception as e:
+            logger.error(f"Error reading modified inbox table: {e}")
+            metrics().count("com.errors")
+            return []
+
+    def _modified_filter(self, since: datetime) -> str:
+        return str(message_class("IPM.Note") & modified_after(since))
+
+    def _inbox_filter(self, lookback_days: int, unread_or_flagged_only: bool, flagged_only: bool = False) -> str:
+        cutoff_date = datetime.now() - timedelta(days=lookback_days)
+        query = message_class("IPM.Note") & received_since(cutoff_date)
+        if flagged_only:
+            # Marked for follow-up, or completed but still unread: exactly what the
+            # old unread-or-flagged Restrict plus the FlagStatus > 0 post-filter kept
+            return str(query & followup())
+        if unread_or_flagged_only:
+            return str(query & (is_unread() | flag_status(FLAG_MARKED)))
+        return str(query)
+
     def get_sent_items(self, lookback_days: int = 2) -> List[Any]:
         if not self.namespace:
             return []
@@ -71,13 +286,14 @@ class OutlookClient:
         items.Sort("[SentOn]", True)
         
         cutoff_date = datetime.now() - timedelta(days=lookback_days)
-        filter_str = f"[SentOn] >= '{cutoff_date.strftime('%m/%d/%Y')}'"
+        filter_str = str(sent_since(cutoff_date.replace(hour=0, minute=0, second=0, microsecond=0)))
         
         try:
             filtered_items = items.Restrict(filter_str)
             return list(filtered_items)
         except Exception as e:
             logger.error(f"Error filtering sent items: {e}")
+            metrics().count("com.errors")
             return []
             
     def get_calendar_items(self, start_date: datetime = None, end_date: datetime = None) -> List[Any]:
@@ -101,48 +317,54 @@ class OutlookClient:
             return list(filtered_items)
         except Exception as e:
             logger.error(f"Error filtering calendar items: {e}")
+            metrics().count("com.errors")
             return []
             
     def get_overdue_items(self, overdue_days: int = 30) -> List[Any]:
+        """Flagged or unread inbox items older than ``overdue_days``, from one Restrict call."""
         if not self.namespace:
             return []
-            
+
         inbox = self.namespace.GetDefaultFolder(6)
-        items = inbox.Items
-        
-        cutoff_date = datetime.now() - timedelta(days=overdue_days)
-        
-        # Get flagged items
-        flagged_filter = f"[FlagStatus] = 1 OR [FlagStatus] = 2"
-        unread_filter = f"[UnRead] = True"
-        date_filter = f"[ReceivedTime] < '{cutoff_date.strftime('%m/%d/%Y')}'"
-        
-        overdue_items = []
-        
+        filter_str = self._overdue_filter(overdue_days)
+
         try:
-            # Get old flagged items
-            filter_str = f"({flagged_filter}) AND {date_filter}"
-            flagged_items = items.Restrict(filter_str)
-            overdue_items.extend(list(flagged_items))
-            
-            # Get old unread items
-            filter_str = f"{unread_filter} AND {date_filter}"
-            unread_items = items.Restrict(filter_str)
-            overdue_items.extend(list(unread_items))
-            
-            # Remove duplicates based on EntryID
-            seen = set()
-            unique_items = []
-            for item in overdue_items:
-                if item.EntryID not in seen:
-                    seen.add(item.EntryID)
-                    unique_items.append(item)
-                    
-            return unique_items
+            # One query covers both conditions, so no item can come back twice
+            overdue_items = list(inbox.Items.Restrict(filter_str))
+            logger.info(f"Overdue filter applied: {filter_str} ({len(overdue_items)} items)")
+            return overdue_items
         except Exception as e:
             logger.error(f"Error getting overdue items: {e}")
+            metrics().count("com.errors")
             return []
-            
+
+    def get_overdue_rows(self, overdue_days: int = 30) -> List[Dict[str, Any]]:
+        """Table-based counterpart of get_overdue_items: one query, column-only fetch."""
+        if not self.namespace:
+            return []
+
+        inbox = self.namespace.GetDefaultFolder(6)
+        filter_str = self._overdue_filter(overdue_days)
+
+        try:
+            table = inbox.GetTable(filter_str, OL_USER_ITEMS)
+            table.Sort("ReceivedTime", True)  # Newest first
+            rows = read_table_rows(table, INBOX_TABLE_COLUMNS)
+            logger.info(f"Overdue table filter applied: {filter_str} ({len(rows)} rows)")
+            return rows
+        except Exception as e:
+            logger.error(f"Error reading overdue table: {e}")
+            metrics().count("com.errors")
+            return []
+
+    def _overdue_filter(self, overdue_days: int) -> str:
+        """Mail items with flag status 1 or 2, or unread, received before the cutoff day."""
+        cutoff_date = (datetime.now() - timedelta(days=overdue_days)).replace(
+            hour=0, minute=0, second=0, microsecond=0)
+        return str(message_class("IPM.Note")
+                   & any_of(flag_status(FLAG_COMPLETE), flag_status(FLAG_MARKED), is_unread())
+                   & received_before(cutoff_date))
+
     def send_email(self, to: str, subject: str, html_body: str, attachments: List[str] = None):
         if not self.outlook:
             raise RuntimeError("Not connected to Outlook")
@@ -0,0 +1,260 @@
+"""One briefing run: collect, prioritise, analyse, render, send.
+
+``BriefingSession`` holds what can outlive a run - the connected backend,
+the prioritiser's compiled rules, the renderer's Jinja environment and the
+sender/AI caches. ``run_summary.py`` builds one per process; the daemon
+(``briefing.daemon``) keeps one alive and calls ``run_briefing`` per trigger.
+"""
+import os
+import time
+import logging
+import tempfile
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+from .collector import EmailCollector, EmailItem
+from .prioritiser import EmailPrioritiser
+from .renderer import ReportRenderer
+from .ai_analyzer import EmailAnalyzer
+from .snapshot_store import SnapshotStore
+from .sender_cache import create_sender_cache
+from .folders import folder_specs
+from .instrumentation import RunMetrics, Profiler, begin_run, run_report_path, write_run_report
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BriefingResult:
+    mode: str
+    subject: str
+    email_count: int
+    day_count: int
+    sent: bool
+    duration_seconds: float
+    stages: Dict[str, Any] = field(default_factory=dict)  # per-stage seconds/calls from RunMetrics
+
+
+class BriefingSession:
+    def __init__(self, config: Dict[str, Any], backend):
+        self.backend = backend
+        self.configure(config)
+
+    def configure(self, config: Dict[str, Any]):
+        """(Re)build the config-derived components; the backend connection is kept."""
+        previous_analyzer = getattr(self, "analyzer", None)
+        self.config = config
+        self.prioritiser = EmailPrioritiser(config)
+        self.renderer = ReportRenderer(config=config)
+        self.analyzer = EmailAnalyzer(config)
+        if previous_analyzer is not None:
+            previous_analyzer.close()
+        self.sender_cache = create_sender_cache(config)
+
+
+def run_briefing(session: BriefingSession, mode: str, dry_run: bool = False,
+                 from_snapshot: bool = False, run_metrics: Optional[RunMetrics] = None,
+                 profile: bool = False) -> BriefingResult:
+    """Produce one briefing with an already connected session.
+
+    Stage timings and counters go to ``run_metrics`` (a fresh RunMetrics if
+    not given); ``profile`` adds cProfile and tracemalloc results. The run
+    report is written next to the preview HTML (see run_report_path).
+    Raises ValueError for configuration problems; other errors propagate.
+    """
+    run = run_metrics or begin_run()
+    profiler = Profiler() if profile else None
+    with profiler or nullcontext():
+        result = _run_briefing(session, mode, dry_run, from_snapshot, run)
+
+    report = run.report()
+    result.stages = report["stages"]
+    logger.info("Stage times: " + ", ".join(f"{name} {totals['seconds']:.3f}s"
+                                            for name, totals in report["stages"].items()))
+    report_path = run_report_path(session.config)
+    if report_path:
+        report.update(mode=mode, dry_run=dry_run, email_count=result.email_count)
+        if profiler:
+            report["profile"] = profiler.report()
+        write_run_report(report_path, report)
+    elif profiler:
+        logger.warning("--profile needs report.preview_html or report.run_report to write its report")
+    return result
+
+
+def _run_briefing(session: BriefingSession, mode: str, dry_run: bool, from_snapshot: bool,
+                  run: RunMetrics) -> BriefingResult:
+    started = time.perf_counter()
+    config = session.config
+    backend = session.backend
+    snapshot_db = config.get('storage', {}).get('snapshot_db')
+    collector = None
+    overdue_emails = None
+    lookback_days = config.get('behaviour', {}).get('lookback_days_inbox', 31)
+    collect_window = datetime.now() - timedelta(days=lookback_days)
+
+    # Collect items (only flagged emails now)
+    if from_snapshot:
+        if not snapshot_db:
+            raise ValueError("--from-snapshot requires storage.snapshot_db in the configuration")
+        compact = config.get('storage', {}).get('compact_items', False)
+        with run.stage("collect"), SnapshotStore(snapshot_db, compact=compact) as store:
+            emails = store.query(received_since=datetime.now() - timedelta(days=lookback_days), flagged=True)
+        logger.info(f"Loaded emails from snapshot store {snapshot_db}")
+    else:
+        collector = EmailCollector(backend, session.sender_cache)
+        if config.get('behaviour', {}).get('incremental_sync', False) or folder_specs(config):
+            # Incremental merge or per-store worker threads: both return complete lists
+            with run.stage("collect"):
+                collected_sections = collector.collect_all(config)
+            emails = collected_sections.get('inbox', [])
+            overdue_emails = collected_sections.get('overdue')
+        else:
+            # Stream so prioritisation runs while the backend is still enumerating
+            emails = collector.iter_inbox(config)
+
+    # Counts what was collected before selection; a live collection is also
+    # kept whole for the snapshot store, since top_k may show fewer emails
+    collected = _Collected(emails, keep=bool(snapshot_db) and not from_snapshot)
+
+    # Prioritise and group by day
+    with run.stage("prioritise"):
+        grouped_by_day = session.prioritiser.prioritise_and_group(collected)
+    all_emails = [email for day_emails in grouped_by_day.values() for email in day_emails]
+    run.set_gauge("emails.collected", collected.count)
+    run.set_gauge("emails.selected", len(all_emails))
+
+    if len(all_emails) < collected.count:
+        logger.info(f"Collected {collected.count} flagged emails, showing {len(all_emails)}")
+    else:
+        logger.info(f"Collected {collected.count} flagged emails")
+
+    # Overdue section: one backend query, skipping emails already listed above
+    if collector is not None and overdue_emails is None and config.get('behaviour', {}).get('overdue_days'):
+        with run.stage("collect"):
+            overdue_emails = collector.collect_overdue(config, exclude_ids=(email.entry_id for email in all_emails))
+    if overdue_emails is not None:
+        run.set_gauge("emails.overdue", len(overdue_emails))
+
+    if collector is not None:
+        sender_cache = session.sender_cache
+        sender_cache.save()
+        lookups = sender_cache.hits + sender_cache.misses
+        if lookups:
+            logger.info(f"Sender address cache: {sender_cache.hits}/{lookups} DN lookups served from cache "
+                        f"({sender_cache.hit_rate:.0%} hit rate)")
+
+    # AI-powered analysis (if enabled)
+    with run.stage("ai_analysis"):
+        _apply_ai_analysis(session.analyzer, all_emails)
+
+    # Persist collected emails with scores and AI summaries so the next run starts warm
+    if snapshot_db:
+        with run.stage("persist"), SnapshotStore(snapshot_db) as store:
+            if collected.items is not None:
+                # A full collection: store all of it and unflag what it no longer found
+                cleared = store.sync_flagged(collected.items, received_since=collect_window)
+                if cleared:
+                    logger.info(f"Snapshot store: {cleared} emails no longer flagged")
+            else:
+                store.upsert_items(all_emails)
+        logger.info(f"Snapshot store updated: {snapshot_db}")
+
+    # Render report
+    with run.stage("render"):
+        html_report = session.renderer.render_report(grouped_by_day, config, mode, overdue_emails=overdue_emails)
+        subject = session.renderer.render_subject(config, mode)
+    run.set_gauge("report.bytes", len(html_report.encode("utf-8")))
+
+    # Send or display report
+    if dry_run:
+        _log_dry_run(config, subject, grouped_by_day)
+    else:
+        with run.stage("send"):
+            _send_report(backend, config, subject, html_report)
+
+    return BriefingResult(mode=mode, subject=subject, email_count=len(all_emails),
+                          day_count=len(grouped_by_day), sent=not dry_run,
+                          duration_seconds=time.perf_counter() - started)
+
+
+class _Collected:
+    """Pass ``emails`` through once, counting them and, with ``keep``, keeping them in ``items``."""
+
+    def __init__(self, emails: Iterable[EmailItem], keep: bool = False):
+        self.emails = emails
+        self.count = 0
+        self.items: Optional[List[EmailItem]] = [] if keep else None
+
+    def __iter__(self) -> Iterator[EmailItem]:
+        for email in self.emails:
+            self.count += 1
+            if self.items is not None:
+                self.items.append(email)
+            yield email
+
+
+def _apply_ai_analysis(analyzer: EmailAnalyzer, all_emails: List[EmailItem]):
+    if not analyzer.is_enabled():
+        logger.debug("AI analysis disabled or not available")
+        return
+
+    logger.info("AI analysis enabled - analyzing qualifying emails")
+    ai_results = analyzer.analyze_batch(all_emails)
+
+    # Update emails with AI-generated summaries and actions
+    for email in all_emails:
+        if email.entry_id in ai_results:
+            result = ai_results[email.entry_id]
+            if result.success:
+                email.ai_summary = result.summary
+                # Replace recommended_action with AI version
+                email.recommended_action = result.recommended_action
+                logger.debug(f"AI updated: {email.subject[:40]}")
+
+
+def _log_dry_run(config: Dict[str, Any], subject: str, grouped_by_day: Dict[str, List[EmailItem]]):
+    logger.info("DRY RUN MODE - Email not sent")
+    logger.info(f"Subject: {subject}")
+    logger.info(f"To: {config['report']['to']}")
+
+    # Save preview if configured
+    preview_path = config.get('report', {}).get('preview_html')
+    if preview_path:
+        logger.info(f"Report preview saved to: {preview_path}")
+
+    # Print summary stats
+    total_emails = sum(len(emails) for emails in grouped_by_day.values())
+    logger.info(f"\nTotal flagged emails: {total_emails}")
+    logger.info(f"Days with emails: {len(grouped_by_day)}")
+
+    # Print sample emails
+    for day_key, emails in list(grouped_by_day.items())[:3]:
+        logger.info(f"\n{day_key}: {len(emails)} emails")
+        for email in emails[:2]:
+            logger.info(f"  - {email.subject[:60]}")
+
+
+def _send_report(backend, config: Dict[str, Any], subject: str, html_report: str):
+    # Create temporary HTML file for attachment
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as temp_file:
+        temp_file.write(html_report)
+        temp_path = temp_file.name
+
+    try:
+        # Send the email with HTML attachment
+        backend.send_email(
+            to=config['report']['to'],
+            subject=subject,
+            html_body=html_report,
+            attachments=[temp_path]
+        )
+        logger.info(f"Report sent successfully to {config['report']['to']} with HTML attachment")
+    finally:
+        # Clean up temporary file
+        try:
+            os.unlink(temp_path)
+        except Exception as e:
+            logger.warning(f"Failed to delete temporary file {temp_path}: {e}")
@@ -1,66 +1,119 @@
-import re
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional, Iterable
 from dataclasses import dataclass
+import heapq
 import logging
 from .collector import EmailItem
+from .rules import KeywordRuleEngine, KeywordRule
+from .keywords import KeywordAutomaton, DEFAULT_WHY_KEYWORDS
 
 logger = logging.getLogger(__name__)
 
 
+def selects_top_k(config: Dict[str, Any]) -> bool:
+    """True if ``report.selection`` is "top_k": groups come back capped and newest first."""
+    return config.get("report", {}).get("selection", "all") == "top_k"
+
+
+def _display_order(item: EmailItem) -> Tuple[bool, int, float]:
+    # Flagged first (by importance desc, then time desc), then Unread (by time desc)
+    return (
+        not item.is_flagged,  # Flagged first (False comes before True)
+        -item.importance if item.is_flagged else 0,  # High > Normal > Low for flagged
+        -item.received_time.timestamp()  # Newest first
+    )
+
+
+def _group_by_day(items: Iterable[EmailItem]) -> Dict[str, List[EmailItem]]:
+    """Group in iteration order, keyed by "YYYY-MM-DD" of ``received_time``."""
+    # NOTE: Outlook COM returns ReceivedTime in local timezone but marked as UTC.
+    # We use the date directly without conversion to match Outlook's display.
+    by_date = {}
+    for item in items:
+        by_date.setdefault(item.received_time.date(), []).append(item)
+    # Format each day once rather than once per item
+    return {day.strftime('%Y-%m-%d'): day_items for day, day_items in by_date.items()}
+
+
 class EmailPrioritiser:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.priorities = config.get("priorities", {})
         self.vip_domains = [d.lower() for d in self.priorities.get("vip_domains", [])]
-        self.vip_senders = [s.lower() for s in self.priorities.get("vip_senders", [])]
+        self.vip_senders = {s.lower() for s in self.priorities.get("vip_senders", [])}
         self.ignore_domains = [d.lower() for d in self.priorities.get("ignore_domains", [])]
         self.downrank_domains = [d.lower() for d in self.priorities.get("downrank_domains", [])]
         self.group_mappings = {k.lower(): v for k, v in self.priorities.get("group_mappings", {}).items()}
         self.keyword_rules = self.priorities.get("keyword_rules", [])
-        
-    def prioritise_and_group(self, items: List[EmailItem]) -> Dict[str, List[EmailItem]]:
-        # Calculate scores and derive fields for all items
+        self.rule_engine = KeywordRuleEngine(self.keyword_rules)
+        self.why_keywords = KeywordAutomaton(self.priorities.get("why_keywords", DEFAULT_WHY_KEYWORDS))
+
+    def prioritise_and_group(self, items: Iterable[EmailItem]) -> Dict[str, List[EmailItem]]:
+        # ``items`` may be a stream (EmailCollector.iter_inbox); each email is
+        # scored and annotated as it arrives
+        annotated = []
         for item in items:
-            score, reason = self._calculate_priority(item)
-            item.priority_score = score
-            item.priority_reason = reason
-            item.priority_label = self._get_priority_label(item.importance)
-            # VIP senders get "VIP" status, otherwise "Flagged" or "Unread"
-            if item.is_vip_sender:
-                item.status_label = "VIP"
-            else:
-                item.status_label = "Flagged" if item.is_flagged else "Unread"
-            item.recommended_action = self._derive_action(item)
-            item.why_it_matters = self._derive_why_matters(item)
-
-        # Sort: Flagged first (by importance desc, then time desc), then Unread (by time desc)
-        items_sorted = sorted(items, key=lambda x: (
-            not x.is_flagged,  # Flagged first (False comes before True)
-            -x.importance if x.is_flagged else 0,  # High > Normal > Low for flagged
-            -x.received_time.timestamp()  # Newest first
-        ))
-
-        # Group by day
-        # NOTE: Outlook COM returns ReceivedTime in local timezone but marked as UTC.
-        # We use the date directly without conversion to match Outlook's display.
-        grouped_by_day = {}
-        for item in items_sorted:
-            # Use date directly from ReceivedTime (already in local/display timezone)
-            item_date = item.received_time.date()
-
-            day_key = item_date.strftime('%Y-%m-%d')
-            if day_key not in grouped_by_day:
-                grouped_by_day[day_key] = []
-            grouped_by_day[day_key].append(item)
-
-        logger.info(f"Grouped {len(items)} items into {len(grouped_by_day)} days")
+            # One scan of subject + preview per item feeds score, reason and action
+            matched_rules = self._match_rules(item)
+            item.priority_score, item.priority_reason = self._calculate_priority(item, matched_rules)
+            self._annotate(item, matched_rules)
+            annotated.append(item)
+
+        if selects_top_k(self.config):
+            return self._select_top_k(annotated)
+
+        grouped_by_day = _group_by_day(sorted(annotated, key=_display_order))
+
+        logger.info(f"Grouped {len(annotated)} items into {len(grouped_by_day)} days")
         return grouped_by_day
-        
+
+    def _select_top_k(self, items: List[EmailItem]) -> Dict[str, List[EmailItem]]:
+        """Keep only what the report can show, then sort once (``report.selection: top_k``).
+
+        Each day keeps its first ``max_items_per_day`` items in display order,
+        chosen by heap selection (O(n log k)) instead of a full sort. Across
+        days, the first ``max_items_per_section`` of those are kept. The
+        survivors are sorted newest first, once, so days come out newest
+        first and the renderer can use them in that order without sorting.
+        """
+        report = self.config.get("report", {})
+        per_day = report.get("max_items_per_day")
+        per_section = report.get("max_items_per_section")
+
+        selected = []
+        for day_items in _group_by_day(items).values():
+            if per_day and len(day_items) > per_day:
+                day_items = heapq.nsmallest(per_day, day_items, key=_display_order)
+            selected.extend(day_items)
+        if per_section and len(selected) > per_section:
+            selected = heapq.nsmallest(per_section, selected, key=_display_order)
+        selected.sort(key=lambda x: x.received_time.timestamp(), reverse=True)
+
+        grouped_by_day = _group_by_day(selected)
+        logger.info(f"Selected {len(selected)} of {len(items)} items across {len(grouped_by_day)} days")
+        return grouped_by_day
+
+    def _annotate(self, item: EmailItem, matched_rules: List[KeywordRule]):
+        """Set the display fields derived from the item and its matched rules."""
+        item.priority_label = self._get_priority_label(item.importance)
+        # VIP senders get "VIP" status, otherwise "Flagged" or "Unread"
+        if item.is_vip_sender:
+            item.status_label = "VIP"
+        else:
+            item.status_label = "Flagged" if item.is_flagged else "Unread"
+        item.recommended_action = self._derive_action(item, matched_rules)
+        item.why_it_matters = self._derive_why_matters(item)
+
     def _is_ignored(self, item: EmailItem) -> bool:
         sender_domain = self._get_domain(item.sender_email)
         return sender_domain in self.ignore_domains
         
-    def _calculate_priority(self, item: EmailItem) -> Tuple[int, str]:
+    def _match_rules(self, item: EmailItem) -> List[KeywordRule]:
+        return self.rule_engine.match(item.subject + " " + item.body_preview)
+
+    def _calculate_priority(self, item: EmailItem, matched_rules: Optional[List[KeywordRule]] = None) -> Tuple[int, str]:
+        if matched_rules is None:
+            matched_rules = self._match_rules(item)
+
         score = 50  # Base score
         reasons = []
         
@@ -91,15 +144,13 @@ class EmailPrioritiser:
             reasons.append("Unread")
             
         # Check keyword rules
-        for rule in self.keyword_rules:
-            pattern = rule.get("pattern", "")
-            if pattern and re.search(pattern, item.subject + " " + item.body_preview, re.IGNORECASE):
-                if rule.get("priority") == "critical":
-                    score += 50
-                    reasons.append(f"Critical keyword: {rule.get('suggest', 'Match')}")
-                elif rule.get("priority") == "high":
-                    score += 25
-                    reasons.append(f"High priority keyword: {rule.get('suggest', 'Match')}")
+        for rule in matched_rules:
+            if rule.priority == "critical":
+                score += 50
+                reasons.append(f"Critical keyword: {rule.suggest or 'Match'}")
+            elif rule.priority == "high":
+                score += 25
+                reasons.append(f"High priority keyword: {rule.suggest or 'Match'}")
                     
         # Downrank if from downrank domain
         if sender_domain in self.downrank_domains:
@@ -150,13 +201,14 @@ class EmailPrioritiser:
         """Convert Outlook importance value to readable label."""
         return {2: "High", 1: "Normal", 0: "Low"}.get(importance, "Normal")
 
-    def _derive_action(self, item: EmailItem) -> str:
+    def _derive_action(self, item: EmailItem, matched_rules: Optional[List[KeywordRule]] = None) -> str:
         """Derive recommended action based on item properties and keywords."""
-        # Check keyword rules for specific suggestions
-        for rule in self.keyword_rules:
-            pattern = rule.get('pattern', '')
-            if pattern and re.search(pattern, item.subject + ' ' + item.body_preview, re.IGNORECASE):
-                return rule.get('suggest', 'Review and respond')
+        if matched_rules is None:
+            matched_rules = self._match_rules(item)
+
+        # First matching keyword rule (in config order) supplies the suggestion
+        if matched_rules:
+            return matched_rules[0].suggest or 'Review and respond'
 
         # Default actions based on status and importance
         if item.is_flagged and item.importance == 2:
@@ -175,7 +227,7 @@ class EmailPrioritiser:
         sender_domain = self._get_domain(item.sender_email)
 
         # Check VIP status
-        if item.sender_email.lower() in [s.lower() for s in self.vip_senders]:
+        if item.sender_email.lower() in self.vip_senders:
             reasons.append("VIP sender")
         elif sender_domain in self.vip_domains:
             reasons.append("Key customer/partner")
@@ -188,10 +240,9 @@ class EmailPrioritiser:
         if item.is_flagged:
             reasons.append("flagged for follow-up")
 
-        # Check for critical keywords in subject and body
-        critical_keywords = ['urgent', 'asap', 'contract', 'invoice', 'payment', 'tender', 'proposal']
-        text = (item.subject + ' ' + item.body_preview).lower()
-        matched = [kw for kw in critical_keywords if kw in text]
+        # Check for why_keywords in subject and body (one pass over the text)
+        matched = self.why_keywords.find(item.subject + ' ' + item.body_preview)
+        item.matched_keywords = matched
         if matched:
             reasons.append(f"contains: {', '.join(matched)}")
 
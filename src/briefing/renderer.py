@@ -5,6 +5,7 @@ import os
 import logging
 from tzlocal import get_localzone
 from .collector import EmailItem, CalendarItem
+from .prioritiser import selects_top_k
 
 logger = logging.getLogger(__name__)
 
@@ -31,22 +32,29 @@ class ReportRenderer:
     def render_report(self,
                      grouped_by_day: Dict[str, List[EmailItem]],
                      config: Dict[str, Any],
-                     mode: str = "morning") -> str:
+                     mode: str = "morning",
+                     overdue_emails: List[EmailItem] = None) -> str:
 
         template = self.env.get_template("report.html.j2")
 
         # Get all emails (should all be flagged now)
         all_emails = [email for day_emails in grouped_by_day.values() for email in day_emails]
 
-        # Sort all flagged emails by received time, newest first
-        flagged_emails = sorted(all_emails, key=lambda x: -x.received_time.timestamp())
+        # Sort all flagged emails by received time, newest first (top_k selection already has)
+        if selects_top_k(config):
+            flagged_emails = all_emails
+        else:
+            flagged_emails = sorted(all_emails, key=lambda x: -x.received_time.timestamp())
 
         # Prepare simplified context - no daily groupings, no top 3
         context = {
             "timestamp_local": datetime.now().strftime("%Y-%m-%d %H:%M"),
             "mode": mode,
             "flagged_emails": flagged_emails,
-            "total_emails": len(flagged_emails)
+            "total_emails": len(flagged_emails),
+            # None when the overdue section is not configured
+            "overdue_emails": overdue_emails,
+            "overdue_days": config.get("behaviour", {}).get("overdue_days", 30)
         }
 
         # Render HTML
@@ -0,0 +1,141 @@
+"""Precompiled keyword rule matching for the prioritiser.
+
+Rules are compiled once per prioritiser and every matching rule is reported
+from one scan of an email's text. Rules that are plain whole-word
+alternations (``\\burgent\\b|\\bASAP\\b``, the common case) become a
+word-to-rules lookup against the text's tokens; any other patterns are
+compiled into a single alternation of named lookahead groups. Patterns with
+backreferences or named groups would point at the wrong group (or clash)
+inside that alternation, so they are matched on their own. Rules are matched
+case-insensitively, as they always have been.
+"""
+import re
+import logging
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# A leading global inline-flag group such as "(?i)"; global flags are only
+# legal at the very start of a pattern, so they are rewritten as scoped flags
+_LEADING_FLAGS = re.compile(r"^\(\?([aiLmsux]+)\)")
+# A pattern made only of \bword\b alternatives
+_WORD_ALTERNATION = re.compile(r"\\b\w+\\b(?:\|\\b\w+\\b)*")
+_WORD = re.compile(r"\w+")
+# Numbered or named backreferences, conditional groups and named groups;
+# searched for after escaped backslashes are removed
+_GROUP_REFERENCE = re.compile(r"\\[1-9]|\(\?P[<=]|\(\?\(")
+
+
+@dataclass(frozen=True)
+class KeywordRule:
+    index: int       # Position in config keyword_rules
+    pattern: str
+    priority: str    # "critical", "high", ...
+    suggest: str
+
+
+def _scoped(pattern: str) -> str:
+    """Rewrite a leading "(?flags)" group so the pattern can sit inside an alternation."""
+    match = _LEADING_FLAGS.match(pattern)
+    if not match:
+        return f"(?:{pattern})"
+    flags = match.group(1)
+    # Keep only flags valid in a scoped group; IGNORECASE is applied to the whole pattern anyway
+    scoped_flags = "".join(flag for flag in flags if flag in "aimsux")
+    body = pattern[match.end():]
+    return f"(?{scoped_flags}:{body})" if scoped_flags else f"(?:{body})"
+
+
+def _refers_to_groups(pattern: str) -> bool:
+    """True if ``pattern`` names or refers back to its own groups."""
+    return bool(_GROUP_REFERENCE.search(pattern.replace("\\\\", "")))
+
+
+def _word_alternatives(pattern: str) -> Optional[List[str]]:
+    """Lowercased words if ``pattern`` is only \\bword\\b alternatives, else None."""
+    match = _LEADING_FLAGS.match(pattern)
+    body = pattern[match.end():] if match else pattern
+    if not _WORD_ALTERNATION.fullmatch(body):
+        return None
+    return [alternative[2:-2].lower() for alternative in body.split("|")]
+
+
+class KeywordRuleEngine:
+    def __init__(self, keyword_rules: List[Dict[str, Any]]):
+        self.rules: List[KeywordRule] = []
+        self._patterns: List[re.Pattern] = []
+        for index, rule in enumerate(keyword_rules or []):
+            pattern = rule.get("pattern", "")
+            if not pattern:
+                continue
+            try:
+                compiled = re.compile(pattern, re.IGNORECASE)
+            except re.error as e:
+                logger.error(f"Invalid keyword rule pattern {pattern!r}: {e}")
+                continue
+            self.rules.append(KeywordRule(index, pattern, rule.get("priority", ""), rule.get("suggest", "")))
+            self._patterns.append(compiled)
+
+        # Whole-word rules: word -> positions in self.rules
+        self._word_rules: Dict[str, List[int]] = {}
+        # Everything else goes through the combined regex, except patterns
+        # whose group references would break inside it
+        self._regex_rules: List[int] = []
+        self._individual_rules: List[int] = []
+        for position, rule in enumerate(self.rules):
+            words = _word_alternatives(rule.pattern)
+            if _refers_to_groups(rule.pattern):
+                self._individual_rules.append(position)
+            elif words is None:
+                self._regex_rules.append(position)
+            else:
+                for word in words:
+                    self._word_rules.setdefault(word, []).append(position)
+
+        self._combined: Optional[re.Pattern] = None
+        if self._regex_rules:
+            alternation = "|".join(f"(?P<_kw{position}>{_scoped(self.rules[position].pattern)})"
+                                   for position in self._regex_rules)
+            try:
+                self._combined = re.compile(f"(?=(?:{alternation}))", re.IGNORECASE)
+            except re.error as e:
+                logger.warning(f"Could not combine keyword rules, matching individually: {e}")
+                self._individual_rules.extend(self._regex_rules)
+                self._regex_rules = []
+
+    def match(self, text: str) -> List[KeywordRule]:
+        """Return every rule whose pattern occurs in ``text``, in config order."""
+        if not self.rules:
+            return []
+
+        matched = set()
+        if self._word_rules:
+            for word in set(_WORD.findall(text.lower())):
+                positions = self._word_rules.get(word)
+                if positions:
+                    matched.update(positions)
+
+        if self._regex_rules:
+            self._match_combined(text, matched)
+        if self._individual_rules:
+            matched.update(position for position in self._individual_rules
+                           if self._patterns[position].search(text))
+
+        return [self.rules[position] for position in sorted(matched)]
+
+    def _match_combined(self, text: str, matched: set):
+        remaining = set(self._regex_rules) - matched
+        for m in self._combined.finditer(text):
+            winner = int(m.lastgroup[3:])
+            remaining.discard(winner)
+            matched.add(winner)
+            # Alternation stops at the first rule matching here; later rules
+            # matching at the same position are checked with an anchored match
+            position = m.start()
+            for later in [p for p in remaining if p > winner]:
+                if self._patterns[later].match(text, position):
+                    remaining.discard(later)
+                    matched.add(later)
+            if not remaining:
+                break
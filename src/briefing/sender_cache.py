@@ -0,0 +1,98 @@
+"""Cache of Exchange DN -> SMTP address resolutions.
+
+Resolving an internal sender's ``/O=...`` distinguished name needs
+``Sender.GetExchangeUser()``, a directory lookup over COM. The same
+colleagues appear many times per run, so results are kept in memory for the
+run and, when a path is configured, in a JSON file with a TTL so later runs
+start warm. Conversion worker threads share one cache, so entries and
+counters are only touched under a lock.
+"""
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SenderAddressCache:
+    VERSION = 1
+
+    def __init__(self, path: Optional[str] = None, ttl_days: float = 7):
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400
+        # dn (upper-cased) -> (smtp, resolved_at)
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path:
+            self._load()
+
+    def get(self, dn: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(dn.upper())
+            if entry is None or time.time() - entry[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[0]
+
+    def put(self, dn: str, smtp: str):
+        with self._lock:
+            self._entries[dn.upper()] = (smtp, time.time())
+            self._dirty = True
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != self.VERSION:
+                logger.info(f"Sender cache version mismatch in {self.path}, starting fresh")
+                return
+            cutoff = time.time() - self.ttl_seconds
+            self._entries = {dn: (smtp, resolved_at) for dn, (smtp, resolved_at) in data.get("entries", {}).items()
+                             if resolved_at >= cutoff}
+            logger.debug(f"Sender cache loaded {len(self._entries)} entries from {self.path}")
+        except Exception as e:
+            logger.warning(f"Could not read sender cache {self.path}, starting fresh: {e}")
+
+    def save(self):
+        """Atomically write the cache file if anything was added this run."""
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            entries = dict(self._entries)
+            self._dirty = False
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": self.VERSION, "entries": entries}, f)
+            os.replace(temp_path, self.path)
+            logger.debug(f"Sender cache saved to {self.path} ({len(entries)} entries)")
+        except Exception as e:
+            logger.error(f"Failed to save sender cache {self.path}: {e}")
+            with self._lock:
+                self._dirty = True
+
+
+def create_sender_cache(config: Dict[str, Any]) -> SenderAddressCache:
+    """Build the cache from ``storage.sender_cache``; in-memory only when disabled."""
+    settings = config.get("storage", {}).get("sender_cache", {})
+    if not settings.get("enabled", True):
+        return SenderAddressCache()
+    return SenderAddressCache(settings.get("path", "state/sender_cache.json"), settings.get("ttl_days", 7))
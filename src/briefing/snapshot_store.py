@@ -0,0 +1,261 @@
+"""SQLite store of collected EmailItems, keyed by EntryID.
+
+Holds the collected fields plus priority score, AI summary and first/last
+seen timestamps so repeat runs can start from disk instead of COM. The
+database runs in WAL mode so a reader (e.g. a dry-run) never blocks the
+scheduled run writing to it.
+
+The store also implements the ``load()``/``save()`` interface of
+``SyncState``; when ``storage.snapshot_db`` is configured, incremental sync
+keeps its watermark and snapshot here instead of in a JSON file.
+"""
+import os
+import json
+import sqlite3
+import logging
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+from .collector import EmailItem, compact_email_item
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS emails (
+    entry_id TEXT PRIMARY KEY,
+    subject TEXT NOT NULL,
+    sender_name TEXT NOT NULL,
+    sender_email TEXT NOT NULL,
+    sender_domain TEXT NOT NULL,
+    received_time TEXT NOT NULL,
+    received_ts REAL NOT NULL,
+    importance INTEGER NOT NULL,
+    is_flagged INTEGER NOT NULL,
+    is_unread INTEGER NOT NULL,
+    has_attachments INTEGER NOT NULL,
+    categories TEXT NOT NULL,
+    folder_name TEXT NOT NULL,
+    body_preview TEXT NOT NULL,
+    is_vip_sender INTEGER NOT NULL,
+    priority_score INTEGER NOT NULL DEFAULT 0,
+    ai_summary TEXT NOT NULL DEFAULT '',
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_emails_received ON emails (received_ts);
+CREATE INDEX IF NOT EXISTS idx_emails_flagged ON emails (is_flagged, received_ts);
+CREATE INDEX IF NOT EXISTS idx_emails_domain ON emails (sender_domain);
+CREATE TABLE IF NOT EXISTS sync_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+UPSERT_SQL = """
+INSERT INTO emails (
+    entry_id, subject, sender_name, sender_email, sender_domain, received_time,
+    received_ts, importance, is_flagged, is_unread, has_attachments, categories,
+    folder_name, body_preview, is_vip_sender, priority_score, ai_summary,
+    first_seen, last_seen
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (entry_id) DO UPDATE SET
+    subject = excluded.subject,
+    sender_name = excluded.sender_name,
+    sender_email = excluded.sender_email,
+    sender_domain = excluded.sender_domain,
+    received_time = excluded.received_time,
+    received_ts = excluded.received_ts,
+    importance = excluded.importance,
+    is_flagged = excluded.is_flagged,
+    is_unread = excluded.is_unread,
+    has_attachments = excluded.has_attachments,
+    categories = excluded.categories,
+    folder_name = excluded.folder_name,
+    body_preview = excluded.body_preview,
+    is_vip_sender = excluded.is_vip_sender,
+    priority_score = CASE WHEN excluded.priority_score != 0 THEN excluded.priority_score ELSE emails.priority_score END,
+    ai_summary = CASE WHEN excluded.ai_summary != '' THEN excluded.ai_summary ELSE emails.ai_summary END,
+    last_seen = excluded.last_seen
+"""
+
+SELECT_COLUMNS = ("entry_id, subject, sender_name, sender_email, received_time, importance, "
+                  "is_flagged, is_unread, has_attachments, categories, folder_name, body_preview, "
+                  "is_vip_sender, priority_score, ai_summary")
+
+
+def _domain(email: str) -> str:
+    return email.split("@")[1].lower() if "@" in email else ""
+
+
+def _naive_timestamp(dt: datetime) -> float:
+    # Outlook times are local but may carry a UTC tzinfo; compare them naive, like the collector
+    return dt.replace(tzinfo=None).timestamp()
+
+
+class SnapshotStore:
+    def __init__(self, path: str, compact: bool = False):
+        self.path = path
+        # Return CompactEmailItems (slotted, interned strings) from query/get/load
+        self.compact = compact
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self) -> "SnapshotStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def _row(self, item: EmailItem, seen_at: str) -> Tuple[Any, ...]:
+        return (
+            item.entry_id, item.subject, item.sender_name, item.sender_email,
+            _domain(item.sender_email), item.received_time.isoformat(),
+            _naive_timestamp(item.received_time), item.importance, int(item.is_flagged),
+            int(item.is_unread), int(item.has_attachments), json.dumps(list(item.categories)),
+            item.folder_name, item.body_preview, int(item.is_vip_sender), item.priority_score,
+            item.ai_summary, seen_at, seen_at,
+        )
+
+    def upsert_items(self, items: Iterable[EmailItem], seen_at: datetime = None) -> int:
+        """Insert or update items in one transaction. Returns the number written.
+
+        An empty ``ai_summary`` never overwrites a stored one, nor does an
+        unscored item (``priority_score`` 0) overwrite a stored score.
+        """
+        seen = (seen_at or datetime.now()).isoformat(timespec="seconds")
+        rows = [self._row(item, seen) for item in items if item.entry_id != "error"]
+        with self.conn:
+            self.conn.executemany(UPSERT_SQL, rows)
+        logger.debug(f"Snapshot store upserted {len(rows)} items")
+        return len(rows)
+
+    def sync_flagged(self, items: Iterable[EmailItem], received_since: datetime, seen_at: datetime = None) -> int:
+        """Store a complete flagged collection and clear the flag on the rest of its window.
+
+        ``items`` must be everything a full collection found flagged since
+        ``received_since``; stored items in that window that it did not
+        return have since been unflagged (or completed, moved or deleted)
+        and get ``is_flagged = 0``, so ``query(flagged=True)`` stops
+        returning them. Older items are left alone. Returns the number cleared.
+        """
+        items = list(items)
+        self.upsert_items(items, seen_at=seen_at)
+        return self.clear_flags_except((item.entry_id for item in items), received_since)
+
+    def clear_flags_except(self, entry_ids: Iterable[str], received_since: datetime = None) -> int:
+        """Set ``is_flagged = 0`` on flagged rows not in ``entry_ids``, optionally only since ``received_since``.
+
+        Rows are kept, with their AI summary and priority score, for when
+        the email is flagged again. Returns the number cleared.
+        """
+        sql = "UPDATE emails SET is_flagged = 0 WHERE is_flagged = 1"
+        params: List[Any] = []
+        if received_since is not None:
+            sql += " AND received_ts >= ?"
+            params.append(_naive_timestamp(received_since))
+        with self.conn:
+            self._fill_keep_ids(entry_ids)
+            cleared = self.conn.execute(sql + " AND entry_id NOT IN (SELECT entry_id FROM keep_ids)",
+                                        params).rowcount
+        logger.debug(f"Snapshot store cleared the flag on {cleared} items")
+        return cleared
+
+    def _fill_keep_ids(self, entry_ids: Iterable[str]):
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep_ids (entry_id TEXT PRIMARY KEY)")
+        self.conn.execute("DELETE FROM keep_ids")
+        self.conn.executemany("INSERT OR IGNORE INTO keep_ids VALUES (?)", ((e,) for e in entry_ids))
+
+    def query(self, received_since: datetime = None, flagged: Optional[bool] = None,
+              sender_domain: str = None, limit: int = None) -> List[EmailItem]:
+        """Fetch stored items, newest first, using the received/flag/domain indexes."""
+        clauses = []
+        params: List[Any] = []
+        if received_since is not None:
+            clauses.append("received_ts >= ?")
+            params.append(_naive_timestamp(received_since))
+        if flagged is not None:
+            clauses.append("is_flagged = ?")
+            params.append(int(flagged))
+        if sender_domain:
+            clauses.append("sender_domain = ?")
+            params.append(sender_domain.lower())
+
+        sql = f"SELECT {SELECT_COLUMNS} FROM emails"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY received_ts DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        return [self._to_item(row) for row in self.conn.execute(sql, params)]
+
+    def get(self, entry_id: str) -> Optional[EmailItem]:
+        row = self.conn.execute(f"SELECT {SELECT_COLUMNS} FROM emails WHERE entry_id = ?", (entry_id,)).fetchone()
+        return self._to_item(row) if row else None
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM emails").fetchone()[0]
+
+    def _to_item(self, row: Tuple[Any, ...]) -> EmailItem:
+        (entry_id, subject, sender_name, sender_email, received_time, importance, is_flagged,
+         is_unread, has_attachments, categories, folder_name, body_preview, is_vip_sender,
+         priority_score, ai_summary) = row
+        item = EmailItem(
+            entry_id=entry_id,
+            subject=subject,
+            sender_name=sender_name,
+            sender_email=sender_email,
+            received_time=datetime.fromisoformat(received_time),
+            importance=importance,
+            is_flagged=bool(is_flagged),
+            is_unread=bool(is_unread),
+            has_attachments=bool(has_attachments),
+            categories=json.loads(categories),
+            folder_name=folder_name,
+            body_preview=body_preview,
+            is_vip_sender=bool(is_vip_sender),
+            priority_score=priority_score,
+            ai_summary=ai_summary,
+        )
+        return compact_email_item(item) if self.compact else item
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM sync_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: Optional[str]):
+        with self.conn:
+            self.conn.execute("INSERT INTO sync_meta (key, value) VALUES (?, ?) "
+                              "ON CONFLICT (key) DO UPDATE SET value = excluded.value", (key, value))
+
+    def load(self) -> Tuple[Optional[datetime], Optional[datetime], Dict[str, EmailItem]]:
+        """SyncState-compatible: (watermark, last_full_sync, flagged snapshot)."""
+        watermark = self.get_meta("watermark")
+        last_full = self.get_meta("last_full_sync")
+        snapshot = {item.entry_id: item for item in self.query(flagged=True)}
+        return (datetime.fromisoformat(watermark) if watermark else None,
+                datetime.fromisoformat(last_full) if last_full else None,
+                snapshot)
+
+    def save(self, watermark: datetime, last_full_sync: datetime, snapshot: Dict[str, EmailItem]):
+        """SyncState-compatible: store the snapshot and watermark.
+
+        Stored items missing from ``snapshot`` are unflagged rather than
+        deleted, as in ``sync_flagged``, so ``load()`` returns exactly the
+        snapshot while their history stays.
+        """
+        self.upsert_items(snapshot.values(), seen_at=watermark)
+        self.clear_flags_except(snapshot.keys())
+        self.set_meta("watermark", watermark.isoformat())
+        self.set_meta("last_full_sync", last_full_sync.isoformat() if last_full_sync else None)
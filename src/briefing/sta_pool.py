@@ -0,0 +1,81 @@
+"""A fixed set of worker threads, each holding its own backend apartment.
+
+COM objects cannot be passed between single-threaded apartments, so work
+handed to a ``StaWorkerPool`` carries plain values (EntryIDs) and each job
+runs against the worker's own backend from ``MailBackend.worker()`` - for
+Outlook, a separate ``CoInitialize``d apartment and Outlook proxy that
+lives as long as the thread. A ``ThreadPoolExecutor`` cannot hold a context
+open for a thread's lifetime, hence this small pool.
+"""
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+class StaWorkerPool:
+    def __init__(self, backend, workers: int, name: str = "sta"):
+        """Start ``workers`` threads and wait until each has its backend.
+
+        Raises RuntimeError if none of them could connect; if only some
+        could, the pool runs with those.
+        """
+        self._jobs: "queue.Queue" = queue.Queue()
+        ready: "queue.Queue[bool]" = queue.Queue()
+        self._threads: List[threading.Thread] = [
+            threading.Thread(target=self._work, args=(backend, ready), name=f"{name}-{index}", daemon=True)
+            for index in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+        self.workers = sum(ready.get() for _ in self._threads)
+        if not self.workers:
+            self.close()
+            raise RuntimeError("no worker thread could open the mail backend")
+        if self.workers < workers:
+            logger.warning(f"Only {self.workers} of {workers} worker threads could open the mail backend")
+
+    def submit(self, fn: Callable[..., Any], *args) -> Future:
+        """Run ``fn(worker_backend, *args)`` on a free worker."""
+        future: Future = Future()
+        self._jobs.put((future, fn, args))
+        return future
+
+    def close(self):
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self) -> "StaWorkerPool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def _work(self, backend, ready: "queue.Queue[bool]"):
+        started = False
+        try:
+            with backend.worker() as worker_backend:
+                started = True
+                ready.put(True)
+                while True:
+                    job = self._jobs.get()
+                    if job is None:
+                        return
+                    future, fn, args = job
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        future.set_result(fn(worker_backend, *args))
+                    except BaseException as e:
+                        future.set_exception(e)
+        except Exception as e:
+            logger.error(f"Worker thread {threading.current_thread().name} failed: {e}")
+            if not started:
+                ready.put(False)
@@ -0,0 +1,91 @@
+"""Persistent state for incremental inbox collection.
+
+Stores the last sync watermark and a snapshot of the flagged EmailItems it
+produced, keyed by EntryID, in a local JSON file.
+"""
+import os
+import json
+import logging
+from dataclasses import fields
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+from .collector import EmailItem
+
+logger = logging.getLogger(__name__)
+
+# Fields filled in by collection; the rest are derived each run by the prioritiser/analyzer
+COLLECTED_FIELDS = (
+    "entry_id", "subject", "sender_name", "sender_email", "received_time",
+    "importance", "is_flagged", "is_unread", "has_attachments", "categories",
+    "folder_name", "body_preview", "is_vip_sender",
+)
+
+
+def email_item_to_record(item: EmailItem) -> Dict[str, Any]:
+    """Serialise the collected fields of an EmailItem to a JSON-safe dict."""
+    record = {name: getattr(item, name) for name in COLLECTED_FIELDS}
+    record["received_time"] = item.received_time.isoformat()
+    record["categories"] = list(item.categories)
+    return record
+
+
+def email_item_from_record(record: Dict[str, Any]) -> EmailItem:
+    """Rebuild an EmailItem from email_item_to_record output."""
+    known = {f.name for f in fields(EmailItem)}
+    values = {key: value for key, value in record.items() if key in known}
+    values["received_time"] = datetime.fromisoformat(record["received_time"])
+    return EmailItem(**values)
+
+
+class SyncState:
+    """Watermark plus EntryID -> EmailItem snapshot, persisted as JSON."""
+
+    VERSION = 1
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Tuple[Optional[datetime], Optional[datetime], Dict[str, EmailItem]]:
+        """Return (watermark, last_full_sync, snapshot); empty state if missing or unreadable."""
+        if not os.path.exists(self.path):
+            return None, None, {}
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != self.VERSION:
+                logger.info(f"Sync state version mismatch in {self.path}, starting fresh")
+                return None, None, {}
+
+            watermark = datetime.fromisoformat(data["watermark"]) if data.get("watermark") else None
+            last_full = datetime.fromisoformat(data["last_full_sync"]) if data.get("last_full_sync") else None
+            snapshot = {record["entry_id"]: email_item_from_record(record) for record in data.get("items", [])}
+            return watermark, last_full, snapshot
+        except Exception as e:
+            logger.warning(f"Could not read sync state {self.path}, starting fresh: {e}")
+            return None, None, {}
+
+    def save(self, watermark: datetime, last_full_sync: datetime, snapshot: Dict[str, EmailItem]):
+        """Atomically write the state file."""
+        data = {
+            "version": self.VERSION,
+            "watermark": watermark.isoformat(),
+            "last_full_sync": last_full_sync.isoformat() if last_full_sync else None,
+            "items": [email_item_to_record(item) for item in snapshot.values()],
+        }
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+            logger.debug(f"Sync state saved to {self.path} ({len(snapshot)} items)")
+        except Exception as e:
+            logger.error(f"Failed to save sync state {self.path}: {e}")
+
+    def close(self):
+        """Nothing to release; present so SyncState and SnapshotStore are interchangeable."""
@@ -4,20 +4,15 @@ import sys
 import os
 import argparse
 import logging
-from datetime import datetime, timedelta
 import json
-import yaml
-import tempfile
 
 # Add src to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from briefing.outlook_client import OutlookClient
-from briefing.collector import EmailCollector
-from briefing.prioritiser import EmailPrioritiser
-from briefing.renderer import ReportRenderer
+# Only stdlib and the scheduler guard are imported up front, so a run outside
+# the briefing window (or a --trigger) exits without loading pywin32, Jinja
+# or the Anthropic SDK; the pipeline is imported once a briefing is due.
 from briefing.scheduler_guard import SchedulerGuard
-from briefing.ai_analyzer import EmailAnalyzer
 
 
 def setup_logging(verbose: bool = False):
@@ -36,11 +31,29 @@ def load_config(config_path: str) -> dict:
         
     with open(config_path, 'r', encoding='utf-8') as f:
         if config_path.endswith('.yaml') or config_path.endswith('.yml'):
+            import yaml
             return yaml.safe_load(f)
         else:
             return json.load(f)
 
 
+def apply_overrides(config: dict, args) -> dict:
+    """Apply command-line overrides (currently ``--since``) to a loaded config."""
+    logger = logging.getLogger(__name__)
+    # Override lookback if --since is provided
+    if args.since:
+        if args.since.endswith('d'):
+            days = int(args.since[:-1])
+            config.setdefault('behaviour', {})['lookback_days_inbox'] = days
+            logger.info(f"Overriding lookback to {days} days")
+        elif args.since.endswith('h'):
+            hours = int(args.since[:-1])
+            days = max(1, hours // 24)
+            config.setdefault('behaviour', {})['lookback_days_inbox'] = days
+            logger.info(f"Overriding lookback to {days} days (from {hours} hours)")
+    return config
+
+
 def main():
     parser = argparse.ArgumentParser(description="Outlook Daily Briefing - Email Summary Generator")
     parser.add_argument('--config', type=str, required=True, help='Path to configuration file')
@@ -49,16 +62,27 @@ def main():
     parser.add_argument('--dry-run', action='store_true', help='Generate report without sending email')
     parser.add_argument('--since', type=str, help='Time range (e.g., "1d" for 1 day, "12h" for 12 hours)')
     parser.add_argument('--verbose', action='store_true', help='Enable verbose logging')
+    parser.add_argument('--from-snapshot', action='store_true',
+                       help='Read emails from the snapshot store (storage.snapshot_db) instead of the mail backend')
+    parser.add_argument('--daemon', action='store_true',
+                       help='Stay resident, keeping Outlook and caches warm; brief on schedule or on --trigger')
+    parser.add_argument('--trigger', action='store_true',
+                       help='Ask a running daemon (see the daemon config section) to brief in --mode and exit')
+    parser.add_argument('--profile', action='store_true',
+                       help='Profile the run (cProfile, tracemalloc) into the JSON run report')
     
     args = parser.parse_args()
     
     # Setup logging
     logger = setup_logging(args.verbose)
     logger.info("Starting Outlook Daily Briefing")
-    
+
+    if args.trigger:
+        sys.exit(trigger_daemon(args, logger))
+
     # Check scheduler guard
     guard = SchedulerGuard()
-    if not guard.should_run(args.mode):
+    if not args.daemon and not guard.should_run(args.mode):
         logger.info("Scheduler guard prevented execution")
         sys.exit(0)
         
@@ -70,121 +94,88 @@ def main():
         
     logger.info(f"Running in {actual_mode} mode")
 
-    outlook = None  # Initialize before try block for cleanup in finally
+    backend = None  # Initialize before try block for cleanup in finally
+    run_metrics = None
+    outcome = "error"  # exported with the run's metrics (see briefing.metrics_export)
     try:
         # Load configuration
-        config = load_config(args.config)
+        config = apply_overrides(load_config(args.config), args)
         logger.info(f"Configuration loaded from {args.config}")
-        
-        # Override lookback if --since is provided
-        if args.since:
-            if args.since.endswith('d'):
-                days = int(args.since[:-1])
-                config.setdefault('behaviour', {})['lookback_days_inbox'] = days
-                logger.info(f"Overriding lookback to {days} days")
-            elif args.since.endswith('h'):
-                hours = int(args.since[:-1])
-                days = max(1, hours // 24)
-                config.setdefault('behaviour', {})['lookback_days_inbox'] = days
-                logger.info(f"Overriding lookback to {days} days (from {hours} hours)")
-                
-        # Connect to Outlook
-        outlook = OutlookClient(only_when_open=config.get('behaviour', {}).get('only_when_outlook_open', True))
-        if not outlook.connect():
-            logger.warning("Could not connect to Outlook")
+
+        from briefing.backends import create_backend
+        from briefing.pipeline import BriefingSession, run_briefing
+        from briefing.instrumentation import begin_run
+
+        # COM calls are counted on every run; --profile adds cProfile and tracemalloc
+        run_metrics = begin_run(count_com=True)
+
+        # Connect to the configured mail backend (Outlook COM by default)
+        backend = create_backend(config)
+        with run_metrics.stage("connect"):
+            connected = backend.connect()
+        if not connected:
+            logger.warning("Could not connect to mail backend")
+            outcome = "unavailable"
             sys.exit(0)
-            
-        # Collect items (only flagged emails now)
-        collector = EmailCollector(outlook)
-        collected = collector.collect_all(config)
-        all_emails = collected.get('inbox', [])
-
-        logger.info(f"Collected {len(all_emails)} flagged emails")
-
-        # Prioritise and group by day
-        prioritiser = EmailPrioritiser(config)
-        grouped_by_day = prioritiser.prioritise_and_group(all_emails)
-
-        # AI-powered analysis (if enabled)
-        analyzer = EmailAnalyzer(config)
-        if analyzer.is_enabled():
-            logger.info("AI analysis enabled - analyzing qualifying emails")
-            ai_results = analyzer.analyze_batch(all_emails)
-
-            # Update emails with AI-generated summaries and actions
-            for email in all_emails:
-                if email.entry_id in ai_results:
-                    result = ai_results[email.entry_id]
-                    if result.success:
-                        email.ai_summary = result.summary
-                        # Replace recommended_action with AI version
-                        email.recommended_action = result.recommended_action
-                        logger.debug(f"AI updated: {email.subject[:40]}")
-        else:
-            logger.debug("AI analysis disabled or not available")
 
-        # Render report
-        renderer = ReportRenderer(config=config)
-        html_report = renderer.render_report(grouped_by_day, config, actual_mode)
-        subject = renderer.render_subject(config, actual_mode)
-        
-        # Send or display report
-        if args.dry_run:
-            logger.info("DRY RUN MODE - Email not sent")
-            logger.info(f"Subject: {subject}")
-            logger.info(f"To: {config['report']['to']}")
-
-            # Save preview if configured
-            preview_path = config.get('report', {}).get('preview_html')
-            if preview_path:
-                logger.info(f"Report preview saved to: {preview_path}")
-
-            # Print summary stats
-            total_emails = sum(len(emails) for emails in grouped_by_day.values())
-            logger.info(f"\nTotal flagged emails: {total_emails}")
-            logger.info(f"Days with emails: {len(grouped_by_day)}")
-
-            # Print sample emails
-            for day_key, emails in list(grouped_by_day.items())[:3]:
-                logger.info(f"\n{day_key}: {len(emails)} emails")
-                for email in emails[:2]:
-                    logger.info(f"  - {email.subject[:60]}")
-                    
+        session = BriefingSession(config, backend)
+        if args.daemon:
+            from briefing.daemon import BriefingDaemon
+            # Reloads go through the same CLI overrides as the initial load
+            BriefingDaemon(session, config_path=args.config,
+                           load_config=lambda path: apply_overrides(load_config(path), args)).serve_forever()
         else:
-            # Create temporary HTML file for attachment
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as temp_file:
-                temp_file.write(html_report)
-                temp_path = temp_file.name
-
-            try:
-                # Send the email with HTML attachment
-                outlook.send_email(
-                    to=config['report']['to'],
-                    subject=subject,
-                    html_body=html_report,
-                    attachments=[temp_path]
-                )
-                logger.info(f"Report sent successfully to {config['report']['to']} with HTML attachment")
-            finally:
-                # Clean up temporary file
-                try:
-                    os.unlink(temp_path)
-                except Exception as e:
-                    logger.warning(f"Failed to delete temporary file {temp_path}: {e}")
+            run_briefing(session, actual_mode, dry_run=args.dry_run, from_snapshot=args.from_snapshot,
+                         run_metrics=run_metrics, profile=args.profile)
+            outcome = "success"
             
     except FileNotFoundError as e:
         logger.error(f"Configuration file error: {e}")
         sys.exit(1)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
     except Exception as e:
         logger.error(f"Unexpected error: {e}", exc_info=True)
         sys.exit(1)
     finally:
         # CRITICAL: Always disconnect COM objects to prevent hanging
-        if outlook is not None:
-            outlook.disconnect()
+        if backend is not None:
+            backend.disconnect()
+        # The daemon exports each of its own runs
+        if run_metrics is not None and not args.daemon:
+            from briefing.metrics_export import export_run
+            export_run(config, run_metrics, outcome)
 
     logger.info("Outlook Daily Briefing completed successfully")
 
 
+def trigger_daemon(args, logger) -> int:
+    """Send a run request to the daemon; returns the process exit code."""
+    from briefing.daemon import send_command, DEFAULT_HOST, DEFAULT_PORT
+
+    settings = load_config(args.config).get('daemon', {}) or {}
+    if not settings.get('token'):
+        logger.error("daemon.token is not set; the daemon only accepts triggers carrying its shared token")
+        return 1
+    command = {"command": "run", "mode": args.mode, "dry_run": args.dry_run, "token": settings['token']}
+    try:
+        reply = send_command(command, settings.get('host', DEFAULT_HOST), settings.get('port', DEFAULT_PORT))
+    except OSError as e:
+        logger.error(f"Briefing daemon not reachable: {e}")
+        return 1
+
+    if not reply.get("ok"):
+        logger.error(f"Briefing daemon reported an error: {reply.get('error')}")
+        return 1
+    if reply.get("skipped"):
+        logger.info("Scheduler guard prevented execution")
+    else:
+        result = reply["result"]
+        logger.info(f"Daemon briefing ({result['mode']}) sent={result['sent']}: {result['email_count']} emails "
+                    f"in {result['duration_seconds']:.2f}s")
+    return 0
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,91 @@
+from datetime import datetime
+
+from briefing.ai_analyzer import AIAnalysisResult, EmailAnalyzer
+from briefing.ai_cache import AnalysisCache
+from briefing.collector import EmailItem
+from briefing.instrumentation import begin_run
+
+
+def _email(entry_id):
+    return EmailItem(entry_id=entry_id, subject=f"Subject {entry_id}", sender_name="Alex",
+                     sender_email="alex@example.com", received_time=datetime.now(), importance=2,
+                     is_flagged=True, is_unread=True, has_attachments=False, body_preview="Please review")
+
+
+def _analyzer(tmp_path, pack_size, batch=None):
+    analyzer = EmailAnalyzer({"ai_analysis": {"analyze_criteria": "all_vip", "pack_size": pack_size,
+                                              "batch": batch or {}}})
+    analyzer.enabled = True
+    analyzer.client = object()
+    analyzer.cache = AnalysisCache(str(tmp_path / "ai_cache.db"))
+    return analyzer
+
+
+def _result(prompt):
+    return AIAnalysisResult(summary=f"{prompt} summary", recommended_action="Reply", urgency_level="High")
+
+
+def test_packed_and_single_results_are_cached_apart(tmp_path, monkeypatch):
+    packed = _analyzer(tmp_path, pack_size=2)
+    first, straggler = _email("a"), _email("b")
+    # The packed response covers only the first email; the straggler is retried with the single prompt
+    monkeypatch.setattr(packed, "analyze_packed", lambda emails: {emails[0].entry_id: _result("packed")})
+    monkeypatch.setattr(packed, "analyze_email", lambda email: _result("single"))
+    packed.analyze_batch([first, straggler])
+
+    assert packed._cached_result(first).summary == "packed summary"
+    # Packed runs reuse single-prompt results; single-prompt runs never see packed ones
+    assert packed._cached_result(straggler).summary == "single summary"
+
+    single = _analyzer(tmp_path, pack_size=1)
+    assert single._cached_result(first) is None
+    assert single._cached_result(straggler).summary == "single summary"
+
+
+def test_cache_misses_are_only_counted_with_a_cache(tmp_path, monkeypatch):
+    analyzer = _analyzer(tmp_path, pack_size=1)
+    analyzer.cache.close()
+    analyzer.cache = None
+    monkeypatch.setattr(analyzer, "analyze_email", lambda email: _result("single"))
+    run = begin_run()
+    analyzer.analyze_batch([_email("a"), _email("b")])
+    assert "api.cache_misses" not in run.counters
+
+
+def test_second_packed_batch_run_makes_no_api_calls(tmp_path, monkeypatch):
+    emails = [_email(f"id{index}") for index in range(6)]
+    calls = []
+
+    def run_once():
+        analyzer = _analyzer(tmp_path, pack_size=3, batch={"enabled": True, "min_emails": 2})
+
+        def via_batch(pending):
+            calls.append("batch")
+            # The batch answers half the emails and fails one; the rest are missing
+            results = {email.entry_id: _result("batch") for email in pending[:3]}
+            results[pending[3].entry_id] = AIAnalysisResult("", "", "", success=False, error_message="overloaded")
+            return results
+
+        def packed(pending):
+            calls.append("packed")
+            return {pending[0].entry_id: _result("packed")}
+
+        def single(email):
+            calls.append("single")
+            return _result("single")
+
+        monkeypatch.setattr(analyzer, "analyze_via_batch_api", via_batch)
+        monkeypatch.setattr(analyzer, "analyze_packed", packed)
+        monkeypatch.setattr(analyzer, "analyze_email", single)
+        results = analyzer.analyze_batch(emails)
+        analyzer.close()
+        return results
+
+    first = run_once()
+    assert calls == ["batch", "packed", "single", "single"]
+
+    calls.clear()
+    second = run_once()
+    assert calls == []
+    assert {key: result.summary for key, result in second.items()} == \
+        {key: result.summary for key, result in first.items()}
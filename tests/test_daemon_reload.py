@@ -0,0 +1,34 @@
+import os
+import json
+import argparse
+
+from briefing.ai_cache import AnalysisCache
+from briefing.backends import FixtureBackend
+from briefing.daemon import BriefingDaemon
+from briefing.pipeline import BriefingSession
+from run_summary import apply_overrides, load_config
+
+
+def _write_config(path, lookback_days):
+    path.write_text(json.dumps({"behaviour": {"lookback_days_inbox": lookback_days}}), encoding="utf-8")
+
+
+def test_reload_keeps_cli_overrides_and_closes_the_old_cache(tmp_path):
+    config_path = tmp_path / "config.json"
+    _write_config(config_path, 7)
+    args = argparse.Namespace(since="3d")
+
+    def load(path):
+        return apply_overrides(load_config(path), args)
+
+    session = BriefingSession(load(str(config_path)), FixtureBackend(records=[]))
+    daemon = BriefingDaemon(session, config_path=str(config_path), load_config=load)
+    old_cache = session.analyzer.cache = AnalysisCache(str(tmp_path / "ai_cache.db"))
+
+    _write_config(config_path, 14)
+    mtime = os.path.getmtime(config_path) + 5
+    os.utime(config_path, (mtime, mtime))
+    daemon._reload_config_if_changed()
+
+    assert session.config["behaviour"]["lookback_days_inbox"] == 3
+    assert old_cache.conn is None
@@ -0,0 +1,44 @@
+import threading
+
+import pytest
+
+from briefing.backends import FixtureBackend
+from briefing.daemon import BriefingDaemon, send_command
+from briefing.pipeline import BriefingSession
+
+
+def _daemon(token):
+    config = {"daemon": {"port": 0, "schedule": False, "poll_seconds": 0.05, "token": token}}
+    return BriefingDaemon(BriefingSession(config, FixtureBackend(records=[])))
+
+
+@pytest.fixture
+def running_daemon():
+    daemon = _daemon("s3cret")
+    daemon.start_listener()
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    # serve_forever starts its own listener; reuse the one bound above
+    daemon.start_listener = lambda: None
+    thread.start()
+    yield daemon
+    daemon._stopping = True
+    thread.join(timeout=5)
+
+
+def test_commands_without_the_token_are_rejected(running_daemon):
+    for command in [{"command": "stop"}, {"command": "stop", "token": "wrong"}, {"command": "stop", "token": 1}]:
+        reply = send_command(command, port=running_daemon.port, timeout=5)
+        assert reply == {"ok": False, "error": "invalid or missing token"}
+    assert not running_daemon._stopping
+
+
+def test_commands_with_the_token_are_run(running_daemon):
+    reply = send_command({"command": "status", "token": "s3cret"}, port=running_daemon.port, timeout=5)
+    assert reply["ok"] and reply["runs"] == 0
+
+
+def test_listener_is_off_without_a_token():
+    daemon = _daemon(None)
+    daemon.start_listener()
+    assert daemon._server is None
+    assert not daemon.authorised(None)
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from briefing.dasl import (PR_MESSAGE_CLASS, PR_MESSAGE_DELIVERY_TIME, FLAG_COMPLETE, FLAG_MARKED, FLAG_NONE,
+                           DaslFilter, any_of, compare, dasl_literal, flag_status, followup, is_followup,
+                           message_class, received_since)
+from briefing.mapi_table import PR_FLAG_STATUS, DASL_READ
+
+
+def test_strings_are_quoted_and_embedded_quotes_doubled():
+    assert dasl_literal("IPM.Note") == "'IPM.Note'"
+    assert dasl_literal("O'Brien's report") == "'O''Brien''s report'"
+    assert dasl_literal("") == "''"
+
+
+def test_numbers_and_booleans_are_unquoted():
+    assert dasl_literal(2) == "2"
+    assert dasl_literal(True) == "1"
+    assert dasl_literal(False) == "0"
+
+
+def test_aware_datetimes_are_written_in_utc_to_the_second():
+    sydney = timezone(timedelta(hours=10))
+    when = datetime(2025, 1, 31, 9, 30, 15, 999999, tzinfo=sydney)
+    assert dasl_literal(when) == "'2025-01-30 23:30:15'"
+
+
+def test_naive_datetimes_are_taken_as_local_time():
+    when = datetime(2025, 6, 1, 12, 0, 0)
+    expected = when.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    assert dasl_literal(when) == f"'{expected}'"
+
+
+def test_compare_quotes_the_property_and_rejects_unknown_operators():
+    assert compare(PR_MESSAGE_CLASS, "<>", "IPM.Note").expression == f"\"{PR_MESSAGE_CLASS}\" <> 'IPM.Note'"
+    with pytest.raises(ValueError):
+        compare(PR_MESSAGE_CLASS, "LIKE", "IPM%")
+
+
+def test_and_or_parenthesise_each_operand():
+    combined = message_class("IPM.Note") & flag_status(FLAG_MARKED)
+    assert str(combined) == (f"@SQL=((\"{PR_MESSAGE_CLASS}\" = 'IPM.Note') "
+                             f"AND (\"{PR_FLAG_STATUS}\" = 2))")
+
+
+def test_nested_composition_keeps_grouping():
+    a, b, c = DaslFilter("a"), DaslFilter("b"), DaslFilter("c")
+    assert (a | b & c).query() == "@SQL=((a) OR ((b) AND (c)))"
+    assert ((a | b) & c).query() == "@SQL=(((a) OR (b)) AND (c))"
+    assert any_of(a, b, c).query() == "@SQL=(((a) OR (b)) OR (c))"
+    with pytest.raises(ValueError):
+        any_of()
+
+
+def test_received_since_compares_against_utc():
+    when = datetime(2025, 3, 1, tzinfo=timezone.utc)
+    assert received_since(when).expression == f"\"{PR_MESSAGE_DELIVERY_TIME}\" >= '2025-03-01 00:00:00'"
+
+
+@pytest.mark.parametrize("status, unread, expected", [
+    (FLAG_MARKED, False, True),
+    (FLAG_MARKED, True, True),
+    (FLAG_COMPLETE, True, True),
+    (FLAG_COMPLETE, False, False),
+    (FLAG_NONE, True, False),
+])
+def test_is_followup(status, unread, expected):
+    assert is_followup(status, unread) is expected
+
+
+def test_followup_filter():
+    assert followup().expression == (f"(\"{PR_FLAG_STATUS}\" = 2) OR "
+                                     f"((\"{PR_FLAG_STATUS}\" = 1) AND (\"{DASL_READ}\" = 0))")
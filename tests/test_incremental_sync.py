@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+from briefing.backends import FixtureBackend
+from briefing.collector import EmailCollector
+
+
+def _record(entry_id, flag_status, unread, days_ago=1):
+    received = datetime.now() - timedelta(days=days_ago)
+    return {
+        "entry_id": entry_id,
+        "subject": f"Subject {entry_id}",
+        "sender_name": "Alex",
+        "sender_email": "alex@example.com",
+        "received_time": received.isoformat(),
+        "flag_status": flag_status,
+        "unread": unread,
+        "last_modified": received.isoformat(),
+    }
+
+
+def _config(tmp_path):
+    return {
+        "behaviour": {
+            "lookback_days_inbox": 31,
+            "incremental_sync": True,
+            "sync_state_path": str(tmp_path / "sync_state.json"),
+            "full_resync_hours": 24,
+        }
+    }
+
+
+def _inbox_ids(backend, config):
+    return {email.entry_id for email in EmailCollector(backend).collect_all(config)["inbox"]}
+
+
+def test_read_item_marked_complete_drops_out_incrementally(tmp_path):
+    backend = FixtureBackend(records=[
+        _record("marked", flag_status=2, unread=False),
+        _record("done-read", flag_status=2, unread=False),
+        _record("done-unread", flag_status=2, unread=True),
+    ])
+    backend.connect()
+    config = _config(tmp_path)
+    assert _inbox_ids(backend, config) == {"marked", "done-read", "done-unread"}
+
+    # The user marks two items complete; only the unread one still qualifies
+    for item in backend.inbox:
+        if item.EntryID.startswith("done"):
+            item.FlagStatus = 1
+            item.LastModificationTime = datetime.now() + timedelta(seconds=1)
+
+    incremental = _inbox_ids(backend, config)
+    full_config = dict(config, behaviour=dict(config["behaviour"], incremental_sync=False))
+    assert incremental == _inbox_ids(backend, full_config) == {"marked", "done-unread"}
+
+
+def test_table_mode_uses_the_same_predicate(tmp_path):
+    backend = FixtureBackend(records=[_record("a", flag_status=2, unread=False)])
+    backend.connect()
+    config = _config(tmp_path)
+    config["behaviour"]["fetch_mode"] = "table"
+    assert _inbox_ids(backend, config) == {"a"}
+
+    item = backend.inbox[0]
+    item.FlagStatus = 1
+    item.LastModificationTime = datetime.now() + timedelta(seconds=1)
+    assert _inbox_ids(backend, config) == set()
@@ -0,0 +1,48 @@
+import pytest
+
+from briefing.keywords import DEFAULT_WHY_KEYWORDS, KeywordAutomaton
+
+
+def _naive(keywords, text):
+    unique = list(dict.fromkeys(keyword.strip().lower() for keyword in keywords if keyword.strip()))
+    return [keyword for keyword in unique if keyword in text.lower()]
+
+
+def test_overlapping_keywords_are_all_found():
+    automaton = KeywordAutomaton(["he", "she", "his", "hers"])
+    assert automaton.find("ushers") == ["he", "she", "hers"]
+
+
+def test_outputs_are_inherited_through_failure_links():
+    # "abcd" fails over to "bcd" and then "cd"; each ends inside the longer keyword
+    automaton = KeywordAutomaton(["abcd", "bcd", "cd", "bce"])
+    assert automaton.find("xabcd") == ["abcd", "bcd", "cd"]
+    assert automaton.find("abce") == ["bce"]
+
+
+def test_keywords_are_returned_in_dictionary_order():
+    automaton = KeywordAutomaton(["payment", "contract", "urgent"])
+    assert automaton.find("URGENT: contract payment") == ["payment", "contract", "urgent"]
+
+
+def test_duplicate_keywords_are_collapsed():
+    automaton = KeywordAutomaton(["Invoice", "invoice ", "INVOICE", "", "asap"])
+    assert automaton.keywords == ["invoice", "asap"]
+    assert automaton.find("invoice invoice asap") == ["invoice", "asap"]
+
+
+def test_empty_dictionary_or_text():
+    assert KeywordAutomaton([]).find("anything") == []
+    assert KeywordAutomaton(None).find("anything") == []
+    assert KeywordAutomaton(["urgent"]).find("") == []
+
+
+@pytest.mark.parametrize("text", [
+    "Urgent: please review the tender proposal",
+    "Re: Contract renewal and invoice #4411",
+    "paymentpayment asap!",
+    "nothing to see here",
+])
+def test_matches_agree_with_substring_checks(text):
+    keywords = DEFAULT_WHY_KEYWORDS + ["renewal", "new", "ten", "tend"]
+    assert KeywordAutomaton(keywords).find(text) == _naive(keywords, text)
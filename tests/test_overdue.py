@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from briefing.backends import FixtureBackend
+from briefing.collector import EmailCollector
+
+
+def _record(entry_id, days_old, **fields):
+    return dict({
+        "entry_id": entry_id,
+        "subject": f"Subject {entry_id}",
+        "sender_email": "alex@example.com",
+        "received_time": (datetime.now() - timedelta(days=days_old)).isoformat(),
+        "flag_status": 2,
+        "body": "Body text",
+    }, **fields)
+
+
+def _config(fetch_mode="items", convert_workers=1, **report):
+    return {
+        "report": report,
+        "behaviour": {"overdue_days": 30, "fetch_mode": fetch_mode, "convert_workers": convert_workers},
+    }
+
+
+def _collector(records):
+    backend = FixtureBackend(records=records)
+    backend.connect()
+    return EmailCollector(backend)
+
+
+@pytest.mark.parametrize("fetch_mode", ["items", "table"])
+def test_overdue_counts_mail_items_only(fetch_mode):
+    collector = _collector([
+        _record("note", 40),
+        _record("meeting", 40, message_class="IPM.Schedule.Meeting.Request", unread=True),
+        _record("recent", 5),
+    ])
+    overdue = collector.collect_overdue(_config(fetch_mode))
+    assert [email.entry_id for email in overdue] == ["note"]
+
+
+@pytest.mark.parametrize("convert_workers", [1, 2])
+def test_overdue_reads_no_body_previews(convert_workers):
+    collector = _collector([_record(f"id{index}", 40 + index) for index in range(3)])
+    overdue = collector.collect_overdue(_config(convert_workers=convert_workers))
+    assert len(overdue) == 3
+    assert all(email.body_preview == "" for email in overdue)
+
+
+def test_overdue_section_is_capped_to_the_oldest():
+    collector = _collector([_record(f"id{index}", 40 + index) for index in range(10)])
+    overdue = collector.collect_overdue(_config(max_items_per_section=3))
+    assert [email.entry_id for email in overdue] == ["id9", "id8", "id7"]
@@ -0,0 +1,74 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+from briefing.backends import FixtureBackend
+from briefing.body_loader import BodyPreviewLoader
+from briefing.collector import EmailCollector
+from briefing.fake_outlook import FakeMailItem
+from briefing.sender_cache import SenderAddressCache
+
+
+@pytest.fixture
+def frequent_switches():
+    # Switch threads as often as possible so unguarded read-modify-writes interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def _records(count):
+    now = datetime.now()
+    return [{
+        "entry_id": f"id{index}",
+        "subject": f"Subject {index}",
+        "sender_email": "alex@example.com",
+        "received_time": (now - timedelta(hours=index + 1)).isoformat(),
+        "flag_status": 2,
+        "body": f"Body {index}",
+    } for index in range(count)]
+
+
+def test_body_loader_counts_every_preview_across_threads(frequent_switches):
+    loader = BodyPreviewLoader()
+    items = [FakeMailItem(entry_id=f"id{index % 50}", subject="", sender_name="", sender_email="",
+                          received_time=datetime.now(), body=f"Body {index % 50}") for index in range(4000)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        previews = list(pool.map(loader.preview, items))
+
+    assert previews == [f"Body {index % 50}" for index in range(4000)]
+    assert loader.hits + loader.fetches == 4000
+
+
+def test_sender_cache_counts_every_lookup_across_threads(frequent_switches):
+    cache = SenderAddressCache()
+
+    def lookup(index):
+        dn = f"/O=EXAMPLE/CN=USER{index % 20}"
+        if cache.get(dn) is None:
+            cache.put(dn, f"user{index % 20}@example.com")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lookup, range(4000)))
+
+    assert cache.hits + cache.misses == 4000
+    assert cache.get("/o=example/cn=user3") == "user3@example.com"
+
+
+def test_parallel_conversion_matches_serial():
+    backend = FixtureBackend(records=_records(40))
+    backend.connect()
+
+    def collect(workers):
+        collector = EmailCollector(backend)
+        config = {"behaviour": {"fetch_mode": "items", "convert_workers": workers}}
+        emails = list(collector.iter_inbox(config))
+        return [(email.entry_id, email.body_preview) for email in emails], collector.body_loader
+
+    serial, _ = collect(1)
+    parallel, loader = collect(4)
+    assert parallel == serial
+    assert loader.hits + loader.fetches == len(serial)
@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from briefing.backends import FixtureBackend
+from briefing.instrumentation import begin_run
+from briefing.pipeline import BriefingSession, run_briefing
+
+
+def _records(count):
+    now = datetime.now()
+    return [{
+        "entry_id": f"id{index}",
+        "subject": f"Subject {index}",
+        "sender_email": "alex@example.com",
+        "received_time": (now - timedelta(hours=index + 1)).isoformat(),
+        "flag_status": 2,
+    } for index in range(count)]
+
+
+@pytest.mark.parametrize("snapshot", [False, True])
+def test_collected_gauge_counts_emails_before_selection(tmp_path, snapshot):
+    backend = FixtureBackend(records=_records(10))
+    backend.connect()
+    config = {
+        "report": {"to": "me@example.com", "selection": "top_k", "max_items_per_section": 4},
+        "behaviour": {"lookback_days_inbox": 31},
+    }
+    if snapshot:
+        config["storage"] = {"snapshot_db": str(tmp_path / "snapshot.db")}
+
+    run = begin_run()
+    result = run_briefing(BriefingSession(config, backend), "morning", dry_run=True, run_metrics=run)
+
+    assert result.email_count == 4
+    assert run.gauges["emails.collected"] == 10
+    assert run.gauges["emails.selected"] == 4
@@ -0,0 +1,70 @@
+import re
+
+import pytest
+
+from briefing.rules import KeywordRuleEngine
+
+PATTERNS = [
+    r"(?i)\burgent\b|\bASAP\b|\bimmediate\b",   # whole-word fast path, with a leading flag
+    r"\binvoice\b|\bpayment\b",                 # whole-word fast path
+    r"(?i)\bpay",                               # prefix: combined regex
+    r"(?s)deadline.*friday",                    # leading flag kept as a scoped group
+    r"(?x) contract \s+ renewal",               # verbose flag changes how the body parses
+    r"re:\s*re:",                               # matches at the same position as the next rule
+    r"re:",
+    r"\d{3}-\d{4}",
+    r"(\w)\1{2}",                               # backreference: matched on its own
+    r"(?P<word>\w+) (?P=word)",                 # named group and backreference
+]
+
+TEXTS = [
+    "",
+    "URGENT: invoice attached",
+    "Payment reminder ASAP",
+    "Payload delivered",
+    "The deadline is\nnext Friday",
+    "Contract   renewal for 2025",
+    "contractrenewal",
+    "RE: Re: status",
+    "re: status",
+    "Call 555-1234 today",
+    "Sooo good",
+    "the the duplicate",
+    "immediately invoiced",
+]
+
+
+def _expected(patterns, text):
+    return [index for index, pattern in enumerate(patterns) if re.search(pattern, text, re.IGNORECASE)]
+
+
+def _matched(engine, text):
+    return [rule.index for rule in engine.match(text)]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_matches_agree_with_per_rule_search(text):
+    engine = KeywordRuleEngine([{"pattern": pattern, "priority": "high"} for pattern in PATTERNS])
+    assert _matched(engine, text) == _expected(PATTERNS, text)
+
+
+def test_backreferences_are_not_combined_with_other_rules():
+    # Combined, "\1" in the second rule would refer to the first rule's group
+    patterns = [r"(x)y", r"(a)\1"]
+    engine = KeywordRuleEngine([{"pattern": pattern} for pattern in patterns])
+    assert _matched(engine, "aa") == [1]
+    assert _matched(engine, "xy ax") == [0]
+
+
+def test_rules_that_cannot_be_combined_fall_back_to_individual_matching():
+    # Valid alone, but only the first global flag group is rewritten as a scoped one
+    patterns = [r"\bpay", r"(?i)(?s)due.date"]
+    engine = KeywordRuleEngine([{"pattern": pattern} for pattern in patterns])
+    for text in ["Payment due\ndate", "DUE DATE", "payload", "nothing"]:
+        assert _matched(engine, text) == _expected(patterns, text)
+
+
+def test_invalid_patterns_are_skipped():
+    engine = KeywordRuleEngine([{"pattern": "(unclosed"}, {"pattern": r"\bok\b"}])
+    assert _matched(engine, "ok") == [1]
+
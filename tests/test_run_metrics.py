@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+from briefing.backends import FixtureBackend
+from briefing.daemon import BriefingDaemon
+from briefing.pipeline import BriefingSession
+
+
+def _records(count):
+    now = datetime.now()
+    return [{
+        "entry_id": f"id{index}",
+        "subject": f"Subject {index}",
+        "sender_email": "alex@example.com",
+        "received_time": (now - timedelta(hours=index + 1)).isoformat(),
+        "flag_status": 2,
+    } for index in range(count)]
+
+
+def test_daemon_briefings_count_com_calls(tmp_path):
+    backend = FixtureBackend(records=_records(5))
+    backend.connect()
+    textfile = tmp_path / "briefing.prom"
+    config = {
+        "report": {"to": "me@example.com"},
+        "behaviour": {"lookback_days_inbox": 31},
+        "metrics": {"enabled": True, "textfile_path": str(textfile)},
+    }
+    reply = BriefingDaemon(BriefingSession(config, backend))._run("force", dry_run=True)
+
+    assert reply["ok"]
+    reads = [line for line in textfile.read_text().splitlines()
+             if line.startswith("briefing_com_property_reads_total ")]
+    assert reads and int(reads[0].split()[1]) > 0
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+from briefing.backends import FixtureBackend
+from briefing.collector import EmailCollector
+from briefing.pipeline import BriefingSession, run_briefing
+from briefing.snapshot_store import SnapshotStore
+
+
+def _records(count):
+    now = datetime.now()
+    return [{
+        "entry_id": f"id{index}",
+        "subject": f"Subject {index}",
+        "sender_name": "Alex",
+        "sender_email": "alex@example.com",
+        "received_time": (now - timedelta(hours=index + 1)).isoformat(),
+        "flag_status": 2,
+    } for index in range(count)]
+
+
+def _config(tmp_path, **report):
+    return {
+        "report": dict({"to": "me@example.com"}, **report),
+        "behaviour": {"lookback_days_inbox": 31},
+        "storage": {"snapshot_db": str(tmp_path / "snapshot.db")},
+    }
+
+
+def _email_count(session, from_snapshot=False):
+    result = run_briefing(session, "morning", dry_run=True, from_snapshot=from_snapshot)
+    return result.email_count
+
+
+def test_unflagged_emails_leave_the_snapshot(tmp_path):
+    backend = FixtureBackend(records=_records(10))
+    backend.connect()
+    session = BriefingSession(_config(tmp_path), backend)
+    assert _email_count(session) == 10
+
+    for item in backend.inbox[:4]:
+        item.FlagStatus = 0
+    assert _email_count(session) == 6
+    assert _email_count(session, from_snapshot=True) == 6
+
+
+def test_top_k_selection_persists_the_whole_collection(tmp_path):
+    backend = FixtureBackend(records=_records(10))
+    backend.connect()
+    config = _config(tmp_path, selection="top_k", max_items_per_section=3)
+    session = BriefingSession(config, backend)
+    assert _email_count(session) == 3
+
+    with SnapshotStore(config["storage"]["snapshot_db"]) as store:
+        assert len(store.query(flagged=True)) == 10
+
+
+def test_sync_flagged_leaves_items_outside_the_window(tmp_path):
+    backend = FixtureBackend(records=_records(3))
+    backend.connect()
+    emails = list(EmailCollector(backend).iter_inbox({"behaviour": {"lookback_days_inbox": 31}}))
+    newest, _, oldest = emails
+
+    with SnapshotStore(str(tmp_path / "snapshot.db")) as store:
+        store.upsert_items(emails, seen_at=datetime.now() - timedelta(days=1))
+        # A collection whose window starts after the oldest email only saw the newest
+        cleared = store.sync_flagged([newest], received_since=oldest.received_time + timedelta(minutes=1))
+        assert cleared == 1
+        assert {item.entry_id for item in store.query(flagged=True)} == {newest.entry_id, oldest.entry_id}
+
+
+def test_save_unflags_dropped_items_and_keeps_their_history(tmp_path):
+    backend = FixtureBackend(records=_records(3))
+    backend.connect()
+    emails = list(EmailCollector(backend).iter_inbox({"behaviour": {"lookback_days_inbox": 31}}))
+    for email in emails:
+        email.priority_score = 70
+        email.ai_summary = f"Summary of {email.entry_id}"
+
+    with SnapshotStore(str(tmp_path / "snapshot.db")) as store:
+        store.upsert_items(emails)
+        kept, dropped = emails[0], emails[1]
+        # Incremental sync saves collector output: unscored and without summaries
+        fresh = EmailCollector(backend).iter_inbox({"behaviour": {"lookback_days_inbox": 31}})
+        snapshot = {email.entry_id: email for email in fresh if email.entry_id == kept.entry_id}
+        store.save(datetime.now(), datetime.now(), snapshot)
+
+        _, _, loaded = store.load()
+        assert set(loaded) == {kept.entry_id}
+        assert loaded[kept.entry_id].priority_score == 70
+        assert store.count() == 3
+        stored = store.get(dropped.entry_id)
+        assert not stored.is_flagged
+        assert (stored.priority_score, stored.ai_summary) == (70, f"Summary of {dropped.entry_id}")